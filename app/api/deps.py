@@ -5,13 +5,20 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.admission import get_admission_controller
+from app.core.config import get_settings
 from app.core.security import decode_access_token
 from app.db.crud import get_user_by_username
 from app.db.database import get_db_session
 from app.db.models import User
 
+settings = get_settings()
+
 # OAuth2 scheme for token authentication
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+
+# Database session dependency
+get_db = get_db_session
 
 # Type aliases for dependencies
 DBSession = Annotated[AsyncSession, Depends(get_db_session)]
@@ -48,3 +55,36 @@ async def get_current_user(
 
 # Type alias for current user dependency
 CurrentUser = Annotated[User, Depends(get_current_user)]
+
+
+async def get_current_user_id(token: TokenDep) -> UUID:
+    """Dependency to get the authenticated user's id from the token alone.
+    
+    Skips the user lookup for endpoints whose own queries are scoped to
+    the user, such as chat turns checking session ownership.
+    """
+    try:
+        return decode_access_token(token).user_id
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+# Type alias for current user id dependency
+CurrentUserId = Annotated[UUID, Depends(get_current_user_id)]
+
+
+async def admit_chat_turn(user_id: CurrentUserId) -> AsyncGenerator[None, None]:
+    """Hold an admission slot for the duration of a chat turn.
+    
+    Raises `OverloadedError` (429 with `Retry-After`) when the user or the
+    worker is over its limits.
+    """
+    if not settings.ADMISSION_ENABLED:
+        yield
+        return
+    async with get_admission_controller().admit(str(user_id)):
+        yield
@@ -3,8 +3,8 @@ from .auth import router as auth_router
 from .users import router as users_router
 from .chat import router as chat_router
 
-# Create v1 router
-router = APIRouter(prefix="/api/v1")
+# Create v1 router, mounted under /api/v1 by the application
+router = APIRouter()
 
 # Include route modules
 router.include_router(auth_router, prefix="/auth", tags=["auth"])
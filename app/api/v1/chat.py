@@ -1,22 +1,59 @@
-from typing import List
+import asyncio
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from langchain_core.messages import HumanMessage, AIMessage
+from langgraph.types import StateSnapshot
 
-from app.api.deps import get_current_user, get_db
-from app.db.models import User, Session, Message
+from app.api.deps import admit_chat_turn, get_current_user, get_current_user_id, get_db
+from app.core.config import get_settings
+from app.core.deadline import Deadline, cancel_on_disconnect, request_deadline
+from app.core.errors import ValidationError
+from app.core.timing import StepTimings
+from app.db.models import User
 from app.db import crud
-from app.rag.graph import create_chat_graph
+from app.db.database import async_session_factory
+from app.db.pagination import Keyset, decode_cursor, paginate
+from app.db.session_cache import SessionState, get_session_cache, notify_session_changes
+from app.rag.documents import ingest_document
+from app.rag.graph import create_chat_graph, start_turn
+from app.rag.router import RETRIEVE, get_retrieval_router
+from app.vector_store import get_embeddings
 from app.db.schemas import (
     ChatMessage,
     ChatResponse,
     ChatSession,
-    ChatSessionCreate
+    ChatSessionCreate,
+    ChatSessionPage,
+    DocumentUploadResponse,
+    MessagePage,
+    MessageResponse
 )
 
 router = APIRouter()
+settings = get_settings()
+
+
+def _parse_cursor(cursor: Optional[str]) -> Optional[Keyset]:
+    """Decode an optional pagination cursor from the query string."""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise ValidationError(str(e))
 
 
 @router.post("/sessions", response_model=ChatSession)
@@ -30,14 +67,24 @@ async def create_session(
     return ChatSession.model_validate(session)
 
 
-@router.get("/sessions", response_model=List[ChatSession])
+@router.get("/sessions", response_model=ChatSessionPage)
 async def list_sessions(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
-) -> List[ChatSession]:
-    """List all chat sessions for current user."""
-    sessions = await crud.get_user_chat_sessions(db, current_user.id)
-    return [ChatSession.model_validate(s) for s in sessions]
+) -> ChatSessionPage:
+    """List chat sessions for current user, most recently updated first."""
+    rows = await crud.get_user_chat_sessions(
+        db, current_user.id, limit=limit + 1, after=_parse_cursor(cursor)
+    )
+    sessions, next_cursor = paginate(
+        rows, limit, key=lambda s: (s.updated_at, s.id)
+    )
+    return ChatSessionPage(
+        items=[ChatSession.model_validate(s) for s in sessions],
+        next_cursor=next_cursor
+    )
 
 
 @router.get("/sessions/{session_id}", response_model=ChatSession)
@@ -53,41 +100,199 @@ async def get_session(
     return ChatSession.model_validate(session)
 
 
-@router.post("/sessions/{session_id}/messages", response_model=ChatResponse)
-async def send_message(
+@router.get("/sessions/{session_id}/messages", response_model=MessagePage)
+async def list_messages(
     session_id: UUID,
-    message: ChatMessage,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
-) -> ChatResponse:
-    """Send a message in a chat session."""
-    # Verify session exists and belongs to user
+) -> MessagePage:
+    """List messages in a chat session in chronological order."""
     session = await crud.get_chat_session(db, session_id)
     if not session or session.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    # Save user message
-    user_message = await crud.create_message(
+    rows = await crud.get_session_messages_page(
         db,
-        session_id=session_id,
-        role="user",
-        content=message.content
+        session_id,
+        limit=limit + 1,
+        after=_parse_cursor(cursor),
+        since=session.created_at
     )
+    messages, next_cursor = paginate(
+        rows, limit, key=lambda m: (m.created_at, m.id)
+    )
+    return MessagePage(
+        items=[MessageResponse.model_validate(m) for m in messages],
+        next_cursor=next_cursor
+    )
+
+
+@router.post(
+    "/sessions/{session_id}/documents",
+    response_model=DocumentUploadResponse,
+    status_code=202
+)
+async def upload_document(
+    session_id: UUID,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> DocumentUploadResponse:
+    """Upload a text document to search in a chat session.
+    
+    The document is chunked, embedded and indexed after the response, so
+    it becomes searchable a moment later.
+    """
+    session = await crud.get_active_session(db, session_id, current_user.id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
     
-    # Get chat history
-    messages = await crud.get_session_messages(db, session_id)
-    lc_messages = [
-        HumanMessage(content=msg.content) if msg.role == "user"
-        else AIMessage(content=msg.content)
-        for msg in messages
-    ]
+    content = await file.read(settings.DOCUMENT_MAX_BYTES + 1)
+    if len(content) > settings.DOCUMENT_MAX_BYTES:
+        raise ValidationError(f"Documents are limited to {settings.DOCUMENT_MAX_BYTES} bytes")
+    try:
+        text = content.decode("utf-8")
+    except UnicodeDecodeError:
+        raise ValidationError("Documents must be UTF-8 text")
+    if not text.strip():
+        raise ValidationError("Document is empty")
     
-    # Create and run chat graph
+    filename = file.filename or "document"
+    background_tasks.add_task(
+        ingest_document, session_id, session.expires_at, filename, text
+    )
+    return DocumentUploadResponse(filename=filename, size=len(content))
+
+
+@router.post("/sessions/{session_id}/messages", response_model=ChatResponse)
+async def send_message(
+    session_id: UUID,
+    message: ChatMessage,
+    request: Request,
+    response: Response,
+    deadline: Deadline = Depends(request_deadline),
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+    _: None = Depends(admit_chat_turn)
+) -> ChatResponse:
+    """Send a message in a chat session.
+    
+    The turn stops when the request deadline passes (504) or the client
+    disconnects, cancelling any in-flight model calls.
+    """
+    timings = StepTimings()
+    
+    # Active sessions are served from the worker's cache, avoiding the
+    # session and history reads on every turn
+    cache = get_session_cache() if settings.SESSION_CACHE_ENABLED else None
+    session_state = cache.get(session_id) if cache is not None else None
+    
+    # Verify session exists and belongs to user, loading its history in
+    # the same query
+    if session_state is None:
+        with timings.measure("session"):
+            bootstrap = await deadline.run(
+                crud.get_turn_bootstrap(
+                    db, session_id, current_user_id, limit=settings.SESSION_CACHE_MAX_MESSAGES
+                ),
+                "setup"
+            )
+        if bootstrap is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        session_state = SessionState.from_rows(*bootstrap)
+    elif session_state.user_id != current_user_id:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    # With checkpoints on, the session's graph state is a thread of its own
     chat_graph = create_chat_graph()
-    result = await chat_graph.ainvoke({
-        "messages": lc_messages,
+    config = {
+        "configurable": {
+            "thread_id": str(session_id),
+            "db_session": db,
+            "timings": timings,
+            "deadline": deadline,
+        }
+    }
+    
+    user_message = HumanMessage(content=message.content)
+    turn = {
+        "messages": [*session_state.messages, user_message],
+        "summary": session_state.summary,
         "session_id": str(session_id),
-        "db_session": db
-    })
+        "query_embedding": None,
+        "previous_chunks": session_state.previous_chunks,
+    }
+    
+    async def load_checkpoint() -> Optional[StateSnapshot]:
+        if chat_graph.checkpointer is None:
+            return None
+        return await chat_graph.aget_state(config)
+    
+    # The insert uses its own database session because an AsyncSession
+    # can't run queries in parallel
+    async def persist_user_message() -> None:
+        async with async_session_factory() as write_db:
+            await crud.create_message(
+                write_db,
+                session_id=session_id,
+                role="user",
+                content=message.content
+            )
+    
+    async def embed_query() -> Optional[List[List[float]]]:
+        # Only start early when the turn retrieves whatever the history
+        # holds; the graph embeds on demand otherwise
+        route = get_retrieval_router().route(message.content, has_previous_context=True)
+        if route != RETRIEVE:
+            return None
+        return await get_embeddings([message.content])
+    
+    try:
+        # Embedding the query overlaps with loading the checkpoint and
+        # persisting the user message
+        query_embedding, graph_input = await deadline.run(
+            asyncio.gather(
+                timings.timed("embed", embed_query()),
+                start_turn(
+                    lambda: timings.timed("checkpoint", load_checkpoint()),
+                    turn,
+                    lambda: timings.timed("persist", persist_user_message())
+                ),
+            ),
+            "setup"
+        )
+        if graph_input is not None and query_embedding:
+            graph_input["query_embedding"] = query_embedding[0]
+        
+        # Run the chat graph, resuming an interrupted run of the same turn
+        result = await cancel_on_disconnect(
+            request,
+            chat_graph.ainvoke(graph_input, config=config),
+            "graph"
+        )
+    except BaseException:
+        # The user message may be stored already, so the cached history
+        # can't be trusted any more
+        if cache is not None:
+            cache.invalidate([session_id])
+        raise
+    
+    # Write through, then let other workers know their copy is stale
+    if cache is not None:
+        session_state.append(
+            [user_message, AIMessage(content=result["response"])],
+            settings.SESSION_CACHE_MAX_MESSAGES
+        )
+        session_state.previous_chunks = [
+            (chunk_id, chunk.score)
+            for chunk in result.get("chunks") or []
+            for chunk_id in chunk.ids
+        ]
+        cache.put(session_state)
+        await notify_session_changes(db, [session_id])
     
+    response.headers["Server-Timing"] = timings.server_timing()
     return ChatResponse(message=result["response"])
@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import math
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from time import monotonic
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from app.core.config import get_settings
+from app.core.errors import OverloadedError
+from app.core.metrics import ADMISSION_QUEUED, ADMISSION_REJECTIONS
+
+try:
+    from redis import asyncio as redis
+except ImportError:  # pragma: no cover - shared rate limits are optional
+    redis = None
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class TokenBucket:
+    """In-process token buckets, one per key.
+
+    Each key refills at `rate` tokens per second up to `burst`. Only the
+    most recently used `max_keys` buckets are kept; an evicted key starts
+    again with a full bucket.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 10000) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def acquire(self, key: str) -> float:
+        """Take a token for `key`; returns 0, or seconds until one is available."""
+        now = monotonic()
+        tokens, updated = self._buckets.pop(key, (float(self.burst), now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    async def refund(self, key: str) -> None:
+        """Give back a token taken for `key` that went unused."""
+        if key in self._buckets:
+            tokens, updated = self._buckets[key]
+            self._buckets[key] = (min(self.burst, tokens + 1), updated)
+
+
+# Token bucket kept in a Redis hash, using the server clock so all workers
+# agree. Returns the wait in seconds, 0 when a token was taken.
+_REDIS_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + (now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+_REDIS_REFUND_SCRIPT = """
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+if tokens then
+    redis.call('HSET', KEYS[1], 'tokens', math.min(tonumber(ARGV[1]), tokens + 1))
+end
+"""
+
+
+class RedisTokenBucket:
+    """Token buckets shared by all workers through Redis.
+
+    If Redis is unreachable requests are admitted, so an outage of the
+    limiter does not take the chat API down with it.
+    """
+
+    def __init__(self, url: str, rate: float, burst: int, prefix: str = "admission") -> None:
+        if redis is None:
+            raise RuntimeError("redis is not installed, unset ADMISSION_REDIS_URL")
+        self.rate = rate
+        self.burst = burst
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(_REDIS_BUCKET_SCRIPT)
+        self._refund_script = self._client.register_script(_REDIS_REFUND_SCRIPT)
+
+    async def acquire(self, key: str) -> float:
+        """Take a token for `key`; returns 0, or seconds until one is available."""
+        try:
+            wait = await self._script(
+                keys=[f"{self.prefix}:{key}"], args=[self.rate, self.burst]
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Rate limiter unavailable, admitting request: {str(e)}")
+            return 0.0
+        return float(wait)
+
+    async def refund(self, key: str) -> None:
+        """Give back a token taken for `key` that went unused."""
+        try:
+            await self._refund_script(keys=[f"{self.prefix}:{key}"], args=[self.burst])
+        except redis.RedisError as e:
+            logger.warning(f"Rate limiter unavailable, token not refunded: {str(e)}")
+
+
+class AdmissionController:
+    """Decides whether a chat turn may start now, later, or not at all.
+
+    A turn must pass, in order: the user's concurrency limit, the user's
+    rate limit, and a global concurrency limit. Only the global limit
+    queues, and only for `queue_timeout` seconds with at most `max_queued`
+    waiters; everything else is rejected immediately with `OverloadedError`
+    so clients back off instead of piling up. A turn the global limit
+    rejects gets its rate token back.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queued: int,
+        queue_timeout: float,
+        max_per_user: int,
+        rate_limiter: Optional[TokenBucket] = None,
+        retry_after: float = 1.0
+    ) -> None:
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.max_per_user = max_per_user
+        self.rate_limiter = rate_limiter
+        self.retry_after = retry_after
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._queued = 0
+        self._active_by_user: Dict[str, int] = {}
+
+    def _reject(self, reason: str, retry_after: float) -> OverloadedError:
+        ADMISSION_REJECTIONS.labels(reason).inc()
+        return OverloadedError(
+            f"Too many requests ({reason}), please retry later",
+            retry_after=math.ceil(retry_after)
+        )
+
+    async def _acquire_slot(self) -> None:
+        if self._slots.locked() and self._queued >= self.max_queued:
+            raise self._reject("queue_full", self.retry_after)
+        self._queued += 1
+        ADMISSION_QUEUED.inc()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._reject("queue_timeout", self.retry_after)
+        finally:
+            self._queued -= 1
+            ADMISSION_QUEUED.dec()
+
+    @asynccontextmanager
+    async def admit(self, user_id: str) -> AsyncIterator[None]:
+        """Hold an admission slot for `user_id` while the block runs."""
+        active = self._active_by_user.get(user_id, 0)
+        if active >= self.max_per_user:
+            raise self._reject("user_concurrency", self.retry_after)
+        self._active_by_user[user_id] = active + 1
+
+        try:
+            if self.rate_limiter is not None:
+                wait = await self.rate_limiter.acquire(user_id)
+                if wait > 0:
+                    raise self._reject("rate_limited", wait)
+            try:
+                await self._acquire_slot()
+            except OverloadedError:
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.refund(user_id)
+                raise
+            try:
+                yield
+            finally:
+                self._slots.release()
+        finally:
+            remaining = self._active_by_user[user_id] - 1
+            if remaining:
+                self._active_by_user[user_id] = remaining
+            else:
+                del self._active_by_user[user_id]
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the worker's admission controller configured from settings."""
+    global _controller
+    if _controller is None:
+        rate = settings.ADMISSION_USER_RATE_PER_MINUTE / 60
+        rate_limiter = None
+        if rate > 0:
+            if settings.ADMISSION_REDIS_URL:
+                rate_limiter = RedisTokenBucket(
+                    settings.ADMISSION_REDIS_URL, rate, settings.ADMISSION_USER_BURST
+                )
+            else:
+                rate_limiter = TokenBucket(rate, settings.ADMISSION_USER_BURST)
+        _controller = AdmissionController(
+            max_concurrent=settings.ADMISSION_MAX_CONCURRENT_TURNS,
+            max_queued=settings.ADMISSION_MAX_QUEUED_TURNS,
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+            max_per_user=settings.ADMISSION_MAX_TURNS_PER_USER,
+            rate_limiter=rate_limiter
+        )
+    return _controller
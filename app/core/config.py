@@ -19,20 +19,169 @@ class Settings(BaseSettings):
     # Vector DB
     QDRANT_URL: str
     QDRANT_API_KEY: Optional[str] = None
+    # Scalar quantization of new collections: None or "int8". Searches
+    # rescore QDRANT_RESCORE_OVERSAMPLING times the limit with the originals
+    QDRANT_QUANTIZATION: Optional[str] = None
+    QDRANT_RESCORE_OVERSAMPLING: float = 2.0
+    # "qdrant", "pgvector" for chunks in Postgres, or "local" for the
+    # in-process NumPy index
+    VECTOR_STORE_BACKEND: str = "qdrant"
+    VECTOR_SIZE: int = 1536
+    # Directory of the local index, kept in memory when unset
+    LOCAL_VECTOR_STORE_PATH: Optional[str] = None
+    LOCAL_VECTOR_STORE_SEGMENT_SIZE: int = 16384
+    # Compact once this share of the local index's rows is deleted
+    LOCAL_VECTOR_STORE_COMPACT_RATIO: float = 0.3
+    # In-memory codes of the local index: "float32", "float16" or "int8",
+    # optionally truncated to the leading dimensions of Matryoshka-style
+    # embeddings. With a path, the best LOCAL_VECTOR_STORE_OVERSAMPLING
+    # times the limit are rescored exactly from the files on disk
+    LOCAL_VECTOR_STORE_DTYPE: str = "float32"
+    LOCAL_VECTOR_STORE_DIMENSIONS: Optional[int] = None
+    LOCAL_VECTOR_STORE_OVERSAMPLING: float = 4.0
+    # Scanning float16 codes takes 6-7x as long as float32. Indexes of up
+    # to this many rows can score them from a float32 copy instead, which
+    # costs more memory than float32 alone; off by default
+    LOCAL_VECTOR_STORE_WORKING_COPY_ROWS: int = 0
+    # pgvector index the migration built, "hnsw" or "ivfflat", and its
+    # search-time recall setting
+    PGVECTOR_INDEX: str = "hnsw"
+    PGVECTOR_HNSW_EF_SEARCH: int = 40
+    PGVECTOR_IVFFLAT_PROBES: int = 10
+    PGVECTOR_COPY_BATCH_SIZE: int = 1000
     
     # OpenAI
     OPENAI_API_KEY: str
     EMBEDDING_MODEL: str = "text-embedding-ada-002"
     LLM_MODEL: str = "gpt-3.5-turbo"
+    LLM_TEMPERATURE: float = 0.7
+    
+    # Model backends: "openai", or "fake" for offline load testing
+    LLM_BACKEND: str = "openai"
+    EMBEDDING_BACKEND: str = "openai"
+    
+    # Fake backends
+    FAKE_LLM_LATENCY_MS: float = 200.0
+    FAKE_LLM_LATENCY_DISTRIBUTION: str = "lognormal"
+    FAKE_LLM_LATENCY_SPREAD: float = 0.5
+    FAKE_LLM_TOKENS_PER_SECOND: float = 50.0
+    FAKE_LLM_RESPONSE_TOKENS: int = 64
+    FAKE_LLM_ERROR_RATE: float = 0.0
+    FAKE_LLM_SEED: Optional[int] = None
+    FAKE_EMBEDDING_LATENCY_MS: float = 20.0
+    FAKE_EMBEDDING_DIMENSIONS: int = 1536
+    
+    # Model API connection pool
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    LLM_HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    LLM_HTTP_TIMEOUT_SECONDS: float = 60.0
+    
+    # Model API retries and pacing
+    LLM_MAX_ATTEMPTS: int = 3
+    LLM_CALL_TIMEOUT_SECONDS: float = 60.0
+    # Start a duplicate call when the first is this slow, off when unset
+    LLM_HEDGE_AFTER_SECONDS: Optional[float] = None
+    LLM_RETRY_BASE_SECONDS: float = 0.5
+    LLM_RETRY_MAX_SECONDS: float = 8.0
+    LLM_RETRY_BUDGET_RATIO: float = 0.1
+    LLM_RETRY_BUDGET_MIN: float = 10.0
+    LLM_RATE_LIMIT_LOW_WATER: float = 0.1
     
     # LangSmith
     LANGSMITH_API_KEY: str
+    LANGSMITH_TRACING: bool = False
+    LANGSMITH_PROJECT: Optional[str] = None
+    
+    # OpenTelemetry tracing: "none", "console" or "otlp"
+    TRACING_EXPORTER: str = "none"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_SERVICE_NAME: str = "rag-chatbot"
+    
+    # Prometheus metrics served on /metrics
+    METRICS_ENABLED: bool = True
+    
+    # Readiness probes on /health/ready
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 1.0
+    HEALTH_CACHE_SECONDS: float = 5.0
+    HEALTH_CHECK_MODEL_PROVIDER: bool = True
+    
+    # Admission control for chat turns, per worker unless noted
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENT_TURNS: int = 32
+    ADMISSION_MAX_QUEUED_TURNS: int = 64
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    ADMISSION_MAX_TURNS_PER_USER: int = 2
+    ADMISSION_USER_RATE_PER_MINUTE: float = 30.0
+    ADMISSION_USER_BURST: int = 10
+    # Share per-user rate limits across workers
+    ADMISSION_REDIS_URL: Optional[str] = None
+    
+    # Retrieval and prompt context
+    RETRIEVAL_LIMIT: int = 8
+    CONTEXT_TOKEN_BUDGET: int = 1500
+    CONTEXT_DEDUP_THRESHOLD: float = 0.8
+    # Follow-ups skip the search when a previous chunk scores this well
+    CONTEXT_FOLLOW_UP_MIN_SCORE: float = 0.8
+    # Re-select the final chunks from RETRIEVAL_MMR_FETCH_K candidates by
+    # maximal marginal relevance; lambda 1.0 is pure relevance
+    RETRIEVAL_MMR_ENABLED: bool = False
+    RETRIEVAL_MMR_LAMBDA: float = 0.5
+    RETRIEVAL_MMR_FETCH_K: int = 32
+    # Optional joblib-pickled classifier for ambiguous follow-ups
+    RETRIEVAL_ROUTER_MODEL_PATH: Optional[str] = None
+    
+    # Request deadlines for chat turns
+    REQUEST_DEADLINE_SECONDS: float = 30.0
+    # Retrieval is skipped when less than this is left for it and generation
+    DEADLINE_RETRIEVAL_MIN_SECONDS: float = 5.0
     
     # Auth
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Expired session reaper
+    SESSION_REAPER_ENABLED: bool = True
+    SESSION_REAPER_INTERVAL_SECONDS: int = 300
+    SESSION_REAPER_BATCH_SIZE: int = 500
+    SESSION_REAPER_MAX_BATCHES: int = 20
+    
+    # Creates upcoming monthly messages partitions, independent of the reaper
+    MESSAGE_PARTITIONS_ENABLED: bool = True
+    MESSAGE_PARTITIONS_INTERVAL_SECONDS: int = 3600
+    
+    # In-process cache of active sessions' history, per worker
+    SESSION_CACHE_ENABLED: bool = True
+    SESSION_CACHE_MAX_SESSIONS: int = 1000
+    SESSION_CACHE_TTL_SECONDS: float = 300.0
+    SESSION_CACHE_MAX_MESSAGES: int = 50
+    # Earlier questions kept in the running summary of a long session
+    SESSION_SUMMARY_MAX_ITEMS: int = 20
+    # Drop sessions cached by other workers via Postgres LISTEN/NOTIFY;
+    # without it, other workers may serve stale history for up to the TTL
+    SESSION_CACHE_NOTIFY: bool = True
+    
+    # Persist chat graph state per session, so interrupted turns resume
+    GRAPH_CHECKPOINTS_ENABLED: bool = False
+    
+    # Documents uploaded to a session
+    DOCUMENT_MAX_BYTES: int = 5_000_000
+    DOCUMENT_CHUNK_SIZE: int = 1000
+    DOCUMENT_CHUNK_OVERLAP: int = 100
+    DOCUMENT_EMBEDDING_BATCH_SIZE: int = 100
+    # Small sessions' documents are indexed in memory, per worker; larger
+    # ones and the least recently used spill to the shared vector store
+    SESSION_INDEX_MAX_CHUNKS: int = 500
+    SESSION_INDEX_MAX_SESSIONS: int = 100
+    # Storage of in-memory session indexes: "float32", "float16" or "int8".
+    # float16 searches take 6-7x as long as float32. The
+    # SESSION_INDEX_WORKING_COPIES most recently used indexes can keep a
+    # float32 copy to score from, at more memory than float32 alone
+    SESSION_INDEX_DTYPE: str = "float32"
+    SESSION_INDEX_WORKING_COPIES: int = 0
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
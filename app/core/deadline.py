@@ -0,0 +1,97 @@
+import asyncio
+from time import monotonic
+from typing import Any, Awaitable, Dict, Optional, TypeVar
+
+from fastapi import Request
+from langchain_core.runnables import RunnableConfig
+
+from app.core.config import get_settings
+from app.core.errors import ClientDisconnectedError, DeadlineExceededError, ValidationError
+from app.core.metrics import TURN_INTERRUPTIONS
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+# Header a client can send to shorten the server's deadline, in seconds
+DEADLINE_HEADER = "X-Request-Timeout"
+
+
+class Deadline:
+    """Time budget of one request, shared by every step that serves it."""
+
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        self.expires_at = monotonic() + timeout
+
+    def remaining(self) -> float:
+        """Seconds left, never negative."""
+        return max(self.expires_at - monotonic(), 0.0)
+
+    def allows(self, seconds: float) -> bool:
+        """Whether at least `seconds` are left."""
+        return self.remaining() >= seconds
+
+    def check(self, stage: str) -> None:
+        """Raise `DeadlineExceededError` if no time is left before `stage`."""
+        if self.remaining() <= 0:
+            TURN_INTERRUPTIONS.labels(stage, "deadline").inc()
+            raise DeadlineExceededError(f"Request deadline exceeded before {stage}")
+
+    async def run(self, awaitable: Awaitable[T], stage: str) -> T:
+        """Await `awaitable`, cancelling it when the deadline passes."""
+        self.check(stage)
+        try:
+            return await asyncio.wait_for(awaitable, self.remaining())
+        except asyncio.TimeoutError:
+            TURN_INTERRUPTIONS.labels(stage, "deadline").inc()
+            raise DeadlineExceededError(f"Request deadline exceeded during {stage}")
+
+
+def request_deadline(request: Request) -> Deadline:
+    """Dependency starting a request's deadline.
+
+    Clients may shorten `REQUEST_DEADLINE_SECONDS` with the
+    `X-Request-Timeout` header so work stops once they would give up.
+    """
+    timeout = settings.REQUEST_DEADLINE_SECONDS
+    header = request.headers.get(DEADLINE_HEADER)
+    if header is not None:
+        try:
+            requested = float(header)
+        except ValueError:
+            raise ValidationError(f"Invalid {DEADLINE_HEADER} header")
+        if requested <= 0:
+            raise ValidationError(f"{DEADLINE_HEADER} must be positive")
+        timeout = min(timeout, requested)
+    return Deadline(timeout)
+
+
+def get_deadline(config: Optional[RunnableConfig]) -> Optional[Deadline]:
+    """Get the request's deadline from a graph run config, if any."""
+    configurable: Dict[str, Any] = (config or {}).get("configurable", {})
+    return configurable.get("deadline")
+
+
+async def cancel_on_disconnect(
+    request: Request,
+    awaitable: Awaitable[T],
+    stage: str,
+    poll_interval: float = 0.25
+) -> T:
+    """Await `awaitable`, cancelling it if the client goes away.
+
+    Cancellation propagates into in-flight upstream calls, so an abandoned
+    turn stops spending model tokens.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                TURN_INTERRUPTIONS.labels(stage, "disconnect").inc()
+                raise ClientDisconnectedError("Client closed request")
+    finally:
+        task.cancel()
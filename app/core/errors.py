@@ -36,3 +36,32 @@ class ValidationError(HTTPException):
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=detail
         )
+
+
+class OverloadedError(HTTPException):
+    """Request rejected to protect the service under load."""
+    def __init__(self, detail: str, retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+class DeadlineExceededError(HTTPException):
+    """Request ran out of time before it could be answered."""
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=detail
+        )
+
+
+class ClientDisconnectedError(HTTPException):
+    """Client went away before the response was ready."""
+    def __init__(self, detail: str):
+        super().__init__(
+            # Non-standard status used by nginx for the same situation
+            status_code=499,
+            detail=detail
+        )
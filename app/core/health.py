@@ -0,0 +1,138 @@
+import asyncio
+from time import monotonic, perf_counter
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import text
+
+from app.core.config import get_settings
+from app.db.database import async_session_factory
+from app.llm import get_http_client
+from app.vector_store.client import get_vector_store
+
+settings = get_settings()
+
+OPENAI_MODELS_URL = "https://api.openai.com/v1/models"
+
+Probe = Callable[[], Awaitable[None]]
+
+
+class ProbeResult(BaseModel):
+    """Outcome of probing one dependency."""
+    status: str
+    latency_ms: float
+    critical: bool
+    error: Optional[str] = None
+
+
+class HealthReport(BaseModel):
+    """Readiness of the worker and each of its dependencies."""
+    status: str
+    checks: Dict[str, ProbeResult]
+
+
+async def check_database() -> None:
+    """Run a trivial query on a pooled connection."""
+    async with async_session_factory() as db:
+        await db.execute(text("SELECT 1"))
+
+
+async def check_vector_store() -> None:
+    """Ping the worker's shared vector store."""
+    await get_vector_store().ping()
+
+
+async def check_model_provider() -> None:
+    """List models on the provider API, over the shared connection pool."""
+    if settings.LLM_BACKEND == "fake":
+        return
+    response = await get_http_client().get(
+        OPENAI_MODELS_URL,
+        headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"}
+    )
+    response.raise_for_status()
+
+
+class HealthChecker:
+    """Probes dependencies concurrently and caches the report briefly.
+
+    Every probe has its own timeout. Results are reused for `ttl` seconds,
+    and concurrent callers share one round of probes, so frequent load
+    balancer checks do not add load to a struggling dependency. Failing
+    non-critical probes are reported without making the worker unready.
+    """
+
+    def __init__(
+        self,
+        probes: Dict[str, Tuple[Probe, bool]],
+        timeout: float,
+        ttl: float
+    ) -> None:
+        self.probes = probes
+        self.timeout = timeout
+        self.ttl = ttl
+        self._report: Optional[HealthReport] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _probe(self, probe: Probe, critical: bool) -> ProbeResult:
+        start = perf_counter()
+        error = None
+        try:
+            await asyncio.wait_for(probe(), self.timeout)
+        except asyncio.TimeoutError:
+            error = f"timed out after {self.timeout}s"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        return ProbeResult(
+            status="ok" if error is None else "error",
+            latency_ms=(perf_counter() - start) * 1000,
+            critical=critical,
+            error=error
+        )
+
+    def _fresh(self) -> bool:
+        return self._report is not None and monotonic() - self._checked_at < self.ttl
+
+    async def check(self) -> HealthReport:
+        """Get the current report, probing dependencies when it is stale."""
+        if self._fresh():
+            return self._report
+        async with self._lock:
+            if self._fresh():
+                return self._report
+            names = list(self.probes)
+            results = await asyncio.gather(*(
+                self._probe(*self.probes[name]) for name in names
+            ))
+            checks = dict(zip(names, results))
+            ready = all(r.status == "ok" for r in results if r.critical)
+            self._report = HealthReport(
+                status="ready" if ready else "not_ready",
+                checks=checks
+            )
+            self._checked_at = monotonic()
+            return self._report
+
+
+_checker: Optional[HealthChecker] = None
+
+
+def get_health_checker() -> HealthChecker:
+    """Get the worker's health checker configured from settings."""
+    global _checker
+    if _checker is None:
+        probes: Dict[str, Tuple[Probe, bool]] = {
+            "database": (check_database, True),
+        }
+        probes[settings.VECTOR_STORE_BACKEND] = (check_vector_store, True)
+        if settings.HEALTH_CHECK_MODEL_PROVIDER:
+            # Provider outages hit every worker alike, so draining them
+            # all would not help
+            probes["model_provider"] = (check_model_provider, False)
+        _checker = HealthChecker(
+            probes,
+            timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS,
+            ttl=settings.HEALTH_CACHE_SECONDS
+        )
+    return _checker
@@ -0,0 +1,212 @@
+import os
+from time import perf_counter
+from typing import Iterator
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Buckets sized for API calls, from sub-millisecond lookups to slow LLM turns
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+    multiprocess_mode="livesum",
+)
+GRAPH_NODE_DURATION = Histogram(
+    "rag_graph_node_duration_seconds",
+    "Chat graph node latency",
+    ["node"],
+    buckets=LATENCY_BUCKETS,
+)
+
+GRAPH_RESUMES = Counter(
+    "rag_graph_resumes_total",
+    "Chat turns resumed from a graph checkpoint instead of restarting",
+)
+EMBEDDING_DURATION = Histogram(
+    "rag_embedding_duration_seconds",
+    "Embedding call latency",
+    ["backend"],
+    buckets=LATENCY_BUCKETS,
+)
+EMBEDDING_TOKENS = Counter(
+    "rag_embedding_tokens_total",
+    "Estimated tokens sent for embedding (characters / 4)",
+    ["backend"],
+)
+LLM_DURATION = Histogram(
+    "rag_llm_duration_seconds",
+    "LLM call latency",
+    ["model"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "rag_llm_tokens_total",
+    "LLM tokens reported by the provider",
+    ["model", "kind"],
+)
+MODEL_RETRIES = Counter(
+    "rag_model_retries_total",
+    "Model API retries and hedged calls, and retries denied by the budget",
+    ["api", "kind"],
+)
+MODEL_RATE_LIMIT_WAIT = Histogram(
+    "rag_model_rate_limit_wait_seconds",
+    "Time model API calls were held back by the client-side rate limiter",
+    ["api"],
+    buckets=LATENCY_BUCKETS,
+)
+RETRIEVAL_ROUTES = Counter(
+    "rag_retrieval_routes_total",
+    "Chat turns by retrieval decision: retrieve, reuse or skip",
+    ["route"],
+)
+FOLLOW_UP_CONTEXT = Counter(
+    "rag_follow_up_context_total",
+    "Retrievals seeded from the previous turn's chunks, or searched after a topic shift",
+    ["outcome"],
+)
+VECTOR_SEARCH_DURATION = Histogram(
+    "rag_vector_search_duration_seconds",
+    "Vector store search latency",
+    ["store"],
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "rag_cache_requests_total",
+    "Cache lookups by outcome; hit ratio is hit / (hit + miss)",
+    ["cache", "result"],
+)
+ADMISSION_REJECTIONS = Counter(
+    "rag_admission_rejections_total",
+    "Chat turns rejected by admission control",
+    ["reason"],
+)
+ADMISSION_QUEUED = Gauge(
+    "rag_admission_queued",
+    "Chat turns waiting for a concurrency slot",
+    multiprocess_mode="livesum",
+)
+TURN_INTERRUPTIONS = Counter(
+    "rag_turn_interruptions_total",
+    "Chat turn stages skipped or cut short by deadlines and disconnects",
+    ["stage", "reason"],
+)
+
+DOCUMENT_CHUNKS = Counter(
+    "rag_document_chunks_total",
+    "Uploaded document chunks indexed, by where they are stored",
+    ["store"],
+)
+SESSION_INDEX_SPILLS = Counter(
+    "rag_session_index_spills_total",
+    "Per-session in-memory indexes moved to the shared vector store",
+    ["reason"],
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count a cache lookup."""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+class DBPoolCollector(Collector):
+    """Reports connection pool usage when scraped, not on the hot path."""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        pool = self.engine.sync_engine.pool
+        gauge = GaugeMetricFamily(
+            "db_pool_connections",
+            "Database connection pool usage",
+            labels=["state"],
+        )
+        for state in ("size", "checkedin", "checkedout", "overflow"):
+            reader = getattr(pool, state, None)
+            if reader is not None:
+                gauge.add_metric([state], reader())
+        yield gauge
+
+
+_pool_collectors = {}
+
+
+def register_pool_collector(engine: AsyncEngine) -> None:
+    """Export pool usage for `engine` on /metrics."""
+    if id(engine) not in _pool_collectors:
+        collector = DBPoolCollector(engine)
+        REGISTRY.register(collector)
+        _pool_collectors[id(engine)] = collector
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Render all metrics in the Prometheus text format.
+
+    With several workers, set `PROMETHEUS_MULTIPROC_DIR` so every worker's
+    samples are aggregated.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """Records request latency per route template and in-flight requests.
+
+    Plain ASGI middleware, to keep per-request overhead low.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # The router stores the matched route on the scope, so routes
+            # with path parameters share one label
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"], route, str(status)
+            ).observe(perf_counter() - start)
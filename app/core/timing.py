@@ -0,0 +1,40 @@
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Awaitable, Dict, Iterator, Optional, TypeVar
+
+from langchain_core.runnables import RunnableConfig
+
+T = TypeVar("T")
+
+
+class StepTimings:
+    """Wall-clock durations of the steps of one request, in milliseconds."""
+
+    def __init__(self) -> None:
+        self.steps: Dict[str, float] = {}
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """Time the enclosed block under `name`."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = (perf_counter() - start) * 1000
+
+    async def timed(self, name: str, awaitable: Awaitable[T]) -> T:
+        """Await `awaitable` and record how long it took."""
+        with self.measure(name):
+            return await awaitable
+
+    def server_timing(self) -> str:
+        """Format the steps as a `Server-Timing` header value."""
+        return ", ".join(
+            f"{name};dur={duration:.1f}" for name, duration in self.steps.items()
+        )
+
+
+def get_timings(config: Optional[RunnableConfig]) -> Optional[StepTimings]:
+    """Get the request's step timings from a graph run config, if any."""
+    configurable: Dict[str, Any] = (config or {}).get("configurable", {})
+    return configurable.get("timings")
@@ -0,0 +1,156 @@
+import logging
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import get_settings
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.trace import Status, StatusCode
+except ImportError:  # pragma: no cover - tracing is optional
+    trace = None
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Longest SQL statement recorded on a span
+_MAX_STATEMENT_LENGTH = 500
+
+
+class NoopSpan:
+    """Stand-in span used when tracing is disabled."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException) -> None:
+        pass
+
+
+_NOOP_SPAN = NoopSpan()
+_tracer = None
+_provider = None
+
+
+def _clean(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    # OpenTelemetry only accepts primitive attribute values
+    return {
+        key: value if isinstance(value, (str, bool, int, float)) else str(value)
+        for key, value in attributes.items()
+        if value is not None
+    }
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Record the enclosed block as a span, or do nothing when disabled."""
+    if _tracer is None:
+        yield _NOOP_SPAN
+        return
+    with _tracer.start_as_current_span(name, attributes=_clean(attributes)) as current:
+        yield current
+
+
+def set_span_attributes(current: Any, **attributes: Any) -> None:
+    """Attach attributes, such as result sizes, to a span from `span()`."""
+    current.set_attributes(_clean(attributes))
+
+
+def setup_tracing(engine: Optional[AsyncEngine] = None) -> None:
+    """Configure span export from settings.
+
+    `TRACING_EXPORTER` is `none` (default), `console` or `otlp`. When
+    `LANGSMITH_TRACING` is set, LangChain runs are also sent to LangSmith.
+    """
+    global _tracer, _provider
+
+    if settings.LANGSMITH_TRACING:
+        os.environ.setdefault("LANGCHAIN_TRACING_V2", "true")
+        os.environ.setdefault("LANGCHAIN_API_KEY", settings.LANGSMITH_API_KEY)
+        if settings.LANGSMITH_PROJECT:
+            os.environ.setdefault("LANGCHAIN_PROJECT", settings.LANGSMITH_PROJECT)
+
+    if settings.TRACING_EXPORTER == "none":
+        return
+    if trace is None:
+        logger.warning("opentelemetry is not installed, tracing is disabled")
+        return
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    if settings.TRACING_EXPORTER == "console":
+        exporter = ConsoleSpanExporter()
+    elif settings.TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+    else:
+        raise ValueError(f"Unknown tracing exporter: {settings.TRACING_EXPORTER}")
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME})
+    )
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    _tracer = _provider.get_tracer("app")
+
+    if engine is not None:
+        instrument_engine(engine)
+
+
+def shutdown_tracing() -> None:
+    """Flush pending spans and stop recording."""
+    global _tracer, _provider
+    if _provider is not None:
+        _provider.shutdown()
+    _tracer = None
+    _provider = None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _tracer is None:
+        return
+    context._trace_span = _tracer.start_span(
+        "db.query",
+        attributes={
+            "db.system": "postgresql",
+            "db.statement": statement[:_MAX_STATEMENT_LENGTH],
+        }
+    )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    current = getattr(context, "_trace_span", None)
+    if current is None:
+        return
+    if cursor.rowcount is not None and cursor.rowcount >= 0:
+        current.set_attribute("db.rows", cursor.rowcount)
+    current.end()
+    context._trace_span = None
+
+
+def _handle_error(exception_context):
+    current = getattr(exception_context.execution_context, "_trace_span", None)
+    if current is None:
+        return
+    current.record_exception(exception_context.original_exception)
+    current.set_status(Status(StatusCode.ERROR))
+    current.end()
+    exception_context.execution_context._trace_span = None
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Record a span for every SQL statement executed on `engine`."""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
@@ -0,0 +1,319 @@
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_serializable_checkpoint_metadata,
+)
+from sqlalchemy import delete, not_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import get_settings
+from app.db.database import async_session_factory
+from app.db.models import GraphCheckpoint, GraphCheckpointBlob, GraphCheckpointWrite
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class PostgresCheckpointSaver(BaseCheckpointSaver):
+    """LangGraph checkpointer storing chat graph state in Postgres.
+
+    Runs on the application's async engine. Each step writes only the
+    channels it changed, and loading a thread reads its latest checkpoint
+    with just the channel versions that checkpoint refers to. When a new
+    turn starts, the thread's older checkpoints are pruned, so storage
+    stays bounded by the size of one turn. Only the async interface is
+    implemented.
+    """
+
+    def __init__(self, session_factory: sessionmaker = async_session_factory) -> None:
+        super().__init__()
+        self.session_factory = session_factory
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Load a thread's checkpoint, the latest unless one is requested."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        query = select(GraphCheckpoint).where(
+            GraphCheckpoint.thread_id == thread_id,
+            GraphCheckpoint.checkpoint_ns == checkpoint_ns
+        )
+        if checkpoint_id := get_checkpoint_id(config):
+            query = query.where(GraphCheckpoint.checkpoint_id == checkpoint_id)
+        else:
+            query = query.order_by(GraphCheckpoint.checkpoint_id.desc()).limit(1)
+
+        async with self.session_factory() as db:
+            row = (await db.execute(query)).scalar_one_or_none()
+            if row is None:
+                return None
+            return await self._load_tuple(db, row)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        """List a thread's checkpoints, newest first."""
+        query = select(GraphCheckpoint).order_by(GraphCheckpoint.checkpoint_id.desc())
+        if config is not None:
+            query = query.where(
+                GraphCheckpoint.thread_id == config["configurable"]["thread_id"],
+                GraphCheckpoint.checkpoint_ns == config["configurable"].get("checkpoint_ns", "")
+            )
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            query = query.where(GraphCheckpoint.checkpoint_id < before_id)
+
+        async with self.session_factory() as db:
+            rows = (await db.execute(query)).scalars().all()
+            yielded = 0
+            for row in rows:
+                checkpoint_tuple = await self._load_tuple(db, row)
+                if filter and any(
+                    checkpoint_tuple.metadata.get(key) != value
+                    for key, value in filter.items()
+                ):
+                    continue
+                yield checkpoint_tuple
+                yielded += 1
+                if limit is not None and yielded >= limit:
+                    return
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """Store a checkpoint and the channel values changed since the last one."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        values = checkpoint["channel_values"]
+        stored = {k: v for k, v in checkpoint.items() if k != "channel_values"}
+        checkpoint_type, checkpoint_blob = self.serde.dumps_typed(stored)
+        metadata_type, metadata_blob = self.serde.dumps_typed(
+            get_serializable_checkpoint_metadata(config, metadata)
+        )
+
+        async with self.session_factory() as db:
+            if new_versions:
+                blobs = []
+                for channel, version in new_versions.items():
+                    value_type, value = (
+                        self.serde.dumps_typed(values[channel])
+                        if channel in values else ("empty", None)
+                    )
+                    blobs.append({
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "channel": channel,
+                        "version": str(version),
+                        "type": value_type,
+                        "blob": value,
+                    })
+                await db.execute(
+                    insert(GraphCheckpointBlob).values(blobs).on_conflict_do_nothing()
+                )
+
+            row = {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+                "parent_checkpoint_id": config["configurable"].get("checkpoint_id"),
+                "type": checkpoint_type,
+                "checkpoint": checkpoint_blob,
+                "metadata_type": metadata_type,
+                "checkpoint_metadata": metadata_blob,
+            }
+            statement = insert(GraphCheckpoint).values(row)
+            await db.execute(statement.on_conflict_do_update(
+                index_elements=["thread_id", "checkpoint_ns", "checkpoint_id"],
+                set_={
+                    "type": statement.excluded.type,
+                    "checkpoint": statement.excluded.checkpoint,
+                    "metadata_type": statement.excluded.metadata_type,
+                    "metadata": statement.excluded.metadata,
+                }
+            ))
+
+            # A new turn supersedes everything the thread stored before
+            if metadata.get("source") == "input":
+                await self._prune(db, thread_id, checkpoint_ns, checkpoint)
+            await db.commit()
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        """Store the output of a finished step until the next checkpoint."""
+        if not writes:
+            return
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            value_type, blob = self.serde.dumps_typed(value)
+            rows.append({
+                "thread_id": config["configurable"]["thread_id"],
+                "checkpoint_ns": config["configurable"].get("checkpoint_ns", ""),
+                "checkpoint_id": config["configurable"]["checkpoint_id"],
+                "task_id": task_id,
+                "idx": WRITES_IDX_MAP.get(channel, idx),
+                "channel": channel,
+                "type": value_type,
+                "blob": blob,
+                "task_path": task_path,
+            })
+        statement = insert(GraphCheckpointWrite).values(rows)
+        # Regular writes are kept as first recorded, special ones replaced
+        if all(row["idx"] >= 0 for row in rows):
+            statement = statement.on_conflict_do_nothing()
+        else:
+            statement = statement.on_conflict_do_update(
+                index_elements=["thread_id", "checkpoint_ns", "checkpoint_id", "task_id", "idx"],
+                set_={
+                    "channel": statement.excluded.channel,
+                    "type": statement.excluded.type,
+                    "blob": statement.excluded.blob,
+                }
+            )
+        async with self.session_factory() as db:
+            await db.execute(statement)
+            await db.commit()
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """Delete everything stored for a thread."""
+        await self.delete_threads([thread_id])
+
+    async def delete_threads(self, thread_ids: List[str]) -> None:
+        """Delete everything stored for several threads at once."""
+        if not thread_ids:
+            return
+        async with self.session_factory() as db:
+            for model in (GraphCheckpointWrite, GraphCheckpointBlob, GraphCheckpoint):
+                await db.execute(delete(model).where(model.thread_id.in_(thread_ids)))
+            await db.commit()
+
+    async def _load_tuple(self, db: AsyncSession, row: GraphCheckpoint) -> CheckpointTuple:
+        """Rebuild a checkpoint from its row, channel values and pending writes."""
+        checkpoint = self.serde.loads_typed((row.type, row.checkpoint))
+        versions = [
+            (channel, str(version))
+            for channel, version in checkpoint["channel_versions"].items()
+        ]
+        channel_values: Dict[str, Any] = {}
+        if versions:
+            blobs = await db.execute(
+                select(GraphCheckpointBlob.channel, GraphCheckpointBlob.type, GraphCheckpointBlob.blob)
+                .where(
+                    GraphCheckpointBlob.thread_id == row.thread_id,
+                    GraphCheckpointBlob.checkpoint_ns == row.checkpoint_ns,
+                    tuple_(GraphCheckpointBlob.channel, GraphCheckpointBlob.version).in_(versions)
+                )
+            )
+            channel_values = {
+                channel: self.serde.loads_typed((value_type, blob))
+                for channel, value_type, blob in blobs
+                if value_type != "empty"
+            }
+
+        writes = await db.execute(
+            select(GraphCheckpointWrite)
+            .where(
+                GraphCheckpointWrite.thread_id == row.thread_id,
+                GraphCheckpointWrite.checkpoint_ns == row.checkpoint_ns,
+                GraphCheckpointWrite.checkpoint_id == row.checkpoint_id
+            )
+            .order_by(GraphCheckpointWrite.task_id, GraphCheckpointWrite.idx)
+        )
+        pending_writes = [
+            (write.task_id, write.channel, self.serde.loads_typed((write.type, write.blob)))
+            for write in writes.scalars()
+        ]
+
+        parent_config = None
+        if row.parent_checkpoint_id:
+            parent_config = {
+                "configurable": {
+                    "thread_id": row.thread_id,
+                    "checkpoint_ns": row.checkpoint_ns,
+                    "checkpoint_id": row.parent_checkpoint_id,
+                }
+            }
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": row.thread_id,
+                    "checkpoint_ns": row.checkpoint_ns,
+                    "checkpoint_id": row.checkpoint_id,
+                }
+            },
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=self.serde.loads_typed((row.metadata_type, row.checkpoint_metadata)),
+            parent_config=parent_config,
+            pending_writes=pending_writes
+        )
+
+    async def _prune(
+        self,
+        db: AsyncSession,
+        thread_id: str,
+        checkpoint_ns: str,
+        checkpoint: Checkpoint
+    ) -> None:
+        """Drop checkpoints, writes and channel values older than `checkpoint`."""
+        for model in (GraphCheckpoint, GraphCheckpointWrite):
+            await db.execute(delete(model).where(
+                model.thread_id == thread_id,
+                model.checkpoint_ns == checkpoint_ns,
+                model.checkpoint_id < checkpoint["id"]
+            ))
+        versions = [
+            (channel, str(version))
+            for channel, version in checkpoint["channel_versions"].items()
+        ]
+        blobs = delete(GraphCheckpointBlob).where(
+            GraphCheckpointBlob.thread_id == thread_id,
+            GraphCheckpointBlob.checkpoint_ns == checkpoint_ns
+        )
+        if versions:
+            blobs = blobs.where(not_(
+                tuple_(GraphCheckpointBlob.channel, GraphCheckpointBlob.version).in_(versions)
+            ))
+        await db.execute(blobs)
+
+
+_checkpointer: Optional[PostgresCheckpointSaver] = None
+
+
+def get_checkpointer() -> Optional[PostgresCheckpointSaver]:
+    """Get the chat graph checkpointer, or None when checkpoints are off."""
+    global _checkpointer
+    if not settings.GRAPH_CHECKPOINTS_ENABLED:
+        return None
+    if _checkpointer is None:
+        _checkpointer = PostgresCheckpointSaver()
+    return _checkpointer
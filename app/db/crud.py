@@ -1,11 +1,13 @@
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import NamedTuple, Optional, List, Tuple
 from uuid import UUID
-from sqlalchemy import select
+from sqlalchemy import delete, func, select, true, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import Select
 
 from app.db.models import User, Session, Message
+from app.db.pagination import Keyset
+from app.db.schemas import ChatSessionCreate
 
 
 async def get_user_by_username(
@@ -53,6 +55,103 @@ async def create_session(
     return session
 
 
+async def create_chat_session(
+    db: AsyncSession,
+    user_id: UUID,
+    session_data: ChatSessionCreate
+) -> Session:
+    """Create a new chat session from API input."""
+    return await create_session(db, user_id, session_data.title)
+
+
+async def get_chat_session(
+    db: AsyncSession,
+    session_id: UUID
+) -> Optional[Session]:
+    """Get a chat session by id."""
+    query = select(Session).where(Session.id == session_id)
+    result = await db.execute(query)
+    return result.scalar_one_or_none()
+
+
+class SessionRow(NamedTuple):
+    """Session columns needed to run a chat turn."""
+    id: UUID
+    user_id: UUID
+    created_at: datetime
+    expires_at: datetime
+
+
+class MessageRow(NamedTuple):
+    """Message columns needed to rebuild chat history."""
+    id: UUID
+    role: str
+    content: str
+    context_chunks: Optional[str]
+
+
+async def get_turn_bootstrap(
+    db: AsyncSession,
+    session_id: UUID,
+    user_id: UUID,
+    limit: int = 50
+) -> Optional[Tuple[SessionRow, List[MessageRow]]]:
+    """Check a user owns a session and load its latest messages in one query.
+    
+    A lateral join fetches the `limit` most recent messages alongside the
+    session row, as plain tuples rather than ORM objects. Returns None when
+    the session doesn't exist or belongs to someone else; messages are
+    oldest first.
+    """
+    recent = (
+        select(Message.id, Message.role, Message.content, Message.context_chunks, Message.created_at)
+        .where(
+            Message.session_id == Session.id,
+            # Lets Postgres prune message partitions older than the session
+            Message.created_at >= Session.created_at
+        )
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(limit)
+        .lateral("recent")
+    )
+    query = (
+        select(
+            Session.id, Session.user_id, Session.created_at, Session.expires_at,
+            recent.c.id, recent.c.role, recent.c.content, recent.c.context_chunks
+        )
+        .outerjoin(recent, true())
+        .where(Session.id == session_id, Session.user_id == user_id)
+        .order_by(recent.c.created_at, recent.c.id)
+    )
+    rows = (await db.execute(query)).all()
+    if not rows:
+        return None
+    session = SessionRow(*rows[0][:4])
+    messages = [MessageRow(*row[4:]) for row in rows if row[4] is not None]
+    return session, messages
+
+
+async def get_user_chat_sessions(
+    db: AsyncSession,
+    user_id: UUID,
+    limit: int = 20,
+    after: Optional[Keyset] = None
+) -> List[Session]:
+    """Get a page of a user's sessions, most recently updated first.
+
+    Uses keyset pagination on `(updated_at, id)` so each page is a single
+    index range scan regardless of how deep the client has paged.
+    """
+    query = select(Session).where(Session.user_id == user_id)
+    if after is not None:
+        query = query.where(tuple_(Session.updated_at, Session.id) < after)
+    query = query.order_by(
+        Session.updated_at.desc(), Session.id.desc()
+    ).limit(limit)
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
 async def get_active_session(
     db: AsyncSession,
     session_id: UUID,
@@ -94,14 +193,86 @@ async def create_message(
 async def get_session_messages(
     db: AsyncSession,
     session_id: UUID,
-    limit: int = 50
+    limit: int = 50,
+    since: Optional[datetime] = None
+) -> List[Message]:
+    """Get the latest `limit` messages of a session, oldest first.
+    
+    Pass the session's `created_at` as `since` so Postgres only scans the
+    message partitions that can hold the session's messages.
+    """
+    query = select(Message).where(Message.session_id == session_id)
+    if since is not None:
+        query = query.where(Message.created_at >= since)
+    query = query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit)
+    result = await db.execute(query)
+    return list(reversed(result.scalars().all()))
+
+
+async def get_session_messages_page(
+    db: AsyncSession,
+    session_id: UUID,
+    limit: int = 50,
+    after: Optional[Keyset] = None,
+    since: Optional[datetime] = None
 ) -> List[Message]:
-    """Get messages for a session, ordered by creation time."""
+    """Get a page of session messages in chronological order.
+
+    Uses keyset pagination on `(created_at, id)`. `since` bounds the scan
+    to partitions at or after the session's creation.
+    """
+    query = select(Message).where(Message.session_id == session_id)
+    if since is not None:
+        query = query.where(Message.created_at >= since)
+    if after is not None:
+        query = query.where(tuple_(Message.created_at, Message.id) > after)
+    query = query.order_by(Message.created_at, Message.id).limit(limit)
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def get_expired_session_ids(
+    db: AsyncSession,
+    now: datetime,
+    limit: int = 500
+) -> List[UUID]:
+    """Get ids of sessions that expired before `now`, oldest first."""
     query = (
-        select(Message)
-        .where(Message.session_id == session_id)
-        .order_by(Message.created_at)
+        select(Session.id)
+        .where(Session.expires_at <= now)
+        .order_by(Session.expires_at)
         .limit(limit)
     )
     result = await db.execute(query)
     return list(result.scalars().all())
+
+
+async def delete_sessions(
+    db: AsyncSession,
+    session_ids: List[UUID]
+) -> Tuple[int, int]:
+    """Bulk delete sessions and their messages.
+    
+    Returns the number of deleted sessions and messages.
+    """
+    if not session_ids:
+        return 0, 0
+    
+    # Messages can't predate their session, which lets Postgres skip
+    # partitions older than the oldest session being deleted
+    oldest = (
+        select(func.min(Session.created_at))
+        .where(Session.id.in_(session_ids))
+        .scalar_subquery()
+    )
+    messages = await db.execute(
+        delete(Message).where(
+            Message.session_id.in_(session_ids),
+            Message.created_at >= oldest
+        )
+    )
+    sessions = await db.execute(
+        delete(Session).where(Session.id.in_(session_ids))
+    )
+    await db.commit()
+    return sessions.rowcount, messages.rowcount
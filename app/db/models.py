@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Text, String, DateTime, ForeignKey
+from sqlalchemy import DDL, Integer, LargeBinary, Text, String, DateTime, ForeignKey, Index, event
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from uuid import UUID, uuid4
 
@@ -33,6 +33,10 @@ class Session(Base):
     """Chat session model."""
     
     __tablename__ = "sessions"
+    __table_args__ = (
+        # Keyset pagination of a user's sessions by recency
+        Index("ix_sessions_user_id_updated_at_id", "user_id", "updated_at", "id"),
+    )
     
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id"))
@@ -43,7 +47,9 @@ class Session(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
-    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, index=True
+    )
     
     # Relationships
     user: Mapped[User] = relationship(back_populates="sessions")
@@ -56,13 +62,20 @@ class Message(Base):
     """Chat message model."""
     
     __tablename__ = "messages"
+    __table_args__ = (
+        # History reads and keyset pagination by session in chronological order
+        Index("ix_messages_session_id_created_at_id", "session_id", "created_at", "id"),
+        # Monthly range partitions, see app.db.partitions
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     session_id: Mapped[UUID] = mapped_column(ForeignKey("sessions.id"))
     role: Mapped[str] = mapped_column(String(20))  # user, assistant, or system
     content: Mapped[str] = mapped_column(Text)
+    # Part of the primary key because it is the partition key
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow, nullable=False
+        DateTime, primary_key=True, default=datetime.utcnow, nullable=False
     )
     
     # Optional metadata for RAG
@@ -70,3 +83,64 @@ class Message(Base):
     
     # Relationships
     session: Mapped[Session] = relationship(back_populates="messages")
+
+
+class GraphCheckpoint(Base):
+    """Chat graph state after a step, see app.db.checkpoints.
+    
+    Channel values are stored separately in `graph_checkpoint_blobs`, so
+    a step only writes the channels it changed.
+    """
+    
+    __tablename__ = "graph_checkpoints"
+    
+    thread_id: Mapped[str] = mapped_column(Text, primary_key=True)
+    checkpoint_ns: Mapped[str] = mapped_column(Text, primary_key=True, default="")
+    # Monotonically increasing, the latest checkpoint sorts last
+    checkpoint_id: Mapped[str] = mapped_column(Text, primary_key=True)
+    parent_checkpoint_id: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    type: Mapped[str] = mapped_column(Text)
+    checkpoint: Mapped[bytes] = mapped_column(LargeBinary)
+    metadata_type: Mapped[str] = mapped_column(Text)
+    checkpoint_metadata: Mapped[bytes] = mapped_column("metadata", LargeBinary)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+
+
+class GraphCheckpointBlob(Base):
+    """Value of one graph state channel at one version."""
+    
+    __tablename__ = "graph_checkpoint_blobs"
+    
+    thread_id: Mapped[str] = mapped_column(Text, primary_key=True)
+    checkpoint_ns: Mapped[str] = mapped_column(Text, primary_key=True, default="")
+    channel: Mapped[str] = mapped_column(Text, primary_key=True)
+    version: Mapped[str] = mapped_column(Text, primary_key=True)
+    type: Mapped[str] = mapped_column(Text)
+    blob: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+
+
+class GraphCheckpointWrite(Base):
+    """Output of a graph step that finished before its checkpoint was taken."""
+    
+    __tablename__ = "graph_checkpoint_writes"
+    
+    thread_id: Mapped[str] = mapped_column(Text, primary_key=True)
+    checkpoint_ns: Mapped[str] = mapped_column(Text, primary_key=True, default="")
+    checkpoint_id: Mapped[str] = mapped_column(Text, primary_key=True)
+    task_id: Mapped[str] = mapped_column(Text, primary_key=True)
+    idx: Mapped[int] = mapped_column(Integer, primary_key=True)
+    channel: Mapped[str] = mapped_column(Text)
+    type: Mapped[str] = mapped_column(Text)
+    blob: Mapped[bytes] = mapped_column(LargeBinary)
+    task_path: Mapped[str] = mapped_column(Text, default="")
+
+
+# Catch-all partition so tables created from metadata accept rows before
+# any monthly partitions exist
+event.listen(
+    Message.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS messages_default PARTITION OF messages DEFAULT")
+)
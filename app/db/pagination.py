@@ -0,0 +1,38 @@
+import base64
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence, Tuple, TypeVar
+from uuid import UUID
+
+T = TypeVar("T")
+
+# Keyset position: the ordering timestamp and the row id as tie-breaker
+Keyset = Tuple[datetime, UUID]
+
+
+def encode_cursor(timestamp: datetime, row_id: UUID) -> str:
+    """Encode a keyset position as an opaque URL-safe cursor."""
+    raw = f"{timestamp.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Keyset:
+    """Decode a cursor produced by `encode_cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(timestamp), UUID(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {str(e)}")
+
+
+def paginate(
+    rows: Sequence[T],
+    limit: int,
+    key: Callable[[T], Keyset]
+) -> Tuple[List[T], Optional[str]]:
+    """Split a `limit + 1` row fetch into a page and the next cursor."""
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit and items:
+        next_cursor = encode_cursor(*key(items[-1]))
+    return items, next_cursor
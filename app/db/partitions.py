@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.database import async_session_factory
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Partitions created ahead of the current month
+MONTHS_AHEAD = 3
+
+# Catches rows of months without a partition of their own
+DEFAULT_PARTITION = "messages_default"
+
+
+def month_start(value: datetime) -> datetime:
+    """Get the first instant of the month containing `value`."""
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    """Shift a month start by a number of months."""
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def message_partition_name(month: datetime) -> str:
+    """Get the name of the messages partition for a month."""
+    return f"messages_y{month.year}m{month.month:02d}"
+
+
+async def ensure_message_partitions(
+    db: AsyncSession,
+    months_ahead: int = MONTHS_AHEAD,
+    now: Optional[datetime] = None
+) -> List[str]:
+    """Create monthly messages partitions up to `months_ahead` months out.
+
+    Partitions must exist before rows for that month arrive, otherwise the
+    rows land in the default partition and history reads for them can no
+    longer be pruned. Each month is created in its own transaction, and a
+    month that fails is logged and retried on the next run. Returns the
+    names of the partitions that were created.
+    """
+    current = month_start(now or datetime.utcnow())
+    result = await db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = 'messages'"
+        )
+    )
+    existing = set(result.scalars().all())
+    await db.commit()
+
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        name = message_partition_name(month)
+        if name in existing:
+            continue
+        try:
+            moved = await _create_month_partition(db, month, DEFAULT_PARTITION in existing)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Creating messages partition {name} failed: {str(e)}")
+            continue
+        created.append(name)
+        if moved:
+            logger.warning("Moved %d messages from %s to %s", moved, DEFAULT_PARTITION, name)
+
+    if created:
+        logger.info("Created messages partitions: %s", ", ".join(created))
+    return created
+
+
+async def _create_month_partition(db: AsyncSession, month: datetime, has_default: bool) -> int:
+    """Create a month's partition, moving its rows out of the default one.
+
+    Postgres refuses to create a partition while the default partition
+    holds rows in its range, so the default partition is detached, its
+    rows for the month are moved, and it is attached again, all in the
+    caller's transaction. Returns the number of rows moved.
+    """
+    name = message_partition_name(month)
+    bounds = {"lower": month, "upper": add_months(month, 1)}
+    in_month = "created_at >= :lower AND created_at < :upper"
+    stray = 0
+    if has_default:
+        stray = await db.scalar(
+            text(f"SELECT count(*) FROM {DEFAULT_PARTITION} WHERE {in_month}"), bounds
+        )
+    if stray:
+        await db.execute(text(f"ALTER TABLE messages DETACH PARTITION {DEFAULT_PARTITION}"))
+
+    await db.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF messages "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{bounds['upper']:%Y-%m-%d}')"
+        )
+    )
+
+    if stray:
+        await db.execute(
+            text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_month}"), bounds
+        )
+        await db.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_month}"), bounds)
+        await db.execute(
+            text(f"ALTER TABLE messages ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT")
+        )
+    return stray
+
+
+async def run_partition_maintenance(interval_seconds: Optional[int] = None) -> None:
+    """Periodically create upcoming messages partitions until cancelled."""
+    interval_seconds = interval_seconds or settings.MESSAGE_PARTITIONS_INTERVAL_SECONDS
+
+    while True:
+        try:
+            async with async_session_factory() as db:
+                await ensure_message_partitions(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Messages partition maintenance failed: {str(e)}")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.core.config import get_settings
+from app.db import crud
+from app.db.checkpoints import get_checkpointer
+from app.db.database import async_session_factory
+from app.db.session_cache import get_session_cache
+from app.vector_store import BaseVectorStore, get_vector_store
+from app.vector_store.session_index import get_session_indexes
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class ReapStats(BaseModel):
+    """Counts reclaimed by a reaper sweep."""
+    batches: int = 0
+    sessions: int = 0
+    messages: int = 0
+    vectors: int = 0
+
+
+async def reap_expired_sessions(
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+    vector_store: Optional[BaseVectorStore] = None
+) -> ReapStats:
+    """Delete expired sessions with their messages and vectors.
+
+    Works in bounded batches so a large backlog never holds long locks or
+    builds huge delete statements. Vectors are deleted before rows, so a
+    failed vector delete leaves the session in place to be retried on the
+    next sweep instead of orphaning its points.
+    """
+    batch_size = batch_size or settings.SESSION_REAPER_BATCH_SIZE
+    max_batches = max_batches or settings.SESSION_REAPER_MAX_BATCHES
+    vector_store = vector_store or get_vector_store()
+    stats = ReapStats()
+    now = datetime.utcnow()
+
+    while stats.batches < max_batches:
+        async with async_session_factory() as db:
+            session_ids = await crud.get_expired_session_ids(
+                db, now, limit=batch_size
+            )
+            if not session_ids:
+                break
+
+            stats.vectors += await vector_store.delete_by_sessions(session_ids)
+            sessions, messages = await crud.delete_sessions(db, session_ids)
+            get_session_cache().invalidate(session_ids)
+            get_session_indexes().drop(session_ids)
+            checkpointer = get_checkpointer()
+            if checkpointer is not None:
+                await checkpointer.delete_threads([str(s) for s in session_ids])
+
+        stats.batches += 1
+        stats.sessions += sessions
+        stats.messages += messages
+
+        if len(session_ids) < batch_size:
+            break
+
+    if stats.sessions:
+        logger.info(
+            "Reaped %d expired sessions (%d messages, %d vectors) in %d batches",
+            stats.sessions, stats.messages, stats.vectors, stats.batches
+        )
+    return stats
+
+
+async def run_session_reaper(interval_seconds: Optional[int] = None) -> None:
+    """Periodically reap expired sessions until cancelled.
+
+    Each sweep also drops this worker's document indexes of expired
+    sessions.
+    """
+    interval_seconds = interval_seconds or settings.SESSION_REAPER_INTERVAL_SECONDS
+    vector_store = get_vector_store()
+
+    while True:
+        try:
+            get_session_indexes().drop_expired()
+            await reap_expired_sessions(vector_store=vector_store)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Session reaper sweep failed: {str(e)}")
+        await asyncio.sleep(interval_seconds)
@@ -74,3 +74,42 @@ class ChatSessionResponse(SessionResponse):
 
     class Config:
         from_attributes = True
+
+
+class ChatSessionCreate(SessionBase):
+    """Schema for creating a chat session via the API."""
+    pass
+
+
+class ChatSession(SessionResponse):
+    """Schema for a chat session returned by the API."""
+    pass
+
+
+class ChatSessionPage(BaseModel):
+    """Schema for a keyset-paginated page of chat sessions."""
+    items: List[ChatSession]
+    next_cursor: Optional[str] = None
+
+
+class MessagePage(BaseModel):
+    """Schema for a keyset-paginated page of messages."""
+    items: List[MessageResponse]
+    next_cursor: Optional[str] = None
+
+
+class ChatMessage(BaseModel):
+    """Schema for a user message sent to a chat session."""
+    content: str
+
+
+class ChatResponse(BaseModel):
+    """Schema for the assistant reply to a chat message."""
+    message: str
+
+
+class DocumentUploadResponse(BaseModel):
+    """Schema for an accepted document upload, indexed in the background."""
+    filename: str
+    size: int
+    status: str = "processing"
@@ -0,0 +1,226 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from time import monotonic
+from typing import Iterable, List, Optional
+from uuid import UUID, uuid4
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.metrics import record_cache
+from app.db.crud import MessageRow, SessionRow
+from app.rag.context import ChunkRef, decode_chunk_refs
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Postgres channel used to drop cached sessions on other workers
+NOTIFY_CHANNEL = "session_state"
+
+# Longest earlier question kept in a running summary
+_SUMMARY_QUESTION_CHARS = 200
+
+# Identifies this worker's own notifications
+_worker_id = uuid4().hex
+
+
+class SessionState:
+    """Prepared state of an active chat session.
+
+    Holds what a turn needs without touching Postgres: the session owner
+    and bounds, the recent message window as LangChain messages, the
+    chunks behind the last reply and a running summary of older turns.
+    `version` counts the times it was cached, to detect concurrent turns.
+    """
+
+    def __init__(
+        self,
+        session_id: UUID,
+        user_id: UUID,
+        created_at: datetime,
+        expires_at: datetime,
+        messages: List[BaseMessage],
+        previous_chunks: List[ChunkRef],
+        summary: str = "",
+        version: int = 0
+    ) -> None:
+        self.session_id = session_id
+        self.user_id = user_id
+        self.created_at = created_at
+        self.expires_at = expires_at
+        self.messages = messages
+        self.previous_chunks = previous_chunks
+        self.summary = summary
+        self.version = version
+
+    @classmethod
+    def from_rows(cls, session: SessionRow, messages: List[MessageRow]) -> "SessionState":
+        """Build the state from a session row and its latest messages."""
+        previous_chunks = next(
+            (m.context_chunks for m in reversed(messages) if m.role == "assistant"),
+            None
+        )
+        return cls(
+            session_id=session.id,
+            user_id=session.user_id,
+            created_at=session.created_at,
+            expires_at=session.expires_at,
+            messages=[
+                HumanMessage(content=m.content) if m.role == "user"
+                else AIMessage(content=m.content)
+                for m in messages
+            ],
+            previous_chunks=decode_chunk_refs(previous_chunks)
+        )
+
+    def copy(self) -> "SessionState":
+        """Copy the state, so a turn can change it without affecting others."""
+        return SessionState(
+            session_id=self.session_id,
+            user_id=self.user_id,
+            created_at=self.created_at,
+            expires_at=self.expires_at,
+            messages=list(self.messages),
+            previous_chunks=list(self.previous_chunks),
+            summary=self.summary,
+            version=self.version
+        )
+
+    def append(self, messages: Iterable[BaseMessage], max_messages: int) -> None:
+        """Add messages, folding those that leave the window into the summary."""
+        self.messages.extend(messages)
+        overflow = len(self.messages) - max_messages
+        if overflow <= 0:
+            return
+        dropped, self.messages = self.messages[:overflow], self.messages[overflow:]
+        questions = [
+            f"- {m.content[:_SUMMARY_QUESTION_CHARS]}"
+            for m in dropped
+            if isinstance(m, HumanMessage)
+        ]
+        lines = self.summary.splitlines() + questions
+        self.summary = "\n".join(lines[-settings.SESSION_SUMMARY_MAX_ITEMS:])
+
+
+class SessionStateCache:
+    """LRU cache of session states, bounded in size and age.
+
+    `get` hands out copies. A state put back after another turn on the
+    same session already replaced it drops the entry instead, so neither
+    turn's history is lost from a later read.
+    """
+
+    def __init__(self, max_sessions: int, ttl_seconds: float) -> None:
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[UUID, tuple[float, SessionState]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, session_id: UUID) -> Optional[SessionState]:
+        """Get a copy of a fresh, unexpired state, or None."""
+        entry = self._entries.get(session_id)
+        state = None
+        if entry is not None:
+            cached_at, cached = entry
+            if (
+                monotonic() - cached_at < self.ttl_seconds
+                and cached.expires_at > datetime.utcnow()
+            ):
+                self._entries.move_to_end(session_id)
+                state = cached.copy()
+            else:
+                del self._entries[session_id]
+        record_cache("session_state", state is not None)
+        return state
+
+    def put(self, state: SessionState) -> None:
+        """Store or refresh a state, evicting the least recently used."""
+        entry = self._entries.get(state.session_id)
+        if entry is not None and entry[1].version != state.version:
+            del self._entries[state.session_id]
+            return
+        state.version += 1
+        self._entries[state.session_id] = (monotonic(), state)
+        self._entries.move_to_end(state.session_id)
+        while len(self._entries) > self.max_sessions:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, session_ids: Iterable[UUID]) -> None:
+        """Drop cached states, e.g. after their sessions were deleted."""
+        for session_id in session_ids:
+            self._entries.pop(session_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_cache: Optional[SessionStateCache] = None
+
+
+def get_session_cache() -> SessionStateCache:
+    """Get the worker's session state cache."""
+    global _cache
+    if _cache is None:
+        _cache = SessionStateCache(
+            settings.SESSION_CACHE_MAX_SESSIONS,
+            settings.SESSION_CACHE_TTL_SECONDS
+        )
+    return _cache
+
+
+async def notify_session_changes(db: AsyncSession, session_ids: Iterable[UUID]) -> None:
+    """Ask other workers to drop their cached copies of these sessions.
+
+    Sent with `db`'s transaction, so nothing is announced unless it commits.
+    """
+    if not settings.SESSION_CACHE_NOTIFY:
+        return
+    for session_id in session_ids:
+        await db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": NOTIFY_CHANNEL, "payload": f"{_worker_id}:{session_id}"}
+        )
+
+
+def _on_notification(connection, pid, channel, payload: str) -> None:
+    worker_id, _, session_id = payload.partition(":")
+    if worker_id == _worker_id:
+        return
+    try:
+        get_session_cache().invalidate([UUID(session_id)])
+    except ValueError:
+        logger.warning(f"Ignoring malformed session notification: {payload}")
+
+
+async def listen_for_session_changes() -> None:
+    """Drop sessions changed by other workers until cancelled.
+
+    Holds one dedicated asyncpg connection, reconnecting after failures.
+    The cache is cleared on reconnect since notifications may have been
+    missed.
+    """
+    import asyncpg
+
+    dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+    while True:
+        connection = None
+        try:
+            connection = await asyncpg.connect(dsn)
+            await connection.add_listener(NOTIFY_CHANNEL, _on_notification)
+            get_session_cache().clear()
+            while not connection.is_closed():
+                await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Session cache listener failed: {str(e)}")
+        finally:
+            if connection is not None and not connection.is_closed():
+                await connection.close()
+        await asyncio.sleep(5)
@@ -133,5 +133,59 @@ def verify() -> None:
         raise typer.Exit(1)
 
 
+@cli.command()
+def reap(
+    batch_size: int = typer.Option(
+        settings.SESSION_REAPER_BATCH_SIZE,
+        "--batch-size",
+        "-b",
+        help="Number of expired sessions deleted per batch"
+    ),
+    max_batches: int = typer.Option(
+        settings.SESSION_REAPER_MAX_BATCHES,
+        "--max-batches",
+        "-m",
+        help="Maximum number of batches to process"
+    )
+) -> None:
+    """Delete expired sessions, their messages and their vectors."""
+    from app.db.reaper import reap_expired_sessions
+    
+    try:
+        stats = asyncio.run(reap_expired_sessions(batch_size, max_batches))
+        logger.info(
+            "Reclaimed %d sessions, %d messages and %d vectors in %d batches",
+            stats.sessions, stats.messages, stats.vectors, stats.batches
+        )
+    except Exception as e:
+        logger.error(f"Session reaping failed: {str(e)}")
+        raise typer.Exit(1)
+
+
+@cli.command()
+def partitions(
+    months_ahead: int = typer.Option(
+        3,
+        "--months-ahead",
+        "-n",
+        help="Number of future months to create partitions for"
+    )
+) -> None:
+    """Create upcoming monthly partitions for the messages table."""
+    from app.db.database import async_session_factory
+    from app.db.partitions import ensure_message_partitions
+    
+    async def _partitions() -> None:
+        async with async_session_factory() as db:
+            created = await ensure_message_partitions(db, months_ahead)
+        logger.info("Created %d partitions", len(created))
+    
+    try:
+        asyncio.run(_partitions())
+    except Exception as e:
+        logger.error(f"Partition maintenance failed: {str(e)}")
+        raise typer.Exit(1)
+
+
 if __name__ == "__main__":
     cli()
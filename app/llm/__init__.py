@@ -0,0 +1,21 @@
+from .client import (
+    close_llm_clients,
+    get_chat_model,
+    get_fake_embeddings,
+    get_http_client,
+    get_openai_client
+)
+from .fake import FakeChatModel, FakeEmbeddings, InjectedFaultError
+from .ratelimit import call_model
+
+__all__ = [
+    "close_llm_clients",
+    "get_chat_model",
+    "get_fake_embeddings",
+    "get_http_client",
+    "get_openai_client",
+    "call_model",
+    "FakeChatModel",
+    "FakeEmbeddings",
+    "InjectedFaultError",
+]
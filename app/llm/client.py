@@ -0,0 +1,109 @@
+from typing import Dict, Optional, Tuple
+
+import httpx
+import openai
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_openai import ChatOpenAI
+
+from app.core.config import get_settings
+from app.core.metrics import record_cache
+from app.llm.fake import FakeChatModel, FakeEmbeddings
+from app.llm.ratelimit import observe_response
+
+settings = get_settings()
+
+# Supported values for LLM_BACKEND and EMBEDDING_BACKEND
+BACKENDS = ("openai", "fake")
+
+# App-scoped clients, created on first use and closed on shutdown
+_http_client: Optional[httpx.AsyncClient] = None
+_openai_client: Optional[openai.AsyncOpenAI] = None
+_chat_models: Dict[Tuple[str, float], BaseChatModel] = {}
+_fake_embeddings: Optional[FakeEmbeddings] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client used for model API calls.
+    
+    Keeping one pooled client lets turns reuse keep-alive connections to
+    the model endpoint instead of paying for TCP and TLS setup each time.
+    Responses feed the provider's rate limit headers to `app.llm.ratelimit`.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS
+            ),
+            timeout=httpx.Timeout(
+                settings.LLM_HTTP_TIMEOUT_SECONDS,
+                connect=settings.LLM_HTTP_CONNECT_TIMEOUT_SECONDS
+            ),
+            event_hooks={"response": [observe_response]}
+        )
+    return _http_client
+
+
+def get_chat_model(
+    model: Optional[str] = None,
+    temperature: Optional[float] = None
+) -> BaseChatModel:
+    """Get the chat model client for a model and temperature.
+    
+    `LLM_BACKEND=fake` swaps in an in-process model for load testing.
+    """
+    model = model or settings.LLM_MODEL
+    temperature = settings.LLM_TEMPERATURE if temperature is None else temperature
+    key = (model, temperature)
+    
+    record_cache("chat_model", key in _chat_models)
+    if key not in _chat_models:
+        if settings.LLM_BACKEND == "fake":
+            _chat_models[key] = FakeChatModel.from_settings(settings)
+        elif settings.LLM_BACKEND == "openai":
+            _chat_models[key] = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                api_key=settings.OPENAI_API_KEY,
+                http_async_client=get_http_client(),
+                # Retries are handled by app.llm.ratelimit
+                max_retries=0
+            )
+        else:
+            raise ValueError(f"Unknown LLM backend: {settings.LLM_BACKEND}")
+    return _chat_models[key]
+
+
+def get_openai_client() -> openai.AsyncOpenAI:
+    """Get the shared OpenAI client, used for embeddings."""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = openai.AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            http_client=get_http_client(),
+            max_retries=0
+        )
+    return _openai_client
+
+
+def get_fake_embeddings() -> Embeddings:
+    """Get the shared in-process embedding model used when
+    `EMBEDDING_BACKEND=fake`."""
+    global _fake_embeddings
+    if _fake_embeddings is None:
+        _fake_embeddings = FakeEmbeddings.from_settings(settings)
+    return _fake_embeddings
+
+
+async def close_llm_clients() -> None:
+    """Close the shared HTTP client and drop cached model clients."""
+    global _http_client, _openai_client, _fake_embeddings
+    _chat_models.clear()
+    _openai_client = None
+    _fake_embeddings = None
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -0,0 +1,265 @@
+import asyncio
+import hashlib
+import math
+import random
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from app.core.config import Settings
+
+# Vocabulary for generated replies
+_WORDS = (
+    "the context suggests that this answer depends on several factors "
+    "including data retrieval latency model quality and the question itself "
+    "in summary more information may be needed to be certain"
+).split()
+
+
+class InjectedFaultError(RuntimeError):
+    """Error raised on purpose by a fake backend."""
+
+
+class LatencyModel:
+    """Samples simulated upstream latencies in seconds.
+
+    `median_ms` is the typical latency. `spread` is the lognormal sigma, or
+    the relative half-width / standard deviation for the uniform and normal
+    distributions.
+    """
+
+    DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal")
+
+    def __init__(
+        self,
+        median_ms: float,
+        distribution: str = "lognormal",
+        spread: float = 0.5,
+        rng: Optional[random.Random] = None
+    ) -> None:
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.median_ms = median_ms
+        self.distribution = distribution
+        self.spread = spread
+        self.rng = rng or random.Random()
+
+    def sample(self) -> float:
+        """Draw one latency in seconds."""
+        if self.median_ms <= 0:
+            return 0.0
+        if self.distribution == "constant":
+            ms = self.median_ms
+        elif self.distribution == "uniform":
+            ms = self.median_ms * self.rng.uniform(1 - self.spread, 1 + self.spread)
+        elif self.distribution == "normal":
+            ms = self.rng.gauss(self.median_ms, self.median_ms * self.spread)
+        else:
+            ms = self.median_ms * math.exp(self.rng.gauss(0, self.spread))
+        return max(ms, 0.0) / 1000
+
+
+def _digest(text: str) -> int:
+    """Stable 64-bit hash of a text, independent of PYTHONHASHSEED."""
+    return int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "big")
+
+
+class FakeChatModel(BaseChatModel):
+    """In-process chat model for load testing without a paid provider.
+
+    Replies are derived from the prompt so identical inputs give identical
+    outputs. Timing mimics a streaming provider: one sampled delay before
+    the first token, then tokens at `tokens_per_second`.
+    """
+
+    latency_ms: float = 200.0
+    latency_distribution: str = "lognormal"
+    latency_spread: float = 0.5
+    tokens_per_second: float = 50.0
+    response_tokens: int = 64
+    error_rate: float = 0.0
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "FakeChatModel":
+        """Create a fake chat model configured from settings."""
+        return cls(
+            latency_ms=settings.FAKE_LLM_LATENCY_MS,
+            latency_distribution=settings.FAKE_LLM_LATENCY_DISTRIBUTION,
+            latency_spread=settings.FAKE_LLM_LATENCY_SPREAD,
+            tokens_per_second=settings.FAKE_LLM_TOKENS_PER_SECOND,
+            response_tokens=settings.FAKE_LLM_RESPONSE_TOKENS,
+            error_rate=settings.FAKE_LLM_ERROR_RATE,
+            seed=settings.FAKE_LLM_SEED
+        )
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _rng(self, messages: List[BaseMessage]) -> random.Random:
+        prompt = "\n".join(str(m.content) for m in messages)
+        if self.seed is None:
+            return random.Random()
+        return random.Random(self.seed ^ _digest(prompt))
+
+    def _reply_tokens(self, messages: List[BaseMessage]) -> List[str]:
+        prompt = "\n".join(str(m.content) for m in messages)
+        words = random.Random(_digest(prompt))
+        return [words.choice(_WORDS) for _ in range(self.response_tokens)]
+
+    def _plan(self, messages: List[BaseMessage]) -> Tuple[float, float]:
+        """Decide first-token delay and per-token delay, or inject a fault."""
+        rng = self._rng(messages)
+        if self.error_rate and rng.random() < self.error_rate:
+            raise InjectedFaultError("Injected fake model failure")
+        latency = LatencyModel(
+            self.latency_ms, self.latency_distribution, self.latency_spread, rng
+        )
+        per_token = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        return latency.sample(), per_token
+
+    def _result(self, tokens: List[str], prompt_tokens: int) -> ChatResult:
+        message = AIMessage(
+            content=" ".join(tokens),
+            response_metadata={
+                "token_usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(tokens),
+                    "total_tokens": prompt_tokens + len(tokens)
+                },
+                "model_name": self._llm_type
+            }
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _prompt_tokens(self, messages: List[BaseMessage]) -> int:
+        return sum(len(str(m.content).split()) for m in messages)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        first_token, per_token = self._plan(messages)
+        tokens = self._reply_tokens(messages)
+        time.sleep(first_token + per_token * len(tokens))
+        return self._result(tokens, self._prompt_tokens(messages))
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        first_token, per_token = self._plan(messages)
+        tokens = self._reply_tokens(messages)
+        await asyncio.sleep(first_token + per_token * len(tokens))
+        return self._result(tokens, self._prompt_tokens(messages))
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        first_token, per_token = self._plan(messages)
+        time.sleep(first_token)
+        for i, token in enumerate(self._reply_tokens(messages)):
+            if i:
+                time.sleep(per_token)
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(content=token if i == 0 else f" {token}")
+            )
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        first_token, per_token = self._plan(messages)
+        await asyncio.sleep(first_token)
+        for i, token in enumerate(self._reply_tokens(messages)):
+            if i:
+                await asyncio.sleep(per_token)
+            chunk = ChatGenerationChunk(
+                message=AIMessageChunk(content=token if i == 0 else f" {token}")
+            )
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+class FakeEmbeddings(Embeddings):
+    """In-process embedding model for load testing without a paid provider.
+
+    Each text maps to a fixed unit vector seeded from its hash, so repeated
+    texts embed identically and similarity search behaves consistently.
+    """
+
+    def __init__(
+        self,
+        dimensions: int = 1536,
+        latency_ms: float = 20.0,
+        latency_distribution: str = "lognormal",
+        latency_spread: float = 0.5,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None
+    ) -> None:
+        self.dimensions = dimensions
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.latency = LatencyModel(
+            latency_ms, latency_distribution, latency_spread, self.rng
+        )
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "FakeEmbeddings":
+        """Create fake embeddings configured from settings."""
+        return cls(
+            dimensions=settings.FAKE_EMBEDDING_DIMENSIONS,
+            latency_ms=settings.FAKE_EMBEDDING_LATENCY_MS,
+            latency_distribution=settings.FAKE_LLM_LATENCY_DISTRIBUTION,
+            latency_spread=settings.FAKE_LLM_LATENCY_SPREAD,
+            error_rate=settings.FAKE_LLM_ERROR_RATE,
+            seed=settings.FAKE_LLM_SEED
+        )
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.random.default_rng(_digest(text)).standard_normal(self.dimensions)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def _check_fault(self) -> None:
+        if self.error_rate and self.rng.random() < self.error_rate:
+            raise InjectedFaultError("Injected fake embedding failure")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self._check_fault()
+        time.sleep(self.latency.sample())
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        self._check_fault()
+        await asyncio.sleep(self.latency.sample())
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
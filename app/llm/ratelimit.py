@@ -0,0 +1,286 @@
+import asyncio
+import logging
+import random
+import re
+from time import monotonic
+from typing import Awaitable, Callable, Dict, Mapping, Optional, Tuple, Type, TypeVar
+
+import httpx
+import openai
+
+from app.core.config import get_settings
+from app.core.metrics import MODEL_RATE_LIMIT_WAIT, MODEL_RETRIES
+from app.llm.fake import InjectedFaultError
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+# Errors worth another attempt; anything else is a bug or a bad request
+RETRYABLE: Tuple[Type[BaseException], ...] = (
+    asyncio.TimeoutError,
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    InjectedFaultError,
+)
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset(value: str) -> float:
+    """Parse a rate limit reset such as `6m0s` or `20ms` into seconds."""
+    return sum(
+        float(amount) * _UNIT_SECONDS[unit]
+        for amount, unit in _DURATION.findall(value)
+    )
+
+
+class _Window:
+    """Provider quota for one resource, as last reported in headers."""
+
+    def __init__(self) -> None:
+        self.limit: Optional[float] = None
+        self.remaining = 0.0
+        self.reset_at = 0.0
+
+    def update(self, limit: str, remaining: str, reset: str, now: float) -> None:
+        self.limit = float(limit)
+        self.remaining = float(remaining)
+        self.reset_at = now + parse_reset(reset)
+
+    def available_at(self, amount: float, at: float) -> float:
+        """Earliest time `amount` units can be used."""
+        if self.limit is None or amount <= 0:
+            return at
+        if at >= self.reset_at:
+            self.remaining = self.limit
+        return at if self.remaining >= amount else self.reset_at
+
+    def interval(self, amount: float, at: float, low_water: float) -> float:
+        """Spacing between calls that spreads a low quota until the reset."""
+        if self.limit is None or self.remaining > self.limit * low_water:
+            return 0.0
+        return max(self.reset_at - at, 0.0) * amount / max(self.remaining, 1.0)
+
+    def consume(self, amount: float) -> None:
+        if self.limit is not None:
+            self.remaining -= amount
+
+
+class AdaptiveRateLimiter:
+    """Paces calls to one model API using the provider's rate limit headers.
+
+    Remaining requests and tokens are read from `x-ratelimit-*` headers on
+    every response. Calls wait when a quota is exhausted or the provider
+    answered 429, and are spaced out evenly once a quota drops below
+    `low_water` of its limit, so the worker slows down before it gets
+    throttled. Without headers, e.g. for the fake backend, nothing waits.
+    """
+
+    def __init__(self, low_water: float = 0.1) -> None:
+        self.low_water = low_water
+        self.requests = _Window()
+        self.tokens = _Window()
+        self._blocked_until = 0.0
+        self._next_slot = 0.0
+
+    def observe(self, status_code: int, headers: Mapping[str, str]) -> None:
+        """Update quotas from a provider response."""
+        now = monotonic()
+        for name, window in (("requests", self.requests), ("tokens", self.tokens)):
+            limit = headers.get(f"x-ratelimit-limit-{name}")
+            remaining = headers.get(f"x-ratelimit-remaining-{name}")
+            reset = headers.get(f"x-ratelimit-reset-{name}")
+            if limit and remaining and reset:
+                try:
+                    window.update(limit, remaining, reset, now)
+                except ValueError:
+                    logger.debug("Ignoring malformed rate limit headers")
+        if status_code == 429:
+            retry_after = headers.get("retry-after")
+            try:
+                delay = float(retry_after) if retry_after else 1.0
+            except ValueError:
+                delay = 1.0
+            self._blocked_until = max(self._blocked_until, now + delay)
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Claim quota for one call; returns how long to wait before making it."""
+        now = monotonic()
+        start = max(now, self._blocked_until)
+        start = max(
+            start,
+            self.requests.available_at(1, start),
+            self.tokens.available_at(tokens, start)
+        )
+        interval = max(
+            self.requests.interval(1, start, self.low_water),
+            self.tokens.interval(tokens, start, self.low_water)
+        )
+        if interval:
+            start = max(start, self._next_slot)
+            self._next_slot = start + interval
+        self.requests.consume(1)
+        self.tokens.consume(tokens)
+        return start - now
+
+    async def acquire(self, api: str, tokens: int = 0) -> None:
+        """Wait until a call may be made."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            MODEL_RATE_LIMIT_WAIT.labels(api).observe(delay)
+            await asyncio.sleep(delay)
+
+
+class RetryBudget:
+    """Caps retries at a fraction of first attempts.
+
+    Every call deposits `ratio` and every retry or hedge withdraws one, up
+    to an allowance of `minimum`. During a provider outage retries add at
+    most `ratio` extra load instead of multiplying it.
+    """
+
+    def __init__(self, ratio: float, minimum: float) -> None:
+        self.ratio = ratio
+        self.minimum = minimum
+        self._balance = minimum
+
+    def deposit(self) -> None:
+        self._balance = min(self.minimum, self._balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self._balance < 1:
+            return False
+        self._balance -= 1
+        return True
+
+
+def backoff(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff before retry number `attempt`."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+async def _hedged(
+    attempt: Callable[[], Awaitable[T]],
+    hedge_after: float,
+    budget: RetryBudget,
+    api: str
+) -> T:
+    """Run `attempt`, starting a second copy if the first is slow."""
+    tasks = {asyncio.ensure_future(attempt())}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if not done and budget.withdraw():
+            MODEL_RETRIES.labels(api, "hedge").inc()
+            tasks.add(asyncio.ensure_future(attempt()))
+        error: Optional[BaseException] = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def call_with_retries(
+    call: Callable[[], Awaitable[T]],
+    *,
+    api: str,
+    limiter: AdaptiveRateLimiter,
+    budget: RetryBudget,
+    tokens: int = 0,
+    max_attempts: int = 3,
+    timeout: Optional[float] = None,
+    hedge_after: Optional[float] = None,
+    base_delay: float = 0.5,
+    max_delay: float = 8.0
+) -> T:
+    """Call a model API with pacing, timeouts, hedging and budgeted retries.
+
+    Each attempt waits for the rate limiter and is bounded by `timeout`.
+    With `hedge_after`, a duplicate attempt starts if the first has not
+    finished in time and whichever succeeds first wins. Retryable errors
+    are retried with jittered backoff while the shared budget allows.
+    """
+    async def attempt() -> T:
+        await limiter.acquire(api, tokens)
+        return await asyncio.wait_for(call(), timeout)
+
+    budget.deposit()
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            if hedge_after is None:
+                return await attempt()
+            return await _hedged(attempt, hedge_after, budget, api)
+        except RETRYABLE as e:
+            if attempts >= max_attempts:
+                raise
+            if not budget.withdraw():
+                MODEL_RETRIES.labels(api, "budget_exhausted").inc()
+                raise
+            MODEL_RETRIES.labels(api, "retry").inc()
+            logger.warning(f"Retrying {api} call after {type(e).__name__}")
+            await asyncio.sleep(backoff(attempts, base_delay, max_delay))
+
+
+# Shared per worker: one limiter per model API, one retry budget for all
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_retry_budget: Optional[RetryBudget] = None
+
+
+def get_rate_limiter(api: str) -> AdaptiveRateLimiter:
+    """Get the limiter for a model API, e.g. `chat` or `embeddings`."""
+    if api not in _limiters:
+        _limiters[api] = AdaptiveRateLimiter(settings.LLM_RATE_LIMIT_LOW_WATER)
+    return _limiters[api]
+
+
+def get_retry_budget() -> RetryBudget:
+    """Get the retry budget shared by all model API calls."""
+    global _retry_budget
+    if _retry_budget is None:
+        _retry_budget = RetryBudget(
+            settings.LLM_RETRY_BUDGET_RATIO, settings.LLM_RETRY_BUDGET_MIN
+        )
+    return _retry_budget
+
+
+_LIMITED_PATHS = {"/chat/completions": "chat", "/embeddings": "embeddings"}
+
+
+async def observe_response(response: httpx.Response) -> None:
+    """httpx response hook feeding provider rate limit headers to the limiters.
+
+    Only model calls count; other requests on the shared client, such as
+    the health check listing models, leave the limiters alone.
+    """
+    path = response.request.url.path
+    for suffix, api in _LIMITED_PATHS.items():
+        if path.endswith(suffix):
+            get_rate_limiter(api).observe(response.status_code, response.headers)
+            return
+
+
+async def call_model(api: str, call: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+    """Call a model API with the shared limiter and retry policy from settings."""
+    return await call_with_retries(
+        call,
+        api=api,
+        limiter=get_rate_limiter(api),
+        budget=get_retry_budget(),
+        tokens=tokens,
+        max_attempts=settings.LLM_MAX_ATTEMPTS,
+        timeout=settings.LLM_CALL_TIMEOUT_SECONDS,
+        hedge_after=settings.LLM_HEDGE_AFTER_SECONDS,
+        base_delay=settings.LLM_RETRY_BASE_SECONDS,
+        max_delay=settings.LLM_RETRY_MAX_SECONDS
+    )
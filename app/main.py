@@ -1,14 +1,71 @@
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from app.api.v1 import router as v1_router
-from app.core.errors import AuthError, NotFoundError, ValidationError, PermissionError
+from app.core.config import get_settings
+from app.core.errors import (
+    AuthError,
+    ClientDisconnectedError,
+    DeadlineExceededError,
+    NotFoundError,
+    OverloadedError,
+    PermissionError,
+    ValidationError,
+)
+from app.core.health import get_health_checker
+from app.core.metrics import MetricsMiddleware, register_pool_collector, render_metrics
+from app.core.tracing import setup_tracing, shutdown_tracing
+from app.db.database import engine
+from app.db.partitions import run_partition_maintenance
+from app.db.reaper import run_session_reaper
+from app.db.session_cache import listen_for_session_changes
+from app.llm import close_llm_clients
+
+settings = get_settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Start and stop background tasks with the application."""
+    setup_tracing(engine)
+    if settings.METRICS_ENABLED:
+        register_pool_collector(engine)
+    
+    reaper_task = None
+    if settings.SESSION_REAPER_ENABLED:
+        reaper_task = asyncio.create_task(run_session_reaper())
+    
+    partitions_task = None
+    if settings.MESSAGE_PARTITIONS_ENABLED:
+        partitions_task = asyncio.create_task(run_partition_maintenance())
+    
+    listener_task = None
+    if settings.SESSION_CACHE_ENABLED and settings.SESSION_CACHE_NOTIFY:
+        listener_task = asyncio.create_task(listen_for_session_changes())
+    
+    yield
+    
+    for task in (reaper_task, partitions_task, listener_task):
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+    
+    await close_llm_clients()
+    shutdown_tracing()
+
 
 app = FastAPI(
     title="RAG Chatbot API",
     description="A FastAPI-based RAG chatbot using LangGraph",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware configuration
@@ -20,6 +77,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include API routers
 app.include_router(v1_router, prefix="/api/v1")
 
@@ -53,7 +113,55 @@ async def permission_error_handler(request: Request, exc: PermissionError) -> JS
         content={"detail": exc.detail}
     )
 
+@app.exception_handler(OverloadedError)
+async def overloaded_error_handler(request: Request, exc: OverloadedError) -> JSONResponse:
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers=exc.headers
+    )
+
+@app.exception_handler(DeadlineExceededError)
+async def deadline_exceeded_error_handler(
+    request: Request, exc: DeadlineExceededError
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail}
+    )
+
+@app.exception_handler(ClientDisconnectedError)
+async def client_disconnected_error_handler(
+    request: Request, exc: ClientDisconnectedError
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail}
+    )
+
 @app.get("/health")
 async def health_check() -> dict[str, str]:
     """Health check endpoint."""
     return {"status": "healthy"}
+
+@app.get("/health/live")
+async def liveness_check() -> dict[str, str]:
+    """Liveness probe, answers as long as the event loop is responsive."""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness_check() -> JSONResponse:
+    """Readiness probe, 503 when a critical dependency is unreachable."""
+    report = await get_health_checker().check()
+    return JSONResponse(
+        status_code=200 if report.status == "ready" else 503,
+        content=report.model_dump()
+    )
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> Response:
+        """Prometheus scrape endpoint."""
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
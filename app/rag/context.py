@@ -0,0 +1,200 @@
+import json
+import math
+import re
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+# Chunks are merged when they carry these metadata keys: the document they
+# came from and their position in it
+SOURCE_KEY = "source"
+CHUNK_INDEX_KEY = "chunk_index"
+
+# Truncated chunks shorter than this are dropped rather than included
+MIN_TRUNCATED_TOKENS = 32
+
+_WORD = re.compile(r"\w+")
+
+# Vector store point id and relevance score of a chunk used in a reply
+ChunkRef = Tuple[str, float]
+
+
+class ContextChunk(BaseModel):
+    """A retrieved chunk considered for the prompt."""
+    text: str
+    score: float
+    # Vector store point ids, several once adjacent chunks are merged
+    ids: List[str] = []
+    source: Optional[str] = None
+    start_index: Optional[int] = None
+    end_index: Optional[int] = None
+
+    @classmethod
+    def from_result(cls, result: Dict[str, Any]) -> "ContextChunk":
+        """Create a chunk from a vector store search result."""
+        index = result.get(CHUNK_INDEX_KEY)
+        source = result.get(SOURCE_KEY)
+        return cls(
+            text=result["text"],
+            score=result.get("score", 0.0),
+            ids=[result["id"]] if "id" in result else [],
+            source=str(source) if source is not None else None,
+            start_index=index,
+            end_index=index
+        )
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count, four characters per token."""
+    return math.ceil(len(text) / 4)
+
+
+def _shingles(text: str, size: int = 3) -> FrozenSet[str]:
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return frozenset([" ".join(words)])
+    return frozenset(" ".join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+
+def _containment(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Share of the smaller shingle set found in the other one."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / min(len(a), len(b))
+
+
+def deduplicate(chunks: List[ContextChunk], threshold: float = 0.8) -> List[ContextChunk]:
+    """Drop chunks that mostly repeat a more relevant chunk.
+
+    Containment rather than plain similarity also catches a short chunk
+    fully contained in a longer one.
+    """
+    kept: List[ContextChunk] = []
+    kept_shingles: List[FrozenSet[str]] = []
+    for chunk in sorted(chunks, key=lambda c: c.score, reverse=True):
+        shingles = _shingles(chunk.text)
+        if any(_containment(shingles, other) >= threshold for other in kept_shingles):
+            continue
+        kept.append(chunk)
+        kept_shingles.append(shingles)
+    return kept
+
+
+def _join_overlapping(first: str, second: str, min_overlap: int = 10, max_overlap: int = 500) -> str:
+    """Join consecutive chunks, removing text repeated by chunk overlap."""
+    longest = min(len(first), len(second), max_overlap)
+    for size in range(longest, min_overlap - 1, -1):
+        if first.endswith(second[:size]):
+            return first + second[size:]
+    return f"{first} {second}"
+
+
+def merge_adjacent(chunks: List[ContextChunk]) -> List[ContextChunk]:
+    """Merge chunks that are consecutive in the same document.
+
+    The merged chunk keeps the best score of its parts.
+    """
+    merged: List[ContextChunk] = []
+    positioned: List[ContextChunk] = []
+    for chunk in chunks:
+        if chunk.source is not None and chunk.start_index is not None:
+            positioned.append(chunk)
+        else:
+            merged.append(chunk)
+    positioned.sort(key=lambda c: (c.source, c.start_index))
+
+    current: Optional[ContextChunk] = None
+    for chunk in positioned:
+        if (
+            current is not None
+            and chunk.source == current.source
+            and chunk.start_index <= current.end_index + 1
+        ):
+            current = current.model_copy(update={
+                "text": _join_overlapping(current.text, chunk.text),
+                "score": max(current.score, chunk.score),
+                "ids": current.ids + chunk.ids,
+                "end_index": max(current.end_index, chunk.end_index),
+            })
+            continue
+        if current is not None:
+            merged.append(current)
+        current = chunk
+    if current is not None:
+        merged.append(current)
+    return merged
+
+
+def _truncate(text: str, tokens: int) -> str:
+    """Cut text to about `tokens` tokens at a word boundary."""
+    cut = text[:tokens * 4]
+    if len(cut) < len(text) and " " in cut:
+        cut = cut[:cut.rindex(" ")]
+    return cut.rstrip() + "…"
+
+
+def pack_context(
+    results: List[Dict[str, Any]],
+    token_budget: int,
+    dedup_threshold: float = 0.8
+) -> List[ContextChunk]:
+    """Turn search results into the chunks that fit the prompt budget.
+
+    Near-duplicates are dropped, neighbouring chunks of a document merged,
+    and the rest added most relevant first until `token_budget` is used.
+    The chunk that crosses the budget is truncated to fit.
+    """
+    chunks = merge_adjacent(deduplicate(
+        [ContextChunk.from_result(r) for r in results], dedup_threshold
+    ))
+    chunks.sort(key=lambda c: c.score, reverse=True)
+
+    packed: List[ContextChunk] = []
+    remaining = token_budget
+    for chunk in chunks:
+        tokens = estimate_tokens(chunk.text)
+        if tokens <= remaining:
+            packed.append(chunk)
+            remaining -= tokens
+            continue
+        if remaining >= MIN_TRUNCATED_TOKENS:
+            packed.append(chunk.model_copy(update={"text": _truncate(chunk.text, remaining)}))
+        break
+    return packed
+
+
+def format_context(chunks: List[ContextChunk]) -> str:
+    """Join packed chunks into the context section of the prompt."""
+    return "\n\n".join(chunk.text for chunk in chunks)
+
+
+def cosine_scores(query: Sequence[float], vectors: Sequence[Sequence[float]]) -> List[float]:
+    """Cosine similarity of `query` to each vector, as the vector store scores it."""
+    if not vectors:
+        return []
+    matrix = np.asarray(vectors, dtype=np.float32)
+    query_vector = np.asarray(query, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_vector)
+    return (matrix @ query_vector / np.maximum(norms, 1e-12)).tolist()
+
+
+def encode_chunk_refs(chunks: List[ContextChunk]) -> Optional[str]:
+    """Compact JSON of the point ids and scores behind a packed context.
+
+    Stored on assistant messages, so follow-ups can rebuild the context
+    without searching and a reply can be traced to what it was given.
+    """
+    refs = [[chunk_id, round(chunk.score, 4)] for chunk in chunks for chunk_id in chunk.ids]
+    return json.dumps(refs, separators=(",", ":")) if refs else None
+
+
+def decode_chunk_refs(value: Optional[str]) -> List[ChunkRef]:
+    """Read references written by `encode_chunk_refs`, ignoring anything else."""
+    if not value:
+        return []
+    try:
+        refs = json.loads(value)
+        return [(str(chunk_id), float(score)) for chunk_id, score in refs]
+    except (ValueError, TypeError):
+        return []
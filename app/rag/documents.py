@@ -0,0 +1,81 @@
+import logging
+from datetime import datetime
+from typing import List
+from uuid import UUID
+
+from app.core.config import get_settings
+from app.core.tracing import span
+from app.rag.context import CHUNK_INDEX_KEY, SOURCE_KEY
+from app.vector_store import get_embeddings
+from app.vector_store.session_index import get_session_indexes
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Preferred places to end a chunk, best first
+_SEPARATORS = ("\n\n", "\n", ". ", " ")
+
+
+def split_text(text: str, chunk_size: int = 1000, overlap: int = 100) -> List[str]:
+    """Split text into chunks of at most `chunk_size` characters.
+
+    Chunks end at a paragraph, line, sentence or word break when one falls
+    in the second half of the chunk, and each starts `overlap` characters
+    before the previous one ended, so a passage cut at a boundary is still
+    whole in one of them.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    overlap = max(0, min(overlap, chunk_size // 2))
+    text = text.strip()
+    chunks: List[str] = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            for separator in _SEPARATORS:
+                cut = text.rfind(separator, start + chunk_size // 2, end)
+                if cut != -1:
+                    end = cut + len(separator)
+                    break
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+async def ingest_document(
+    session_id: UUID,
+    expires_at: datetime,
+    filename: str,
+    text: str
+) -> int:
+    """Chunk, embed and index an uploaded document for its session.
+
+    Runs after the upload has been answered; failures are logged. Returns
+    the number of chunks indexed.
+    """
+    chunks = split_text(text, settings.DOCUMENT_CHUNK_SIZE, settings.DOCUMENT_CHUNK_OVERLAP)
+    batch_size = settings.DOCUMENT_EMBEDDING_BATCH_SIZE
+    indexes = get_session_indexes()
+    try:
+        with span("documents.ingest", chunks=len(chunks), chars=len(text)):
+            for start in range(0, len(chunks), batch_size):
+                batch = chunks[start:start + batch_size]
+                await indexes.add_texts(
+                    session_id,
+                    expires_at,
+                    batch,
+                    await get_embeddings(batch),
+                    [
+                        {SOURCE_KEY: filename, CHUNK_INDEX_KEY: index}
+                        for index in range(start, start + len(batch))
+                    ]
+                )
+    except Exception as e:
+        logger.error(f"Failed to ingest {filename} for session {session_id}: {str(e)}")
+        return 0
+    return len(chunks)
@@ -1,19 +1,83 @@
-from typing import Dict, Any, Annotated, TypedDict
+from typing import Dict, Any, Annotated, Awaitable, Callable, List, Optional, TypedDict
 from uuid import UUID
 
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolExecutor
+from langgraph.types import StateSnapshot
 
-from app.rag.nodes import retrieve_context, generate_response, save_message
+from app.core.config import get_settings
+from app.core.metrics import GRAPH_NODE_DURATION, GRAPH_RESUMES
+from app.core.timing import get_timings
+from app.core.tracing import span
+from app.db.checkpoints import get_checkpointer
+from app.rag.context import ChunkRef, ContextChunk
+from app.rag.nodes import (
+    route_turn,
+    reuse_context,
+    retrieve_context,
+    generate_response,
+    save_message,
+)
+from app.rag.router import RETRIEVE, REUSE, SKIP
+
+settings = get_settings()
+
+Node = Callable[[Dict[str, Any], Optional[RunnableConfig]], Awaitable[Dict[str, Any]]]
+
+
+def append_messages(
+    history: Optional[List[BaseMessage]],
+    new: Optional[List[BaseMessage]]
+) -> List[BaseMessage]:
+    """Reducer adding a turn's messages to the history, keeping a bounded window."""
+    messages = [*(history or []), *(new or [])]
+    return messages[-settings.SESSION_CACHE_MAX_MESSAGES:]
 
 
 class ChatState(TypedDict):
-    """Type definition for chat state."""
-    messages: list[BaseMessage]
+    """Type definition for chat state.
+    
+    Nodes return only the keys they change.
+    """
+    messages: Annotated[list[BaseMessage], append_messages]
     context: str
     response: str
     session_id: UUID
+    # Precomputed while the turn was being set up, skips re-embedding
+    query_embedding: Optional[List[float]]
+    # Chunks behind the previous assistant reply, reused by follow-ups
+    previous_chunks: Optional[List[ChunkRef]]
+    # Chunks packed into `context`
+    chunks: List[ContextChunk]
+    route: str
+    # Earlier questions that no longer fit the message window
+    summary: Optional[str]
+
+
+def instrument_node(name: str, node: Node) -> Node:
+    """Trace a node and record its duration in metrics and step timings."""
+    # Resolve the labelled histogram once rather than on every call
+    duration = GRAPH_NODE_DURATION.labels(name)
+    
+    async def run(
+        state: Dict[str, Any],
+        config: Optional[RunnableConfig] = None,
+    ) -> Dict[str, Any]:
+        timings = get_timings(config)
+        with span(f"graph.{name}", session_id=state.get("session_id")), duration.time():
+            if timings is None:
+                return await node(state, config)
+            with timings.measure(name):
+                return await node(state, config)
+    
+    return run
+
+
+def select_route(state: Dict[str, Any]) -> str:
+    """Conditional edge following the decision of `route_turn`."""
+    return state["route"]
 
 
 def create_chat_graph() -> StateGraph:
@@ -22,16 +86,62 @@ def create_chat_graph() -> StateGraph:
     workflow = StateGraph(ChatState)
     
     # Add nodes
-    workflow.add_node("retrieve", retrieve_context)
-    workflow.add_node("generate", generate_response)
-    workflow.add_node("save", save_message)
+    workflow.add_node("router", instrument_node("router", route_turn))
+    workflow.add_node("reuse", instrument_node("reuse", reuse_context))
+    workflow.add_node("retrieve", instrument_node("retrieve", retrieve_context))
+    workflow.add_node("generate", instrument_node("generate", generate_response))
+    workflow.add_node("save", instrument_node("save", save_message))
     
     # Define edges
+    workflow.add_conditional_edges(
+        "router",
+        select_route,
+        {RETRIEVE: "retrieve", REUSE: "reuse", SKIP: "generate"}
+    )
+    workflow.add_edge("reuse", "generate")
     workflow.add_edge("retrieve", "generate")
     workflow.add_edge("generate", "save")
     workflow.add_edge("save", END)
     
     # Set entry point
-    workflow.set_entry_point("retrieve")
+    workflow.set_entry_point("router")
+    
+    return workflow.compile(checkpointer=get_checkpointer())
+
+
+def checkpointed_input(
+    snapshot: Optional[StateSnapshot],
+    turn: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Input for a turn on a checkpointed thread.
+    
+    Returns None when the thread holds an unfinished turn for the same
+    message, e.g. a client retrying after a crash or timeout, so the graph
+    resumes from its last completed step. Otherwise the turn only sends
+    its new message if the checkpoint already holds the history.
+    """
+    history = (snapshot.values or {}).get("messages") if snapshot is not None else None
+    if not history:
+        return turn
+    message = turn["messages"][-1]
+    last = history[-1]
+    if snapshot.next and isinstance(last, HumanMessage) and last.content == message.content:
+        GRAPH_RESUMES.inc()
+        return None
+    return {**turn, "messages": [message]}
+
+
+async def start_turn(
+    load_checkpoint: Callable[[], Awaitable[Optional[StateSnapshot]]],
+    turn: Dict[str, Any],
+    persist_message: Callable[[], Awaitable[None]]
+) -> Optional[Dict[str, Any]]:
+    """Graph input for a turn, storing its user message unless it resumes.
     
-    return workflow.compile()
+    A resumed turn's message was stored by the attempt that started it,
+    so the checkpoint is loaded first to avoid storing it twice.
+    """
+    graph_input = checkpointed_input(await load_checkpoint(), turn)
+    if graph_input is not None:
+        await persist_message()
+    return graph_input
@@ -0,0 +1,57 @@
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+
+def mmr_select(
+    query: Sequence[float],
+    vectors: Sequence[Sequence[float]],
+    k: int,
+    lambda_mult: float = 0.5
+) -> List[int]:
+    """Indices of `k` vectors chosen by maximal marginal relevance.
+
+    Each pick maximizes `lambda_mult * sim(query, v) - (1 - lambda_mult) *
+    max sim(v, picked)`, so 1.0 ranks by relevance alone and lower values
+    favour candidates unlike those already picked. Relevance is computed
+    once for all candidates and the redundancy term is updated with one
+    matrix-vector product per pick. Passing an array, or a list of NumPy
+    rows, skips converting Python floats, which dominates for long vectors.
+    """
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if k <= 0 or not len(matrix):
+        return []
+    # Dividing dot products by the norms avoids a normalized copy of the
+    # candidates, the slowest step for a few hundred of them
+    norms = np.maximum(np.sqrt(np.einsum("ij,ij->i", matrix, matrix)), 1e-12)
+    query_vector = np.asarray(query, dtype=np.float32)
+    query_norm = max(float(np.linalg.norm(query_vector)), 1e-12)
+
+    relevance = lambda_mult * (matrix @ query_vector) / (norms * query_norm)
+    # Cosine similarity is at least -1, so this is neutral before the first pick
+    redundancy = np.full(len(matrix), -1.0, dtype=np.float32)
+    available = np.ones(len(matrix), dtype=bool)
+    picked: List[int] = []
+    for _ in range(min(k, len(matrix))):
+        scores = np.where(available, relevance - (1 - lambda_mult) * redundancy, -np.inf)
+        best = int(np.argmax(scores))
+        picked.append(best)
+        available[best] = False
+        similarity = (matrix @ matrix[best]) / (norms * norms[best])
+        np.maximum(redundancy, similarity, out=redundancy)
+    return picked
+
+
+def mmr_rerank(
+    query: Sequence[float],
+    results: List[Dict[str, Any]],
+    limit: int,
+    lambda_mult: float = 0.5
+) -> List[Dict[str, Any]]:
+    """Pick `limit` diverse search results, fetched with their vectors.
+
+    The vectors are removed from the returned results, which keep their
+    search scores.
+    """
+    vectors = [result.pop("vector") for result in results]
+    return [results[i] for i in mmr_select(query, vectors, limit, lambda_mult)]
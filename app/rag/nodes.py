@@ -1,40 +1,171 @@
 from typing import Dict, List, Any, Optional
 from uuid import UUID
-from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.prebuilt import ToolExecutor
-from langchain_openai import ChatOpenAI
 
 from app.core.config import get_settings
-from app.vector_store import VectorStore, get_embeddings
+from app.core.deadline import get_deadline
+from app.core.metrics import (
+    FOLLOW_UP_CONTEXT,
+    LLM_DURATION,
+    LLM_TOKENS,
+    RETRIEVAL_ROUTES,
+    TURN_INTERRUPTIONS,
+)
+from app.core.tracing import set_span_attributes, span
+from app.llm import call_model, get_chat_model
+from app.rag.context import (
+    cosine_scores,
+    encode_chunk_refs,
+    estimate_tokens,
+    format_context,
+    pack_context,
+)
+from app.rag.mmr import mmr_rerank
+from app.rag.router import SKIP, get_retrieval_router
+from app.vector_store import BaseVectorStore, get_embeddings, get_vector_store
+from app.vector_store.session_index import get_session_indexes
 from app.db.models import Message
 
 settings = get_settings()
 
 
+async def route_turn(
+    state: Dict[str, Any],
+    config: Optional[RunnableConfig] = None,
+) -> Dict[str, Any]:
+    """Decide whether the turn needs fresh retrieval.
+    
+    Requests to rework the last answer reuse the previous turn's chunks
+    and small talk goes straight to generation.
+    """
+    messages = state["messages"]
+    latest_message = messages[-1].content if messages else ""
+    previous_chunks = state.get("previous_chunks")
+    
+    route = get_retrieval_router().route(latest_message, bool(previous_chunks))
+    RETRIEVAL_ROUTES.labels(route).inc()
+    
+    if route == SKIP:
+        return {"route": route, "context": "", "chunks": []}
+    return {"route": route}
+
+
+def _session_store(state: Dict[str, Any]) -> BaseVectorStore:
+    """The session's in-memory document index, or the shared store."""
+    session_id = state.get("session_id")
+    index = get_session_indexes().get(UUID(session_id)) if session_id else None
+    return index if index is not None else get_vector_store()
+
+
+def _pack_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Keep the most relevant distinct text that fits the prompt budget."""
+    with span("rag.pack_context", candidates=len(results)) as pack_span:
+        chunks = pack_context(
+            results,
+            token_budget=settings.CONTEXT_TOKEN_BUDGET,
+            dedup_threshold=settings.CONTEXT_DEDUP_THRESHOLD
+        )
+        context = format_context(chunks)
+        set_span_attributes(pack_span, chunks=len(chunks), tokens=estimate_tokens(context))
+    
+    return {"chunks": chunks, "context": context}
+
+
+async def reuse_context(
+    state: Dict[str, Any],
+    config: Optional[RunnableConfig] = None,
+) -> Dict[str, Any]:
+    """Rebuild the previous turn's context from its stored chunk ids."""
+    scores = dict(state.get("previous_chunks") or [])
+    results = await _session_store(state).get_by_ids(list(scores))
+    for result in results:
+        result["score"] = scores[result["id"]]
+    return _pack_results(results)
+
+
 async def retrieve_context(
     state: Dict[str, Any],
     config: Optional[RunnableConfig] = None,
 ) -> Dict[str, Any]:
-    """Retrieve relevant context using RAG."""
+    """Retrieve relevant context using RAG.
+    
+    Retrieval is skipped when the request deadline leaves too little time
+    for it, so the answer is generated without context instead of failing.
+    """
+    deadline = get_deadline(config)
+    if deadline is not None and not deadline.allows(settings.DEADLINE_RETRIEVAL_MIN_SECONDS):
+        TURN_INTERRUPTIONS.labels("retrieve", "skipped").inc()
+        return {"context": "", "chunks": []}
+    
     # Get the latest message
     messages = state["messages"]
     latest_message = messages[-1].content if messages else ""
     
-    # Get embeddings for the query
-    query_embedding = await get_embeddings([latest_message])
+    # Get embeddings for the query, unless computed while setting up the turn
+    query_embedding = state.get("query_embedding")
+    if query_embedding is None:
+        query_embedding = (await get_embeddings([latest_message]))[0]
     
-    # Search vector store
-    vector_store = VectorStore()
-    results = await vector_store.similarity_search(
-        query_embedding=query_embedding[0],
-        session_id=state.get("session_id"),
-        limit=3
-    )
+    vector_store = _session_store(state)
     
-    # Update state with context
-    state["context"] = "\n\n".join(r["text"] for r in results)
-    return state
+    # Within a conversation, the previous turn's chunks often still cover
+    # the question; score them against it before searching again
+    seeded: List[Dict[str, Any]] = []
+    previous_chunks = state.get("previous_chunks")
+    if previous_chunks:
+        seeded = await vector_store.get_by_ids(
+            [chunk_id for chunk_id, _ in previous_chunks],
+            with_vectors=True
+        )
+        scores = cosine_scores(query_embedding, [r.pop("vector") for r in seeded])
+        for result, score in zip(seeded, scores):
+            result["score"] = score
+        if seeded and max(scores) >= settings.CONTEXT_FOLLOW_UP_MIN_SCORE:
+            FOLLOW_UP_CONTEXT.labels("seeded").inc()
+            return _pack_results(seeded)
+        FOLLOW_UP_CONTEXT.labels("topic_shift").inc()
+    
+    # Search vector store, over-fetching candidates to diversify with MMR
+    if settings.RETRIEVAL_MMR_ENABLED:
+        results = await vector_store.similarity_search(
+            query_embedding=query_embedding,
+            session_id=state.get("session_id"),
+            limit=max(settings.RETRIEVAL_MMR_FETCH_K, settings.RETRIEVAL_LIMIT),
+            with_vectors=True
+        )
+        with span("rag.mmr", candidates=len(results)):
+            results = mmr_rerank(
+                query_embedding,
+                results,
+                settings.RETRIEVAL_LIMIT,
+                settings.RETRIEVAL_MMR_LAMBDA
+            )
+    else:
+        results = await vector_store.similarity_search(
+            query_embedding=query_embedding,
+            session_id=state.get("session_id"),
+            limit=settings.RETRIEVAL_LIMIT
+        )
+    return _pack_results(results + seeded)
+
+
+def _token_usage(response: BaseMessage) -> Dict[str, int]:
+    """Extract token counts from a chat model response."""
+    usage = getattr(response, "usage_metadata", None)
+    if isinstance(usage, dict) and usage:
+        return {
+            "prompt_tokens": usage.get("input_tokens", 0),
+            "completion_tokens": usage.get("output_tokens", 0),
+        }
+    metadata = getattr(response, "response_metadata", None)
+    usage = metadata.get("token_usage") if isinstance(metadata, dict) else None
+    usage = usage if isinstance(usage, dict) else {}
+    return {
+        "prompt_tokens": usage.get("prompt_tokens", 0),
+        "completion_tokens": usage.get("completion_tokens", 0),
+    }
 
 
 async def generate_response(
@@ -44,6 +175,7 @@ async def generate_response(
     """Generate response using context and chat history."""
     messages = state["messages"]
     context = state.get("context", "")
+    summary = state.get("summary")
     
     # Create system message with context
     system_prompt = """You are a helpful AI assistant. Use the following context to answer the user's question.
@@ -52,13 +184,14 @@ async def generate_response(
     Context:
     {context}
     """
+    if summary:
+        system_prompt += """
+    Earlier in this conversation the user asked:
+    {summary}
+    """
     
-    # Initialize chat model
-    llm = ChatOpenAI(
-        model=settings.LLM_MODEL,
-        temperature=0.7,
-        api_key=settings.OPENAI_API_KEY
-    )
+    # Shared chat model client
+    llm = get_chat_model()
     
     # Convert messages to LangChain format
     lc_messages = []
@@ -69,40 +202,66 @@ async def generate_response(
             lc_messages.append(AIMessage(content=msg.content))
     
     # Generate response
-    response = await llm.ainvoke(
-        [
+    with span(
+        "llm.generate",
+        model=settings.LLM_MODEL,
+        backend=settings.LLM_BACKEND,
+        messages=len(lc_messages) + 1,
+        context_chars=len(context)
+    ) as llm_span, LLM_DURATION.labels(settings.LLM_MODEL).time():
+        prompt = [
             {
                 "role": "system",
-                "content": system_prompt.format(context=context)
+                "content": system_prompt.format(context=context, summary=summary)
             },
             *lc_messages
-        ],
-        config=config
-    )
+        ]
+        # Rough prompt size for the rate limiter, four characters per token
+        prompt_tokens = (
+            len(prompt[0]["content"]) + sum(len(m.content) for m in lc_messages)
+        ) // 4
+        llm_call = call_model(
+            "chat",
+            lambda: llm.ainvoke(prompt, config=config),
+            tokens=prompt_tokens
+        )
+        # Cancel the call, retries included, once the deadline passes
+        deadline = get_deadline(config)
+        response = await (
+            deadline.run(llm_call, "generate") if deadline is not None else llm_call
+        )
+        usage = _token_usage(response)
+        set_span_attributes(
+            llm_span,
+            response_chars=len(response.content),
+            **usage
+        )
+    LLM_TOKENS.labels(settings.LLM_MODEL, "prompt").inc(usage["prompt_tokens"])
+    LLM_TOKENS.labels(settings.LLM_MODEL, "completion").inc(usage["completion_tokens"])
     
-    # Update state
-    state["response"] = response.content
-    return state
+    # The reply joins the history kept in graph checkpoints
+    return {"response": response.content, "messages": [AIMessage(content=response.content)]}
 
 
 async def save_message(
     state: Dict[str, Any],
     config: Optional[RunnableConfig] = None,
-) -> Dict[str, Any]:
+) -> None:
     """Save message to database."""
-    if "db_session" not in state or "session_id" not in state:
-        return state
+    db = (config or {}).get("configurable", {}).get("db_session")
+    if db is None or "session_id" not in state:
+        return
     
     # Create new message
     message = Message(
         session_id=UUID(state["session_id"]),
         role="assistant",
-        content=state["response"]
+        content=state["response"],
+        # Kept so follow-up turns can reuse the chunks instead of searching
+        context_chunks=encode_chunk_refs(state.get("chunks") or [])
     )
     
     # Save to database
-    state["db_session"].add(message)
-    await state["db_session"].commit()
-    await state["db_session"].refresh(message)
-    
-    return state
+    db.add(message)
+    await db.commit()
+    await db.refresh(message)
@@ -0,0 +1,118 @@
+import logging
+import re
+from typing import List, Optional, Protocol
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Routes a turn can take
+RETRIEVE = "retrieve"
+REUSE = "reuse"
+SKIP = "skip"
+ROUTES = (RETRIEVE, REUSE, SKIP)
+
+# Greetings, thanks and acknowledgements that need no context at all
+_SMALLTALK = re.compile(
+    r"^(hi|hello|hey|thanks?( you)?( so much| a lot)?|thank you|thx|ty|ok(ay)?|"
+    r"cool|great|nice|perfect|awesome|got it|sounds good|bye|goodbye|"
+    r"see you|good (morning|afternoon|evening|night)|yes|no|sure)\W*$",
+    re.IGNORECASE
+)
+
+# Requests to rework the previous answer rather than ask something new
+_REWORK = re.compile(
+    r"\b(rephrase|reword|summari[sz]e (that|this|it)|shorter|simpler|"
+    r"more briefly|in other words|explain (that|this|it)|elaborate|"
+    r"what do you mean|say (that|it) again|translate (that|this|it)|"
+    r"more detail|tl;?dr|eli5)\b",
+    re.IGNORECASE
+)
+
+# Bare requests for more on the previous answer, e.g. "why?"
+_ELABORATE = re.compile(r"^(and )?(why|how come|how so|really)\W*$", re.IGNORECASE)
+
+# Short questions leaning on the previous turn, e.g. "is that still true?",
+# though "does it support SSO?" brings a new topic just the same
+_FOLLOW_UP = re.compile(r"\b(it|that|this|those|these|they|them)\b", re.IGNORECASE)
+
+# Follow-ups and rework requests longer than this probably bring a new
+# topic, e.g. "please elaborate on how the billing API handles refunds"
+_FOLLOW_UP_MAX_WORDS = 8
+
+
+class TurnClassifier(Protocol):
+    """Small local model labelling messages with one of `ROUTES`."""
+
+    def predict(self, texts: List[str]) -> List[str]:
+        ...
+
+
+class RetrievalRouter:
+    """Decides whether a turn needs fresh retrieval.
+
+    Cheap heuristics settle clear cases: small talk skips retrieval, and
+    short requests to rework the last answer or a bare "why?" reuse its
+    context.
+    Short pronoun follow-ups go to the optional classifier and otherwise
+    retrieve, since a pronoun alone doesn't tell a new question from a
+    follow-up; retrieval keeps the previous chunks when they still match.
+    Everything else retrieves.
+    """
+
+    def __init__(self, classifier: Optional[TurnClassifier] = None) -> None:
+        self.classifier = classifier
+
+    def route(self, message: str, has_previous_context: bool) -> str:
+        """Pick `retrieve`, `reuse` or `skip` for a user message."""
+        text = message.strip()
+        if not text or _SMALLTALK.match(text):
+            return SKIP
+        if _ELABORATE.match(text):
+            return REUSE if has_previous_context else RETRIEVE
+        if len(text.split()) > _FOLLOW_UP_MAX_WORDS:
+            return RETRIEVE
+
+        if _REWORK.search(text):
+            return REUSE if has_previous_context else SKIP
+        if _FOLLOW_UP.search(text):
+            route = self._classify(text) or RETRIEVE
+            if route == REUSE and not has_previous_context:
+                return RETRIEVE
+            return route
+        return RETRIEVE
+
+    def _classify(self, text: str) -> Optional[str]:
+        if self.classifier is None:
+            return None
+        try:
+            [route] = self.classifier.predict([text])
+        except Exception as e:
+            logger.warning(f"Retrieval router classifier failed: {str(e)}")
+            return None
+        return route if route in ROUTES else None
+
+
+def load_classifier(path: str) -> Optional[TurnClassifier]:
+    """Load a classifier pickled with joblib, e.g. a scikit-learn pipeline."""
+    try:
+        import joblib
+    except ImportError:
+        logger.warning("joblib is not installed, retrieval router uses heuristics only")
+        return None
+    return joblib.load(path)
+
+
+_router: Optional[RetrievalRouter] = None
+
+
+def get_retrieval_router() -> RetrievalRouter:
+    """Get the retrieval router configured from settings."""
+    global _router
+    if _router is None:
+        classifier = None
+        if settings.RETRIEVAL_ROUTER_MODEL_PATH:
+            classifier = load_classifier(settings.RETRIEVAL_ROUTER_MODEL_PATH)
+        _router = RetrievalRouter(classifier)
+    return _router
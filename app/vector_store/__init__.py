@@ -1,4 +1,14 @@
-from .client import VectorStore
+from .base import BaseVectorStore
+from .client import VectorStore, get_vector_store
 from .embeddings import get_embeddings
+from .local import LocalVectorStore
+from .pgvector import PgVectorStore
 
-__all__ = ["VectorStore", "get_embeddings"]
+__all__ = [
+    "BaseVectorStore",
+    "LocalVectorStore",
+    "PgVectorStore",
+    "VectorStore",
+    "get_embeddings",
+    "get_vector_store",
+]
@@ -0,0 +1,58 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+
+class BaseVectorStore(ABC):
+    """Interface shared by the vector store backends.
+
+    Search results and fetched points are dicts with the point `id`, its
+    `text`, the remaining payload and, for searches, a cosine `score`.
+    """
+
+    @abstractmethod
+    async def ensure_collection(self) -> None:
+        """Create the collection if it doesn't exist yet."""
+
+    @abstractmethod
+    async def ping(self) -> None:
+        """Check the backend answers, raising if it doesn't."""
+
+    @abstractmethod
+    async def add_texts(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadata: Optional[List[Dict[str, Any]]] = None,
+        session_id: Optional[UUID] = None,
+    ) -> List[str]:
+        """Add texts and their embeddings, returning the new point ids."""
+
+    @abstractmethod
+    async def similarity_search(
+        self,
+        query_embedding: List[float],
+        session_id: Optional[UUID] = None,
+        limit: int = 5,
+        with_vectors: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Search for the texts most similar to an embedding.
+
+        With `with_vectors`, each result also has its stored `vector`.
+        """
+
+    @abstractmethod
+    async def get_by_ids(
+        self,
+        ids: List[str],
+        with_vectors: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Fetch stored texts by point id, skipping ids that no longer exist."""
+
+    @abstractmethod
+    async def delete_by_session(self, session_id: UUID) -> None:
+        """Delete all vectors for a given session."""
+
+    @abstractmethod
+    async def delete_by_sessions(self, session_ids: List[UUID]) -> int:
+        """Delete all vectors for several sessions, returning how many were deleted."""
@@ -1,5 +1,6 @@
+import asyncio
 from typing import List, Optional, Dict, Any
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from qdrant_client import QdrantClient
 from qdrant_client.http.models import (
@@ -9,27 +10,60 @@ from qdrant_client.http.models import (
     UpdateStatus,
     OptimizersConfigDiff,
     CollectionStatus,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
 )
-from qdrant_client.models import Filter, FieldCondition, MatchValue
+from qdrant_client.models import Filter, FieldCondition, MatchAny, MatchValue
 
 from app.core.config import get_settings
+from app.core.metrics import VECTOR_SEARCH_DURATION
+from app.core.tracing import set_span_attributes, span
+from app.vector_store.base import BaseVectorStore
+from app.vector_store.local import LocalVectorStore
+from app.vector_store.pgvector import PgVectorStore
+from app.vector_store.quantization import Projection, VectorCodec
 
 settings = get_settings()
 
 
-class VectorStore:
+class VectorStore(BaseVectorStore):
     """Vector store client for Qdrant."""
     
-    def __init__(self) -> None:
-        """Initialize Qdrant client."""
-        self.client = QdrantClient(
+    def __init__(
+        self,
+        client: Optional[QdrantClient] = None,
+        collection_name: str = "documents",
+        vector_size: int = 1536,  # OpenAI ada-002 embedding size
+        quantization: Optional[str] = None,
+        rescore_oversampling: float = 2.0
+    ) -> None:
+        """Initialize Qdrant client.
+        
+        Pass `client` to use another Qdrant instance, e.g.
+        `QdrantClient(location=":memory:")` for local benchmarks. With
+        `quantization="int8"`, new collections keep int8 codes in RAM and
+        the original vectors on disk, read only to rescore candidates.
+        """
+        if quantization not in (None, "int8"):
+            raise ValueError(f"Unsupported Qdrant quantization {quantization!r}")
+        self.client = client or QdrantClient(
             url=settings.QDRANT_URL,
             api_key=settings.QDRANT_API_KEY,
             timeout=10.0
         )
-        self.collection_name = "documents"
-        self.vector_size = 1536  # OpenAI ada-002 embedding size
+        self.collection_name = collection_name
+        self.vector_size = vector_size
+        self.quantization = quantization
+        self.rescore_oversampling = rescore_oversampling
     
+    async def ping(self) -> None:
+        """Fetch the collection over the shared client."""
+        # The client is synchronous; a thread keeps a wedged call off the loop
+        await asyncio.to_thread(self.client.get_collection, self.collection_name)
+
     async def ensure_collection(self) -> None:
         """Ensure collection exists with proper configuration."""
         collections = self.client.get_collections().collections
@@ -41,11 +75,13 @@ class VectorStore:
                 collection_name=self.collection_name,
                 vectors_config=VectorParams(
                     size=self.vector_size,
-                    distance=Distance.COSINE
+                    distance=Distance.COSINE,
+                    on_disk=self.quantization is not None
                 ),
                 optimizers_config=OptimizersConfigDiff(
                     indexing_threshold=0,  # Index immediately
                 ),
+                quantization_config=self._quantization_config(),
             )
             
             # Create payload index for session_id
@@ -55,6 +91,17 @@ class VectorStore:
                 field_schema="keyword"
             )
     
+    def _quantization_config(self) -> Optional[ScalarQuantization]:
+        if self.quantization is None:
+            return None
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(
+                type=ScalarType.INT8,
+                quantile=0.99,
+                always_ram=True
+            )
+        )
+    
     async def add_texts(
         self,
         texts: List[str],
@@ -73,10 +120,11 @@ class VectorStore:
             raise ValueError("Number of metadata items must match texts")
         
         # Prepare points for upload
+        ids = [str(uuid4()) for _ in texts]
         points = []
-        for i, (text, embedding, meta) in enumerate(zip(texts, embeddings, metadata)):
+        for point_id, text, embedding, meta in zip(ids, texts, embeddings, metadata):
             point = PointStruct(
-                id=str(i),
+                id=point_id,
                 vector=embedding,
                 payload={
                     "text": text,
@@ -97,13 +145,14 @@ class VectorStore:
         if operation_info.status != UpdateStatus.COMPLETED:
             raise RuntimeError(f"Failed to upload vectors: {operation_info.status}")
         
-        return [str(i) for i in range(len(texts))]
+        return ids
     
     async def similarity_search(
         self,
         query_embedding: List[float],
         session_id: Optional[UUID] = None,
-        limit: int = 5
+        limit: int = 5,
+        with_vectors: bool = False
     ) -> List[Dict[str, Any]]:
         """Search for similar texts using embedding."""
         search_filter = None
@@ -118,22 +167,74 @@ class VectorStore:
             )
         
         # Perform search
-        results = self.client.search(
-            collection_name=self.collection_name,
-            query_vector=query_embedding,
-            query_filter=search_filter,
-            limit=limit
-        )
+        with span(
+            "vector_store.search",
+            collection=self.collection_name,
+            limit=limit,
+            filtered=search_filter is not None
+        ) as search_span, VECTOR_SEARCH_DURATION.labels("qdrant").time():
+            results = self.client.search(
+                collection_name=self.collection_name,
+                query_vector=query_embedding,
+                query_filter=search_filter,
+                limit=limit,
+                with_vectors=with_vectors,
+                search_params=self._search_params()
+            )
+            set_span_attributes(search_span, results=len(results))
         
         return [
             {
+                "id": str(result.id),
                 "text": result.payload["text"],
                 "score": result.score,
+                **({"vector": result.vector} if with_vectors else {}),
                 **{k: v for k, v in result.payload.items() if k != "text"}
             }
             for result in results
         ]
     
+    def _search_params(self) -> Optional[SearchParams]:
+        if self.quantization is None:
+            return None
+        return SearchParams(
+            quantization=QuantizationSearchParams(
+                rescore=True,
+                oversampling=self.rescore_oversampling
+            )
+        )
+    
+    async def get_by_ids(
+        self,
+        ids: List[str],
+        with_vectors: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Fetch stored texts by point id, skipping ids that no longer exist."""
+        if not ids:
+            return []
+        with span(
+            "vector_store.retrieve",
+            collection=self.collection_name,
+            ids=len(ids)
+        ) as retrieve_span:
+            points = self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=ids,
+                with_payload=True,
+                with_vectors=with_vectors
+            )
+            set_span_attributes(retrieve_span, results=len(points))
+        
+        return [
+            {
+                "id": str(point.id),
+                "text": point.payload["text"],
+                **({"vector": point.vector} if with_vectors else {}),
+                **{k: v for k, v in point.payload.items() if k != "text"}
+            }
+            for point in points
+        ]
+    
     async def delete_by_session(self, session_id: UUID) -> None:
         """Delete all vectors for a given session."""
         self.client.delete(
@@ -148,3 +249,70 @@ class VectorStore:
             ),
             wait=True
         )
+    
+    async def delete_by_sessions(self, session_ids: List[UUID]) -> int:
+        """Delete all vectors for several sessions in one request.
+        
+        Returns the number of vectors that were deleted.
+        """
+        if not session_ids:
+            return 0
+        
+        session_filter = Filter(
+            must=[
+                FieldCondition(
+                    key="session_id",
+                    match=MatchAny(any=[str(s) for s in session_ids])
+                )
+            ]
+        )
+        count = self.client.count(
+            collection_name=self.collection_name,
+            count_filter=session_filter,
+            exact=True
+        ).count
+        if count:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=session_filter,
+                wait=True
+            )
+        return count
+
+
+_vector_store: Optional[BaseVectorStore] = None
+
+
+def get_vector_store() -> BaseVectorStore:
+    """Get the vector store backend configured in settings, shared per worker."""
+    global _vector_store
+    if _vector_store is None:
+        if settings.VECTOR_STORE_BACKEND == "local":
+            _vector_store = LocalVectorStore(
+                path=settings.LOCAL_VECTOR_STORE_PATH,
+                vector_size=settings.VECTOR_SIZE,
+                segment_size=settings.LOCAL_VECTOR_STORE_SEGMENT_SIZE,
+                compact_ratio=settings.LOCAL_VECTOR_STORE_COMPACT_RATIO,
+                codec=VectorCodec(
+                    settings.LOCAL_VECTOR_STORE_DTYPE,
+                    Projection.truncate(settings.LOCAL_VECTOR_STORE_DIMENSIONS)
+                    if settings.LOCAL_VECTOR_STORE_DIMENSIONS else None
+                ),
+                oversampling=settings.LOCAL_VECTOR_STORE_OVERSAMPLING,
+                working_copy_rows=settings.LOCAL_VECTOR_STORE_WORKING_COPY_ROWS
+            )
+        elif settings.VECTOR_STORE_BACKEND == "pgvector":
+            _vector_store = PgVectorStore(
+                vector_size=settings.VECTOR_SIZE,
+                copy_batch_size=settings.PGVECTOR_COPY_BATCH_SIZE,
+                index=settings.PGVECTOR_INDEX,
+                ef_search=settings.PGVECTOR_HNSW_EF_SEARCH,
+                probes=settings.PGVECTOR_IVFFLAT_PROBES
+            )
+        else:
+            _vector_store = VectorStore(
+                vector_size=settings.VECTOR_SIZE,
+                quantization=settings.QDRANT_QUANTIZATION,
+                rescore_oversampling=settings.QDRANT_RESCORE_OVERSAMPLING
+            )
+    return _vector_store
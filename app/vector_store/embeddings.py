@@ -1,31 +1,47 @@
 from typing import List
-import openai
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type
-)
 
 from app.core.config import get_settings
+from app.core.metrics import EMBEDDING_DURATION, EMBEDDING_TOKENS
+from app.core.tracing import span
+from app.llm import call_model, get_fake_embeddings, get_openai_client
 
 settings = get_settings()
-openai.api_key = settings.OPENAI_API_KEY
 
 
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=4, max=10),
-    retry=retry_if_exception_type(openai.error.RateLimitError)
-)
 async def get_embeddings(texts: List[str]) -> List[List[float]]:
-    """Get embeddings for a list of texts using OpenAI's API."""
+    """Get embeddings for a list of texts from the configured backend.
+    
+    Calls are paced and retried by the shared model API rate limiter.
+    """
     # Ensure texts are not too long
     texts = [text[:8191] for text in texts]
     
-    response = await openai.Embedding.acreate(
+    chars = sum(len(text) for text in texts)
+    backend = settings.EMBEDDING_BACKEND
+    # Roughly four characters per token, avoids running a tokenizer per call
+    tokens = chars // 4
+    EMBEDDING_TOKENS.labels(backend).inc(tokens)
+    
+    with span(
+        "embeddings.embed",
+        backend=backend,
+        texts=len(texts),
+        chars=chars
+    ), EMBEDDING_DURATION.labels(backend).time():
+        if backend == "fake":
+            embed = get_fake_embeddings().aembed_documents
+        elif backend == "openai":
+            embed = _get_openai_embeddings
+        else:
+            raise ValueError(f"Unknown embedding backend: {backend}")
+        return await call_model("embeddings", lambda: embed(texts), tokens=tokens)
+
+
+async def _get_openai_embeddings(texts: List[str]) -> List[List[float]]:
+    """Get embeddings for a list of texts using OpenAI's API."""
+    response = await get_openai_client().embeddings.create(
         input=texts,
-        model="text-embedding-ada-002"
+        model=settings.EMBEDDING_MODEL
     )
     
     return [data.embedding for data in response.data]
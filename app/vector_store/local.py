@@ -0,0 +1,599 @@
+import json
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID, uuid4
+
+import numpy as np
+
+from app.core.metrics import VECTOR_SEARCH_DURATION
+from app.core.tracing import set_span_attributes, span
+from app.vector_store.base import BaseVectorStore
+from app.vector_store.quantization import Projection, VectorCodec
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+TOMBSTONES = "tombstones.txt"
+PROJECTION = "projection.npy"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length, so dot products are cosine similarities."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class _Segment:
+    """Fixed-capacity block of vectors, filled append-only.
+
+    Rows past `size` are unused. Deleted rows stay in place, cleared in
+    `live`, until compaction rewrites the segment. With a lossy codec,
+    searches scan `codes` and `vectors` holds the full-precision originals
+    used for rescoring, if they are kept at all. `working` is a float32
+    copy of float16 codes, scanned instead of them while one is kept.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        capacity: int,
+        vectors: Optional[np.ndarray] = None,
+        codes: Optional[np.ndarray] = None,
+        scales: Optional[np.ndarray] = None
+    ) -> None:
+        self.name = name
+        self.vectors = vectors
+        self.codes = codes
+        self.scales = scales
+        self.working: Optional[np.ndarray] = None
+        self.ids: List[str] = []
+        self.payloads: List[Dict[str, Any]] = []
+        self.live = np.zeros(capacity, dtype=bool)
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    @property
+    def room(self) -> int:
+        return len(self.live) - self.size
+
+    @property
+    def deleted(self) -> int:
+        return self.size - int(self.live[:self.size].sum())
+
+
+class LocalVectorStore(BaseVectorStore):
+    """Brute-force vector store on NumPy matrices, optionally memory-mapped.
+
+    Vectors are normalized float32 rows in segments of `segment_size`; a
+    search is one matrix product per segment for all queries at once. A
+    boolean bitmap per session and segment restricts filtered searches to
+    that session's rows. Deletes only clear rows, which are reclaimed by
+    compaction once more than `compact_ratio` of the rows are dead.
+
+    With `path`, each segment is a memory-mapped `.f32` file plus a JSONL
+    file of point ids and payloads, listed in a manifest, so the index
+    survives restarts. Without it, everything stays in memory, e.g. for
+    per-session scratch indexes or offline benchmarks.
+
+    A lossy `codec` keeps only compact codes in memory: float16 or int8,
+    optionally of fewer dimensions. With `path`, the originals stay in the
+    memory-mapped files, read only to rescore the best `oversampling`
+    times `limit` candidates exactly; codes are rebuilt from them on
+    startup. Without `path`, scores come from the codes, and reducing
+    dimensions is not supported since stored vectors couldn't be returned.
+
+    NumPy widens float16 codes to float32 on every scan, which makes
+    searching them several times slower than float32. Indexes of at most
+    `working_copy_rows` rows score float16 codes from float32 copies
+    instead, built on the first search after a write.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        vector_size: int = 1536,
+        segment_size: int = 16384,
+        compact_ratio: float = 0.3,
+        codec: Optional[VectorCodec] = None,
+        oversampling: float = 4.0,
+        working_copy_rows: int = 0
+    ) -> None:
+        self.path = Path(path) if path else None
+        self.vector_size = vector_size
+        self.segment_size = segment_size
+        self.compact_ratio = compact_ratio
+        self.codec = codec or VectorCodec()
+        self.oversampling = oversampling
+        self.working_copy_rows = working_copy_rows
+        if self.codec.projection is not None and self.path is None:
+            raise ValueError("Reducing dimensions needs a path to keep the original vectors")
+        self.segments: List[_Segment] = []
+        self._next_segment = 0
+        self._locations: Dict[str, Tuple[_Segment, int]] = {}
+        # Session id to row bitmaps by segment name
+        self._sessions: Dict[str, Dict[str, np.ndarray]] = {}
+        self._loaded = False
+
+    async def ensure_collection(self) -> None:
+        """Create or open the index."""
+        self._load()
+
+    async def ping(self) -> None:
+        """Open the index, which reads its manifest on first use."""
+        self._load()
+
+    async def add_texts(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadata: Optional[List[Dict[str, Any]]] = None,
+        session_id: Optional[UUID] = None,
+    ) -> List[str]:
+        """Append texts and their embeddings to the last segment."""
+        if len(texts) != len(embeddings):
+            raise ValueError("Number of texts and embeddings must match")
+        if metadata is None:
+            metadata = [{} for _ in texts]
+        if len(metadata) != len(texts):
+            raise ValueError("Number of metadata items must match texts")
+        if not texts:
+            return []
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[1] != self.vector_size:
+            raise ValueError(f"Embeddings must have {self.vector_size} dimensions")
+        self._load()
+
+        ids = [str(uuid4()) for _ in texts]
+        payloads = []
+        for text, meta in zip(texts, metadata):
+            payload = {"text": text, **meta}
+            if session_id:
+                payload["session_id"] = str(session_id)
+            payloads.append(payload)
+        self._append(ids, _normalize(vectors), payloads)
+        return ids
+
+    async def similarity_search(
+        self,
+        query_embedding: List[float],
+        session_id: Optional[UUID] = None,
+        limit: int = 5,
+        with_vectors: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Search for similar texts using embedding."""
+        [results] = await self.similarity_search_batch(
+            [query_embedding], session_id, limit, with_vectors
+        )
+        return results
+
+    async def similarity_search_batch(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        session_id: Optional[UUID] = None,
+        limit: int = 5,
+        with_vectors: bool = False
+    ) -> List[List[Dict[str, Any]]]:
+        """Search for several embeddings at once, one result list per query."""
+        self._load()
+        queries = _normalize(np.asarray(query_embeddings, dtype=np.float32))
+        rescore = self.codec.lossy and self.path is not None
+        with span(
+            "vector_store.search",
+            collection="local",
+            limit=limit,
+            queries=len(queries),
+            filtered=session_id is not None,
+            rescored=rescore
+        ) as search_span, VECTOR_SEARCH_DURATION.labels("local").time():
+            candidates = math.ceil(limit * self.oversampling) if rescore else limit
+            hits = self._search(
+                self.codec.encode_queries(queries) if self.codec.lossy else queries,
+                str(session_id) if session_id else None,
+                candidates
+            )
+            if rescore:
+                hits = [
+                    self._rescore(query_hits, query, limit)
+                    for query_hits, query in zip(hits, queries)
+                ]
+            set_span_attributes(search_span, results=sum(len(h) for h in hits))
+
+        results = []
+        for query_hits in hits:
+            # Rows of one matrix per query, cheap to stack again for re-ranking
+            vectors = self._gather(query_hits) if with_vectors else None
+            results.append([
+                {
+                    "id": segment.ids[row],
+                    "score": score,
+                    **({"vector": vectors[i]} if with_vectors else {}),
+                    **segment.payloads[row]
+                }
+                for i, (score, segment, row) in enumerate(query_hits)
+            ])
+        return results
+
+    async def get_by_ids(
+        self,
+        ids: List[str],
+        with_vectors: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Fetch stored texts by point id, skipping ids that no longer exist."""
+        self._load()
+        points = []
+        for point_id in ids:
+            location = self._locations.get(point_id)
+            if location is None:
+                continue
+            segment, row = location
+            point = {"id": point_id, **segment.payloads[row]}
+            if with_vectors:
+                point["vector"] = self._vector(segment, row).tolist()
+            points.append(point)
+        return points
+
+    async def delete_by_session(self, session_id: UUID) -> None:
+        """Delete all vectors for a given session."""
+        await self.delete_by_sessions([session_id])
+
+    async def delete_by_sessions(self, session_ids: List[UUID]) -> int:
+        """Delete all vectors for several sessions.
+
+        Returns the number of vectors that were deleted.
+        """
+        self._load()
+        deleted: List[str] = []
+        by_name = {segment.name: segment for segment in self.segments}
+        for session_id in session_ids:
+            for name, bitmap in self._sessions.pop(str(session_id), {}).items():
+                segment = by_name[name]
+                rows = np.flatnonzero(bitmap & segment.live)
+                segment.live[rows] = False
+                deleted.extend(segment.ids[row] for row in rows)
+        if not deleted:
+            return 0
+
+        for point_id in deleted:
+            del self._locations[point_id]
+        if self.path is not None:
+            with open(self.path / TOMBSTONES, "a") as f:
+                f.write("".join(f"{point_id}\n" for point_id in deleted))
+
+        total = sum(segment.size for segment in self.segments)
+        dead = sum(segment.deleted for segment in self.segments)
+        if dead > total * self.compact_ratio:
+            self.compact()
+        return len(deleted)
+
+    def __len__(self) -> int:
+        self._load()
+        return len(self._locations)
+
+    def drop_working_copies(self) -> None:
+        """Free the float32 copies of float16 codes until the next search."""
+        for segment in self.segments:
+            segment.working = None
+
+    def point_ids(self) -> List[str]:
+        """Ids of all live points."""
+        self._load()
+        return list(self._locations)
+
+    def fit_pca(self, dims: int, sample_size: int = 20000) -> None:
+        """Fit a PCA projection to `dims` dimensions on the stored vectors.
+
+        The projection is saved next to the segments and used from then
+        on, also after restarts; the codes are rebuilt with it.
+        """
+        self._load()
+        if self.path is None:
+            raise ValueError("Reducing dimensions needs a path to keep the original vectors")
+        sample = [
+            segment.vectors[np.flatnonzero(segment.live[:segment.size])]
+            for segment in self.segments
+        ]
+        sample = np.concatenate(sample)[:sample_size] if sample else np.empty((0, self.vector_size))
+        projection = Projection.fit_pca(sample, dims)
+        projection.save(self.path / PROJECTION)
+        self.codec = VectorCodec(self.codec.dtype, projection)
+        for segment in self.segments:
+            self._encode_segment(segment)
+        logger.info("Fitted a %d-dimensional projection on %d vectors", dims, len(sample))
+
+    def compact(self) -> None:
+        """Rewrite the live rows into fresh segments, dropping deleted ones."""
+        self._load()
+        old = self.segments
+        self.segments = []
+        self._locations = {}
+        self._sessions = {}
+        for segment in old:
+            rows = np.flatnonzero(segment.live[:segment.size])
+            if len(rows):
+                self._append(
+                    [segment.ids[row] for row in rows],
+                    segment.vectors[rows] if segment.vectors is not None else None,
+                    [segment.payloads[row] for row in rows],
+                    write_manifest=False,
+                    codes=segment.codes[rows] if segment.codes is not None else None,
+                    scales=segment.scales[rows] if segment.scales is not None else None
+                )
+
+        if self.path is not None:
+            self._write_manifest()
+            # Tombstones only refer to rows of the replaced segments
+            (self.path / TOMBSTONES).write_text("")
+            for segment in old:
+                segment.vectors = None
+                for suffix in (".f32", ".jsonl"):
+                    (self.path / f"{segment.name}{suffix}").unlink(missing_ok=True)
+        logger.info(
+            "Compacted local vector store from %d to %d segments",
+            len(old), len(self.segments)
+        )
+
+    def _search(
+        self,
+        queries: np.ndarray,
+        session_id: Optional[str],
+        limit: int
+    ) -> List[List[Tuple[float, _Segment, int]]]:
+        """Top `limit` live rows per query across all segments."""
+        if limit <= 0:
+            return [[] for _ in queries]
+        bitmaps = self._sessions.get(session_id, {}) if session_id else None
+        working = self.codec.dtype == "float16" and len(self._locations) <= self.working_copy_rows
+        if not working:
+            self.drop_working_copies()
+        scores: List[np.ndarray] = []
+        refs: List[Tuple[_Segment, np.ndarray]] = []
+        for segment in self.segments:
+            live = segment.live[:segment.size]
+            if bitmaps is not None:
+                if segment.name not in bitmaps:
+                    continue
+                live = live & bitmaps[segment.name][:segment.size]
+            rows = np.flatnonzero(live)
+            if not len(rows):
+                continue
+
+            # Gather only matching rows of selective filters
+            selection = slice(0, segment.size) if len(rows) == segment.size else rows
+            if segment.codes is None:
+                segment_scores = segment.vectors[selection] @ queries.T
+            elif working:
+                if segment.working is None:
+                    segment.working = self.codec.decode(segment.codes[:segment.size], None)
+                segment_scores = segment.working[selection] @ queries.T
+            else:
+                segment_scores = self.codec.scores(
+                    segment.codes[selection],
+                    segment.scales[selection] if segment.scales is not None else None,
+                    queries
+                )
+            k = min(limit, len(rows))
+            top = np.argpartition(-segment_scores, k - 1, axis=0)[:k]
+            scores.append(np.take_along_axis(segment_scores, top, axis=0))
+            refs.append((segment, rows[top]))
+
+        if not scores:
+            return [[] for _ in queries]
+
+        all_scores = np.concatenate(scores)
+        order = np.argsort(-all_scores, axis=0, kind="stable")[:limit]
+        owners = [segment for segment, rows in refs for _ in range(len(rows))]
+        all_rows = np.concatenate([rows for _, rows in refs])
+        return [
+            [
+                (float(all_scores[i, q]), owners[i], int(all_rows[i, q]))
+                for i in order[:, q]
+            ]
+            for q in range(len(queries))
+        ]
+
+    def _rescore(
+        self,
+        hits: List[Tuple[float, _Segment, int]],
+        query: np.ndarray,
+        limit: int
+    ) -> List[Tuple[float, _Segment, int]]:
+        """Re-rank candidates by their exact scores against the originals."""
+        if not hits:
+            return hits
+        originals = np.stack([segment.vectors[row] for _, segment, row in hits])
+        exact = originals @ query
+        order = np.argsort(-exact, kind="stable")[:limit]
+        return [(float(exact[i]), hits[i][1], hits[i][2]) for i in order]
+
+    def _vector(self, segment: _Segment, row: int) -> np.ndarray:
+        """A stored vector, decoded from its code if the original isn't kept."""
+        if segment.vectors is not None:
+            return np.array(segment.vectors[row])
+        scales = segment.scales[row:row + 1] if segment.scales is not None else None
+        return self.codec.decode(segment.codes[row:row + 1], scales)[0]
+
+    def _gather(self, hits: List[Tuple[float, _Segment, int]]) -> np.ndarray:
+        """Vectors of search hits as one matrix, copied once per segment."""
+        matrix = np.empty((len(hits), self.vector_size), dtype=np.float32)
+        groups: Dict[str, Tuple[_Segment, List[int], List[int]]] = {}
+        for i, (_, segment, row) in enumerate(hits):
+            _, positions, rows = groups.setdefault(segment.name, (segment, [], []))
+            positions.append(i)
+            rows.append(row)
+        for segment, positions, rows in groups.values():
+            if segment.vectors is not None:
+                matrix[positions] = segment.vectors[rows]
+            else:
+                scales = segment.scales[rows] if segment.scales is not None else None
+                matrix[positions] = self.codec.decode(segment.codes[rows], scales)
+        return matrix
+
+    def _encode_segment(self, segment: _Segment) -> None:
+        """Rebuild a segment's codes from its original vectors."""
+        if not self.codec.lossy:
+            segment.codes = segment.scales = None
+            return
+        self._allocate_codes(segment)
+        if segment.size:
+            self._write_codes(segment, 0, *self.codec.encode(segment.vectors[:segment.size]))
+
+    def _allocate_codes(self, segment: _Segment) -> None:
+        shape = (len(segment.live), self.codec.dims(self.vector_size))
+        segment.codes = np.zeros(shape, dtype=self.codec.dtype)
+        segment.working = None
+        segment.scales = (
+            np.zeros(len(segment.live), dtype=np.float32) if self.codec.dtype == "int8" else None
+        )
+
+    @staticmethod
+    def _write_codes(
+        segment: _Segment,
+        start: int,
+        codes: np.ndarray,
+        scales: Optional[np.ndarray]
+    ) -> None:
+        segment.codes[start:start + len(codes)] = codes
+        segment.working = None
+        if scales is not None:
+            segment.scales[start:start + len(codes)] = scales
+
+    def _append(
+        self,
+        ids: List[str],
+        vectors: Optional[np.ndarray],
+        payloads: List[Dict[str, Any]],
+        write_manifest: bool = True,
+        codes: Optional[np.ndarray] = None,
+        scales: Optional[np.ndarray] = None
+    ) -> None:
+        """Write rows into the last segment, starting new ones when full.
+
+        `codes` and `scales`, when given, are the rows' existing codes,
+        used when compacting a segment without originals.
+        """
+        if codes is None and self.codec.lossy:
+            codes, scales = self.codec.encode(vectors)
+        offset = 0
+        while offset < len(ids):
+            if not self.segments or not self.segments[-1].room:
+                self.segments.append(self._new_segment())
+                if write_manifest and self.path is not None:
+                    self._write_manifest()
+            segment = self.segments[-1]
+            start = segment.size
+            count = min(segment.room, len(ids) - offset)
+            batch_ids = ids[offset:offset + count]
+            batch_payloads = payloads[offset:offset + count]
+
+            if segment.vectors is not None:
+                segment.vectors[start:start + count] = vectors[offset:offset + count]
+            if segment.codes is not None:
+                self._write_codes(
+                    segment,
+                    start,
+                    codes[offset:offset + count],
+                    scales[offset:offset + count] if scales is not None else None
+                )
+            if self.path is not None:
+                # Vectors first: rows without a payload line are ignored on load
+                segment.vectors.flush()
+                with open(self.path / f"{segment.name}.jsonl", "a") as f:
+                    f.write("".join(
+                        json.dumps({"id": point_id, "payload": payload}) + "\n"
+                        for point_id, payload in zip(batch_ids, batch_payloads)
+                    ))
+            for row, (point_id, payload) in enumerate(zip(batch_ids, batch_payloads), start):
+                self._index(segment, row, point_id, payload)
+            offset += count
+
+    def _index(self, segment: _Segment, row: int, point_id: str, payload: Dict[str, Any]) -> None:
+        segment.ids.append(point_id)
+        segment.payloads.append(payload)
+        segment.live[row] = True
+        self._locations[point_id] = (segment, row)
+        session_id = payload.get("session_id")
+        if session_id is not None:
+            bitmaps = self._sessions.setdefault(session_id, {})
+            if segment.name not in bitmaps:
+                bitmaps[segment.name] = np.zeros(len(segment.live), dtype=bool)
+            bitmaps[segment.name][row] = True
+
+    def _new_segment(self) -> _Segment:
+        name = f"{self._next_segment:06d}"
+        self._next_segment += 1
+        shape = (self.segment_size, self.vector_size)
+        if self.path is not None:
+            vectors = np.memmap(self.path / f"{name}.f32", dtype=np.float32, mode="w+", shape=shape)
+        elif not self.codec.lossy:
+            vectors = np.zeros(shape, dtype=np.float32)
+        else:
+            # Only the codes are kept in memory
+            vectors = None
+        segment = _Segment(name, self.segment_size, vectors)
+        if self.codec.lossy:
+            self._allocate_codes(segment)
+        return segment
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            "vector_size": self.vector_size,
+            "segment_size": self.segment_size,
+            "next_segment": self._next_segment,
+            "segments": [segment.name for segment in self.segments],
+        }
+        tmp = self.path / f"{MANIFEST}.tmp"
+        tmp.write_text(json.dumps(manifest))
+        os.replace(tmp, self.path / MANIFEST)
+
+    def _load(self) -> None:
+        """Open the segments listed in the manifest, once."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.path is None:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.path / MANIFEST
+        if not manifest_path.exists():
+            self._write_manifest()
+            return
+
+        if (self.path / PROJECTION).exists():
+            self.codec = VectorCodec(self.codec.dtype, Projection.load(self.path / PROJECTION))
+        manifest = json.loads(manifest_path.read_text())
+        if manifest["vector_size"] != self.vector_size:
+            raise ValueError(
+                f"Index at {self.path} has {manifest['vector_size']} dimensions, "
+                f"expected {self.vector_size}"
+            )
+        self.segment_size = manifest["segment_size"]
+        self._next_segment = manifest["next_segment"]
+        shape = (self.segment_size, self.vector_size)
+        for name in manifest["segments"]:
+            segment = _Segment(
+                name,
+                self.segment_size,
+                np.memmap(self.path / f"{name}.f32", dtype=np.float32, mode="r+", shape=shape)
+            )
+            payloads_path = self.path / f"{name}.jsonl"
+            if payloads_path.exists():
+                with open(payloads_path) as f:
+                    for row, line in enumerate(f):
+                        record = json.loads(line)
+                        self._index(segment, row, record["id"], record["payload"])
+            self._encode_segment(segment)
+            self.segments.append(segment)
+
+        tombstones_path = self.path / TOMBSTONES
+        if tombstones_path.exists():
+            for point_id in tombstones_path.read_text().split():
+                location = self._locations.pop(point_id, None)
+                if location is not None:
+                    segment, row = location
+                    segment.live[row] = False
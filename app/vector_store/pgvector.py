@@ -0,0 +1,232 @@
+import json
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID, uuid4
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.metrics import VECTOR_SEARCH_DURATION
+from app.core.tracing import set_span_attributes, span
+from app.db.database import async_session_factory
+from app.vector_store.base import BaseVectorStore
+
+TABLE = "document_chunks"
+STAGING_TABLE = "document_chunks_staging"
+STAGING_COLUMNS = ("id", "session_id", "text", "metadata", "embedding")
+
+
+def _vector_literal(vector: Sequence[float]) -> str:
+    """Format an embedding as pgvector text input, e.g. `[0.1,0.2]`."""
+    return "[" + ",".join(map(repr, map(float, vector))) + "]"
+
+
+class PgVectorStore(BaseVectorStore):
+    """Vector store on the pgvector extension, in the application database.
+
+    Chunks are rows of `document_chunks`, created by the Alembic migrations
+    with an HNSW or IVFFlat cosine index and a `session_id` index, so they
+    can be joined against sessions and need no extra service. Inserts are
+    streamed with `COPY` in batches of `copy_batch_size`. Session-filtered
+    searches rank that session's rows exactly instead of filtering the
+    approximate index afterwards, which could return fewer than `limit`
+    results.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = async_session_factory,
+        vector_size: int = 1536,
+        copy_batch_size: int = 1000,
+        index: str = "hnsw",
+        ef_search: int = 40,
+        probes: int = 10
+    ) -> None:
+        self.session_factory = session_factory
+        self.vector_size = vector_size
+        self.copy_batch_size = copy_batch_size
+        self.index = index
+        self.ef_search = ef_search
+        self.probes = probes
+
+    async def ensure_collection(self) -> None:
+        """Check that the chunks table exists; it is created by migrations."""
+        async with self.session_factory() as db:
+            exists = await db.scalar(text("SELECT to_regclass(:table) IS NOT NULL"), {"table": TABLE})
+        if not exists:
+            raise RuntimeError(f"Table {TABLE} is missing, run the pgvector migration")
+
+    async def ping(self) -> None:
+        """Check the chunks table on a pooled connection."""
+        await self.ensure_collection()
+
+    async def add_texts(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadata: Optional[List[Dict[str, Any]]] = None,
+        session_id: Optional[UUID] = None,
+    ) -> List[str]:
+        """Add texts and their embeddings with batched `COPY`."""
+        if len(texts) != len(embeddings):
+            raise ValueError("Number of texts and embeddings must match")
+
+        if metadata is None:
+            metadata = [{} for _ in texts]
+
+        if len(metadata) != len(texts):
+            raise ValueError("Number of metadata items must match texts")
+
+        ids = [uuid4() for _ in texts]
+        records = [
+            (point_id, session_id, chunk, json.dumps(meta), _vector_literal(embedding))
+            for point_id, chunk, embedding, meta in zip(ids, texts, embeddings, metadata)
+        ]
+        if not records:
+            return []
+
+        async with self.session_factory() as db:
+            connection = await (await db.connection()).get_raw_connection()
+            driver = connection.driver_connection
+            # asyncpg has no codec for the vector type, so rows are copied
+            # into a staging table as text and cast in a single INSERT. The
+            # driver connection autocommits, so all of it runs in one
+            # explicit transaction for the staged rows to survive the COPY
+            async with driver.transaction():
+                await driver.execute(
+                    f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} "
+                    "(id uuid, session_id uuid, text text, metadata jsonb, embedding text) "
+                    "ON COMMIT DELETE ROWS"
+                )
+                for start in range(0, len(records), self.copy_batch_size):
+                    await driver.copy_records_to_table(
+                        STAGING_TABLE,
+                        records=records[start:start + self.copy_batch_size],
+                        columns=STAGING_COLUMNS
+                    )
+                await driver.execute(
+                    f"INSERT INTO {TABLE} (id, session_id, text, metadata, embedding) "
+                    f"SELECT id, session_id, text, metadata, embedding::vector FROM {STAGING_TABLE}"
+                )
+
+        return [str(point_id) for point_id in ids]
+
+    async def similarity_search(
+        self,
+        query_embedding: List[float],
+        session_id: Optional[UUID] = None,
+        limit: int = 5,
+        with_vectors: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Search for similar texts using embedding."""
+        columns = "id, session_id, text, metadata::text AS metadata"
+        if with_vectors:
+            columns += ", embedding::text AS embedding"
+        params = {"query": _vector_literal(query_embedding), "limit": limit}
+        if session_id:
+            # Adding zero keeps the planner off the vector index, so the
+            # session's rows are found by its index and ranked exactly
+            query = text(
+                f"SELECT {columns}, embedding <=> CAST(:query AS vector) AS distance "
+                f"FROM {TABLE} WHERE session_id = :session_id "
+                "ORDER BY (embedding <=> CAST(:query AS vector)) + 0 LIMIT :limit"
+            )
+            params["session_id"] = session_id
+        else:
+            query = text(
+                f"SELECT {columns}, embedding <=> CAST(:query AS vector) AS distance "
+                f"FROM {TABLE} ORDER BY embedding <=> CAST(:query AS vector) LIMIT :limit"
+            )
+
+        with span(
+            "vector_store.search",
+            collection=TABLE,
+            limit=limit,
+            filtered=session_id is not None
+        ) as search_span, VECTOR_SEARCH_DURATION.labels("pgvector").time():
+            async with self.session_factory() as db:
+                if not session_id:
+                    await self._set_search_params(db)
+                rows = (await db.execute(query, params)).all()
+            set_span_attributes(search_span, results=len(rows))
+
+        return [
+            {
+                "id": str(row.id),
+                "text": row.text,
+                "score": 1.0 - float(row.distance),
+                **({"vector": json.loads(row.embedding)} if with_vectors else {}),
+                **self._payload(row)
+            }
+            for row in rows
+        ]
+
+    async def get_by_ids(
+        self,
+        ids: List[str],
+        with_vectors: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Fetch stored texts by point id, skipping ids that no longer exist."""
+        point_ids = []
+        for point_id in ids:
+            try:
+                point_ids.append(UUID(point_id))
+            except ValueError:
+                continue
+        if not point_ids:
+            return []
+
+        columns = "id, session_id, text, metadata::text AS metadata"
+        if with_vectors:
+            columns += ", embedding::text AS embedding"
+        with span("vector_store.retrieve", collection=TABLE, ids=len(ids)) as retrieve_span:
+            async with self.session_factory() as db:
+                rows = (await db.execute(
+                    text(f"SELECT {columns} FROM {TABLE} WHERE id = ANY(:ids)"),
+                    {"ids": point_ids}
+                )).all()
+            set_span_attributes(retrieve_span, results=len(rows))
+
+        return [
+            {
+                "id": str(row.id),
+                "text": row.text,
+                **({"vector": json.loads(row.embedding)} if with_vectors else {}),
+                **self._payload(row)
+            }
+            for row in rows
+        ]
+
+    async def delete_by_session(self, session_id: UUID) -> None:
+        """Delete all vectors for a given session."""
+        await self.delete_by_sessions([session_id])
+
+    async def delete_by_sessions(self, session_ids: List[UUID]) -> int:
+        """Delete all vectors for several sessions in one statement.
+
+        Returns the number of vectors that were deleted.
+        """
+        if not session_ids:
+            return 0
+        async with self.session_factory() as db:
+            result = await db.execute(
+                text(f"DELETE FROM {TABLE} WHERE session_id = ANY(:session_ids)"),
+                {"session_ids": list(session_ids)}
+            )
+            await db.commit()
+        return result.rowcount
+
+    async def _set_search_params(self, db: AsyncSession) -> None:
+        """Apply the index's recall setting for this transaction."""
+        if self.index == "ivfflat":
+            await db.execute(text(f"SET LOCAL ivfflat.probes = {int(self.probes)}"))
+        else:
+            await db.execute(text(f"SET LOCAL hnsw.ef_search = {int(self.ef_search)}"))
+
+    @staticmethod
+    def _payload(row: Any) -> Dict[str, Any]:
+        """Rebuild the Qdrant-style payload from a row's metadata and session."""
+        payload = json.loads(row.metadata) if row.metadata else {}
+        if row.session_id is not None:
+            payload["session_id"] = str(row.session_id)
+        return payload
@@ -0,0 +1,132 @@
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Storage types for vector codes, by bytes per dimension: 4, 2 and 1
+DTYPES = ("float32", "float16", "int8")
+
+# Rows converted to float32 at a time when scoring compact codes, few
+# enough for the converted block to stay in cache
+_SCORE_BLOCK = 512
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class Projection:
+    """Linear map of embeddings to fewer dimensions.
+
+    Either Matryoshka-style truncation, keeping the leading dimensions of
+    models trained for it, or a PCA basis fitted on stored vectors. The
+    basis is uncentered, so dot products of unit vectors are preserved as
+    well as `dims` dimensions allow.
+    """
+
+    def __init__(self, dims: int, components: Optional[np.ndarray] = None) -> None:
+        self.dims = dims
+        # (dims, input dimensions), or None for truncation
+        self.components = components
+
+    @classmethod
+    def truncate(cls, dims: int) -> "Projection":
+        return cls(dims)
+
+    @classmethod
+    def fit_pca(cls, vectors: np.ndarray, dims: int) -> "Projection":
+        """Fit the `dims` principal directions of `vectors`."""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if len(matrix) < dims:
+            raise ValueError(f"Fitting {dims} components needs at least {dims} vectors")
+        _, _, basis = np.linalg.svd(matrix, full_matrices=False)
+        return cls(dims, basis[:dims].astype(np.float32))
+
+    def apply(self, vectors: np.ndarray) -> np.ndarray:
+        """Project rows and scale them back to unit length."""
+        if self.components is None:
+            reduced = vectors[:, :self.dims]
+        else:
+            reduced = vectors @ self.components.T
+        return _normalize(np.asarray(reduced, dtype=np.float32))
+
+    def save(self, path: Path) -> None:
+        np.save(path, self.components)
+
+    @classmethod
+    def load(cls, path: Path) -> "Projection":
+        components = np.load(path)
+        return cls(len(components), components)
+
+
+class VectorCodec:
+    """Compact in-memory encoding of unit vectors.
+
+    Vectors are optionally projected to fewer dimensions, then stored as
+    float32, float16, or int8 with one float32 scale per row. Scores are
+    cosine similarities in the projected space; only float32 without a
+    projection is exact.
+    """
+
+    def __init__(self, dtype: str = "float32", projection: Optional[Projection] = None) -> None:
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown vector dtype {dtype!r}, expected one of {DTYPES}")
+        self.dtype = dtype
+        self.projection = projection
+
+    @property
+    def lossy(self) -> bool:
+        return self.dtype != "float32" or self.projection is not None
+
+    def dims(self, vector_size: int) -> int:
+        return self.projection.dims if self.projection is not None else vector_size
+
+    def bytes_per_vector(self, vector_size: int) -> int:
+        dims = self.dims(vector_size)
+        if self.dtype == "int8":
+            return dims + 4
+        return dims * np.dtype(self.dtype).itemsize
+
+    def encode_queries(self, queries: np.ndarray) -> np.ndarray:
+        """Unit query vectors in the codes' space, as float32."""
+        return self.projection.apply(queries) if self.projection is not None else queries
+
+    def encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Codes and, for int8, per-row scales of unit vectors."""
+        vectors = self.encode_queries(np.asarray(vectors, dtype=np.float32))
+        if self.dtype == "float32":
+            return vectors, None
+        if self.dtype == "float16":
+            return vectors.astype(np.float16), None
+        scales = np.maximum(np.abs(vectors).max(axis=1), 1e-12) / 127
+        codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    def decode(self, codes: np.ndarray, scales: Optional[np.ndarray]) -> np.ndarray:
+        """Approximate vectors in the codes' space."""
+        vectors = codes.astype(np.float32)
+        if scales is not None:
+            vectors *= scales[..., None]
+        return vectors
+
+    def scores(
+        self,
+        codes: np.ndarray,
+        scales: Optional[np.ndarray],
+        queries: np.ndarray
+    ) -> np.ndarray:
+        """Similarity of each code row to each encoded query, (rows, queries).
+
+        Compact codes are widened to float32 in blocks, bounding the
+        temporary memory a scan needs.
+        """
+        if self.dtype == "float32":
+            return codes @ queries.T
+        result = np.empty((len(codes), len(queries)), dtype=np.float32)
+        for start in range(0, len(codes), _SCORE_BLOCK):
+            end = start + _SCORE_BLOCK
+            result[start:end] = codes[start:end].astype(np.float32) @ queries.T
+        if scales is not None:
+            result *= scales[:, None]
+        return result
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from app.core.config import get_settings
+from app.core.metrics import DOCUMENT_CHUNKS, SESSION_INDEX_SPILLS
+from app.vector_store.base import BaseVectorStore
+from app.vector_store.client import get_vector_store
+from app.vector_store.local import LocalVectorStore
+from app.vector_store.quantization import VectorCodec
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Rows allocated at a time, so small indexes stay small
+SEGMENT_SIZE = 64
+
+
+class _SessionIndex:
+    def __init__(self, store: LocalVectorStore, expires_at: datetime) -> None:
+        self.store = store
+        self.expires_at = expires_at
+
+
+class SessionIndexes:
+    """Per-session in-memory indexes of uploaded documents.
+
+    A session's chunks live in a `LocalVectorStore` of its own, so
+    searching them is a brute-force product over a few hundred rows
+    instead of a round trip to the shared store. Once a session holds more
+    than `max_chunks`, or is the least recently used of more than
+    `max_sessions`, its chunks move to the shared store and later uploads
+    go there directly. Indexes are dropped when their session expires.
+    A float16 or int8 `dtype` halves or quarters their memory; spilled
+    chunks then carry the decoded, approximate vectors. The
+    `working_copies` most recently used float16 indexes are also kept as
+    float32, which they are scored from.
+    """
+
+    def __init__(
+        self,
+        max_chunks: int,
+        max_sessions: int,
+        vector_size: int = 1536,
+        shared: Optional[BaseVectorStore] = None,
+        dtype: str = "float32",
+        working_copies: int = 0
+    ) -> None:
+        self.max_chunks = max_chunks
+        self.max_sessions = max_sessions
+        self.vector_size = vector_size
+        self._shared = shared
+        self.codec = VectorCodec(dtype)
+        self.working_copies = working_copies
+        self._indexes: "OrderedDict[UUID, _SessionIndex]" = OrderedDict()
+        # Expiry of sessions whose chunks are in the shared store
+        self._spilled: Dict[UUID, datetime] = {}
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    @property
+    def shared(self) -> BaseVectorStore:
+        return self._shared if self._shared is not None else get_vector_store()
+
+    def get(self, session_id: Optional[UUID]) -> Optional[LocalVectorStore]:
+        """The in-memory index of a session, or None if it has none."""
+        index = self._indexes.get(session_id) if session_id else None
+        if index is None:
+            return None
+        if index.expires_at <= datetime.utcnow():
+            del self._indexes[session_id]
+            return None
+        self._touch(session_id)
+        return index.store
+
+    async def add_texts(
+        self,
+        session_id: UUID,
+        expires_at: datetime,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadata: Optional[List[Dict[str, Any]]] = None
+    ) -> List[str]:
+        """Index a session's chunks in memory, spilling when it gets too big."""
+        async with self._lock:
+            index = self._indexes.get(session_id)
+            if index is None and session_id not in self._spilled:
+                index = _SessionIndex(
+                    LocalVectorStore(
+                        vector_size=self.vector_size,
+                        segment_size=SEGMENT_SIZE,
+                        codec=self.codec,
+                        working_copy_rows=self.max_chunks if self.working_copies else 0
+                    ),
+                    expires_at
+                )
+                self._indexes[session_id] = index
+            if index is not None and len(index.store) + len(texts) > self.max_chunks:
+                await self._spill(session_id, "size")
+                index = None
+
+            if index is None:
+                ids = await self.shared.add_texts(texts, embeddings, metadata, session_id=session_id)
+                DOCUMENT_CHUNKS.labels("shared").inc(len(ids))
+                return ids
+
+            ids = await index.store.add_texts(texts, embeddings, metadata, session_id=session_id)
+            DOCUMENT_CHUNKS.labels("memory").inc(len(ids))
+            self._touch(session_id)
+            while len(self._indexes) > self.max_sessions:
+                await self._spill(next(iter(self._indexes)), "evicted")
+            return ids
+
+    def drop(self, session_ids: Iterable[UUID]) -> None:
+        """Forget sessions, e.g. after they were deleted."""
+        for session_id in session_ids:
+            self._indexes.pop(session_id, None)
+            self._spilled.pop(session_id, None)
+
+    def drop_expired(self) -> int:
+        """Drop the indexes of expired sessions, returning how many were dropped."""
+        now = datetime.utcnow()
+        expired = [s for s, index in self._indexes.items() if index.expires_at <= now]
+        self.drop(expired)
+        self.drop([s for s, expires_at in self._spilled.items() if expires_at <= now])
+        return len(expired)
+
+    def _touch(self, session_id: UUID) -> None:
+        """Mark a session's index most recently used."""
+        self._indexes.move_to_end(session_id)
+        # Only the most recently used indexes keep their float32 copies
+        cooled = next(islice(reversed(self._indexes.values()), self.working_copies, None), None)
+        if cooled is not None:
+            cooled.store.drop_working_copies()
+
+    async def _spill(self, session_id: UUID, reason: str) -> None:
+        """Move a session's chunks to the shared store."""
+        index = self._indexes[session_id]
+        points = await index.store.get_by_ids(index.store.point_ids(), with_vectors=True)
+        if points:
+            await self.shared.add_texts(
+                [point["text"] for point in points],
+                [point["vector"] for point in points],
+                [
+                    {k: v for k, v in point.items() if k not in ("id", "text", "vector", "session_id")}
+                    for point in points
+                ],
+                session_id=session_id
+            )
+        # Only forget the index once the shared store has its chunks
+        del self._indexes[session_id]
+        self._spilled[session_id] = index.expires_at
+        SESSION_INDEX_SPILLS.labels(reason).inc()
+        logger.info("Moved %d chunks of session %s to the shared store", len(points), session_id)
+
+
+_indexes: Optional[SessionIndexes] = None
+
+
+def get_session_indexes() -> SessionIndexes:
+    """Get the worker's per-session document indexes."""
+    global _indexes
+    if _indexes is None:
+        _indexes = SessionIndexes(
+            settings.SESSION_INDEX_MAX_CHUNKS,
+            settings.SESSION_INDEX_MAX_SESSIONS,
+            vector_size=settings.VECTOR_SIZE,
+            dtype=settings.SESSION_INDEX_DTYPE,
+            working_copies=settings.SESSION_INDEX_WORKING_COPIES
+        )
+    return _indexes
@@ -0,0 +1,321 @@
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, Iterator, Optional
+from uuid import uuid4
+
+import httpx
+import typer
+from pydantic import BaseModel
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.stats import Recorder, compare as compare_reports
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Create Typer app
+cli = typer.Typer(help="End-to-end load test for the chat API")
+console = Console()
+
+API_PREFIX = "/api/v1"
+
+# Scripted conversation, mixing fresh questions with follow-ups
+CONVERSATION = [
+    "What does the onboarding guide say about setting up a development environment?",
+    "Which services need to be running locally?",
+    "thanks!",
+    "Can you rephrase that more briefly?",
+    "How are database migrations applied?",
+    "What happens to a chat session after it expires?",
+]
+
+# Environment for a spawned server: fake model backends and no per-user
+# rate limit, since scripted users send turns back to back. Everything else
+# comes from .env
+FAKE_BACKEND_ENV = {
+    "LLM_BACKEND": "fake",
+    "EMBEDDING_BACKEND": "fake",
+    "ADMISSION_USER_RATE_PER_MINUTE": "0",
+}
+
+
+class LoadTestConfig(BaseModel):
+    """Parameters of a load test run."""
+    base_url: str
+    users: int
+    turns: int
+    list_every: int
+    ramp_up_seconds: float
+    timeout_seconds: float
+
+
+async def timed_request(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    endpoint: str,
+    method: str,
+    url: str,
+    **kwargs: Any
+) -> Optional[httpx.Response]:
+    """Send a request and record its latency and outcome."""
+    start = perf_counter()
+    response = None
+    try:
+        response = await client.request(method, url, **kwargs)
+        ok = response.status_code < 400
+    except httpx.HTTPError:
+        ok = False
+    recorder.record(endpoint, (perf_counter() - start) * 1000, ok)
+    return response if ok else None
+
+
+async def run_user(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    config: LoadTestConfig,
+    run_id: str,
+    user_index: int
+) -> None:
+    """Register, log in and hold one scripted conversation."""
+    await asyncio.sleep(config.ramp_up_seconds * user_index / max(config.users, 1))
+
+    username = f"bench-{run_id}-{user_index}"
+    password = "bench-password"
+    registered = await timed_request(
+        client, recorder, "register", "POST", f"{API_PREFIX}/auth/register",
+        json={
+            "username": username,
+            "email": f"{username}@bench.example.com",
+            "password": password
+        }
+    )
+    if registered is None:
+        return
+
+    login = await timed_request(
+        client, recorder, "login", "POST", f"{API_PREFIX}/auth/login",
+        data={"username": username, "password": password}
+    )
+    if login is None:
+        return
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    session = await timed_request(
+        client, recorder, "create_session", "POST", f"{API_PREFIX}/chat/sessions",
+        headers=headers,
+        json={"title": f"Benchmark session {user_index}"}
+    )
+    if session is None:
+        return
+    session_id = session.json()["id"]
+
+    for turn in range(config.turns):
+        await timed_request(
+            client, recorder, "send_message", "POST",
+            f"{API_PREFIX}/chat/sessions/{session_id}/messages",
+            headers=headers,
+            json={"content": CONVERSATION[turn % len(CONVERSATION)]}
+        )
+        if config.list_every and (turn + 1) % config.list_every == 0:
+            await timed_request(
+                client, recorder, "list_sessions", "GET",
+                f"{API_PREFIX}/chat/sessions",
+                headers=headers
+            )
+
+
+async def run_load_test(config: LoadTestConfig) -> Dict[str, Any]:
+    """Run all virtual users concurrently and build the report."""
+    recorder = Recorder()
+    run_id = uuid4().hex[:8]
+
+    async with httpx.AsyncClient(
+        base_url=config.base_url,
+        timeout=config.timeout_seconds,
+        limits=httpx.Limits(max_connections=config.users * 2)
+    ) as client:
+        start = perf_counter()
+        await asyncio.gather(*(
+            run_user(client, recorder, config, run_id, i)
+            for i in range(config.users)
+        ))
+        duration = perf_counter() - start
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "commit": _git_commit(),
+            "duration_seconds": duration,
+            "config": config.model_dump(),
+        },
+        "endpoints": recorder.report(duration),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _prepare_backends() -> None:
+    """Make sure the vector collection exists before traffic starts."""
+    from app.vector_store import get_vector_store
+
+    asyncio.run(get_vector_store().ensure_collection())
+
+
+@contextmanager
+def spawn_server(port: int, workers: int) -> Iterator[str]:
+    """Run the API under uvicorn with fake model backends."""
+    _prepare_backends()
+
+    env = {**os.environ, **FAKE_BACKEND_ENV}
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--workers", str(workers),
+            "--log-level", "warning",
+        ],
+        env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                if httpx.get(f"{base_url}/health/ready").status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("API server did not become healthy")
+            time.sleep(0.2)
+        logger.info("Started API server at %s", base_url)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def _print_report(report: Dict[str, Dict[str, Any]]) -> None:
+    table = Table(title="Per-endpoint results")
+    for column in ("endpoint", "count", "rps", "p50 ms", "p95 ms", "p99 ms", "error rate"):
+        table.add_column(column, justify="left" if column == "endpoint" else "right")
+    for name, stats in report.items():
+        table.add_row(
+            name,
+            str(stats["count"]),
+            f"{stats['rps']:.1f}",
+            f"{stats['p50_ms']:.1f}",
+            f"{stats['p95_ms']:.1f}",
+            f"{stats['p99_ms']:.1f}",
+            f"{stats['error_rate']:.1%}",
+        )
+    console.print(table)
+
+
+@cli.command()
+def run(
+    base_url: str = typer.Option(
+        "http://127.0.0.1:8000", "--base-url", help="API to load test"
+    ),
+    users: int = typer.Option(10, "--users", "-u", help="Concurrent virtual users"),
+    turns: int = typer.Option(6, "--turns", "-t", help="Messages sent per user"),
+    list_every: int = typer.Option(
+        3, "--list-every", help="List sessions after every N turns, 0 to disable"
+    ),
+    ramp_up: float = typer.Option(
+        5.0, "--ramp-up", help="Seconds over which users start"
+    ),
+    timeout: float = typer.Option(60.0, "--timeout", help="Request timeout in seconds"),
+    output: Optional[Path] = typer.Option(
+        None, "--output", "-o", help="Write the JSON report to this file"
+    ),
+    spawn: bool = typer.Option(
+        False, "--spawn-server", help="Start the API locally with fake model backends"
+    ),
+    port: int = typer.Option(8765, "--port", help="Port for a spawned server"),
+    workers: int = typer.Option(1, "--workers", help="Uvicorn workers for a spawned server"),
+) -> None:
+    """Run scripted multi-user conversations and report latency per endpoint."""
+    def _run(url: str) -> Dict[str, Any]:
+        config = LoadTestConfig(
+            base_url=url,
+            users=users,
+            turns=turns,
+            list_every=list_every,
+            ramp_up_seconds=ramp_up,
+            timeout_seconds=timeout,
+        )
+        return asyncio.run(run_load_test(config))
+
+    if spawn:
+        with spawn_server(port, workers) as url:
+            report = _run(url)
+    else:
+        report = _run(base_url)
+
+    _print_report(report["endpoints"])
+    if output:
+        output.write_text(json.dumps(report, indent=2))
+        logger.info("Wrote report to %s", output)
+
+
+@cli.command()
+def compare(
+    baseline: Path = typer.Argument(..., help="JSON report of the reference run"),
+    candidate: Path = typer.Argument(..., help="JSON report of the run to check"),
+    threshold: float = typer.Option(
+        0.1, "--threshold", help="Allowed relative p95 regression"
+    ),
+) -> None:
+    """Compare two reports and fail on p95 latency or error rate regressions."""
+    before = json.loads(baseline.read_text())["endpoints"]
+    after = json.loads(candidate.read_text())["endpoints"]
+    changes = compare_reports(before, after)
+
+    table = Table(title=f"{candidate.name} vs {baseline.name}")
+    for column in ("endpoint", "metric", "baseline", "candidate", "change"):
+        table.add_column(column, justify="left" if column in ("endpoint", "metric") else "right")
+
+    regressed = False
+    for name, metrics in changes.items():
+        for metric, values in metrics.items():
+            worse = (
+                (metric == "p95_ms" and values["change"] > threshold)
+                or (metric == "error_rate" and values["candidate"] > values["baseline"])
+            )
+            regressed = regressed or worse
+            table.add_row(
+                name,
+                metric,
+                f"{values['baseline']:.3f}",
+                f"{values['candidate']:.3f}",
+                f"[red]{values['change']:+.1%}[/red]" if worse else f"{values['change']:+.1%}",
+            )
+    console.print(table)
+
+    if regressed:
+        raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,429 @@
+import asyncio
+import json
+import logging
+import tempfile
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+import numpy as np
+import typer
+from qdrant_client import QdrantClient
+from rich.console import Console
+from rich.table import Table
+
+from app.core.config import get_settings
+from app.llm import FakeEmbeddings, call_model
+from app.rag.mmr import mmr_rerank
+from app.vector_store import BaseVectorStore, LocalVectorStore, VectorStore, get_embeddings
+from app.vector_store.quantization import Projection, VectorCodec
+from benchmarks.stats import summarize
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Create Typer app
+cli = typer.Typer(help="Micro-benchmarks for the vector store and embedding paths")
+console = Console()
+
+
+def _parse_sizes(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def _parse_fractions(value: str) -> List[float]:
+    return [float(v) for v in value.split(",") if v]
+
+
+def _random_vectors(count: int, dimensions: int, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((count, dimensions))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _decaying_vectors(count: int, dimensions: int, seed: int = 0) -> np.ndarray:
+    """Unit vectors whose variance falls off over the dimensions.
+
+    A stand-in for embeddings, which concentrate most of their variance in
+    few directions, the leading ones for Matryoshka-style models; isotropic
+    random vectors would make any dimension reduction look useless.
+    """
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, dimensions)) / np.sqrt(np.arange(1, dimensions + 1))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _make_store(qdrant_url: Optional[str], dimensions: int, local: bool = False) -> BaseVectorStore:
+    """Create a vector store on a fresh, uniquely named collection."""
+    if local:
+        return LocalVectorStore(vector_size=dimensions)
+    client = QdrantClient(url=qdrant_url) if qdrant_url else QdrantClient(location=":memory:")
+    return VectorStore(
+        client=client,
+        collection_name=f"bench_{uuid4().hex[:8]}",
+        vector_size=dimensions
+    )
+
+
+def _drop(store: BaseVectorStore) -> None:
+    if isinstance(store, VectorStore):
+        store.client.delete_collection(store.collection_name)
+
+
+def _print(title: str, rows: List[Dict[str, Any]]) -> None:
+    table = Table(title=title)
+    for column in rows[0]:
+        table.add_column(column, justify="right")
+    for row in rows:
+        table.add_row(*(f"{v:.4g}" if isinstance(v, float) else str(v) for v in row.values()))
+    console.print(table)
+
+
+def _write(output: Optional[Path], name: str, rows: List[Dict[str, Any]]) -> None:
+    if output:
+        output.write_text(json.dumps({"benchmark": name, "results": rows}, indent=2))
+        logger.info("Wrote results to %s", output)
+
+
+async def bench_upsert(
+    qdrant_url: Optional[str],
+    batch_sizes: List[int],
+    total: int,
+    dimensions: int,
+    local: bool = False
+) -> List[Dict[str, Any]]:
+    """Upsert throughput of `add_texts` per batch size."""
+    rows = []
+    for batch_size in batch_sizes:
+        store = _make_store(qdrant_url, dimensions, local)
+        await store.ensure_collection()
+        vectors = _random_vectors(total, dimensions)
+        latencies = []
+        start = perf_counter()
+        for offset in range(0, total, batch_size):
+            batch = vectors[offset:offset + batch_size]
+            batch_start = perf_counter()
+            await store.add_texts(
+                texts=[f"chunk {offset + i}" for i in range(len(batch))],
+                embeddings=batch.tolist(),
+                session_id=uuid4()
+            )
+            latencies.append((perf_counter() - batch_start) * 1000)
+        elapsed = perf_counter() - start
+        _drop(store)
+        rows.append({
+            "batch_size": batch_size,
+            "points_per_s": total / elapsed,
+            **summarize(latencies),
+        })
+    return rows
+
+
+async def bench_search(
+    qdrant_url: Optional[str],
+    collection_sizes: List[int],
+    selectivities: List[float],
+    queries: int,
+    limit: int,
+    dimensions: int,
+    local: bool = False
+) -> List[Dict[str, Any]]:
+    """Search latency per collection size and session filter selectivity.
+
+    A selectivity of 0.01 means the filtered session owns 1% of the
+    collection; 1.0 runs an unfiltered search.
+    """
+    rows = []
+    for size in collection_sizes:
+        store = _make_store(qdrant_url, dimensions, local)
+        await store.ensure_collection()
+        vectors = _random_vectors(size, dimensions)
+
+        # Split the collection into sessions of each requested selectivity
+        sessions = {}
+        offset = 0
+        for selectivity in selectivities:
+            if selectivity >= 1.0:
+                continue
+            count = max(int(size * selectivity), 1)
+            session_id = uuid4()
+            sessions[selectivity] = session_id
+            await store.add_texts(
+                texts=[f"chunk {offset + i}" for i in range(count)],
+                embeddings=vectors[offset:offset + count].tolist(),
+                session_id=session_id
+            )
+            offset += count
+        for start in range(offset, size, 1000):
+            batch = vectors[start:min(start + 1000, size)]
+            await store.add_texts(
+                texts=[f"chunk {start + i}" for i in range(len(batch))],
+                embeddings=batch.tolist()
+            )
+
+        query_vectors = _random_vectors(queries, dimensions, seed=1)
+        for selectivity in selectivities:
+            latencies = []
+            for query in query_vectors:
+                start = perf_counter()
+                await store.similarity_search(
+                    query_embedding=query.tolist(),
+                    session_id=sessions.get(selectivity),
+                    limit=limit
+                )
+                latencies.append((perf_counter() - start) * 1000)
+            rows.append({
+                "collection_size": size,
+                "selectivity": selectivity,
+                **summarize(latencies),
+            })
+        _drop(store)
+    return rows
+
+
+async def bench_embed(
+    batch_sizes: List[int],
+    total: int,
+    backend: str,
+    latency_ms: float
+) -> List[Dict[str, Any]]:
+    """Embedding throughput per batch size.
+
+    The fake backend is a fake of its own with the requested latency,
+    called through the shared rate limiter like `get_embeddings` does. The
+    openai backend goes through `get_embeddings` itself, so it must be the
+    configured `EMBEDDING_BACKEND`.
+    """
+    if backend == "fake":
+        fake = FakeEmbeddings.from_settings(get_settings().model_copy(update={
+            "FAKE_EMBEDDING_LATENCY_MS": latency_ms,
+            "FAKE_LLM_LATENCY_DISTRIBUTION": "constant",
+            "FAKE_LLM_ERROR_RATE": 0.0,
+        }))
+
+        async def embed(batch: List[str]) -> List[List[float]]:
+            return await call_model("embeddings", lambda: fake.aembed_documents(batch))
+    elif backend == "openai":
+        if get_settings().EMBEDDING_BACKEND != "openai":
+            raise ValueError("Set EMBEDDING_BACKEND=openai to benchmark the openai backend")
+        embed = get_embeddings
+    else:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+
+    texts = [f"Benchmark sentence number {i} about retrieval." for i in range(total)]
+    rows = []
+    for batch_size in batch_sizes:
+        latencies = []
+        start = perf_counter()
+        for offset in range(0, total, batch_size):
+            batch_start = perf_counter()
+            await embed(texts[offset:offset + batch_size])
+            latencies.append((perf_counter() - batch_start) * 1000)
+        elapsed = perf_counter() - start
+        rows.append({
+            "batch_size": batch_size,
+            "texts_per_s": total / elapsed,
+            **summarize(latencies),
+        })
+    return rows
+
+
+def bench_mmr(
+    candidate_counts: List[int],
+    k: int,
+    lambda_mult: float,
+    repeats: int,
+    dimensions: int
+) -> List[Dict[str, Any]]:
+    """Latency of MMR re-ranking per number of candidates.
+
+    Candidates carry their vectors as rows of one matrix, the way the
+    local store returns them, so re-stacking them is included.
+    """
+    rows = []
+    for count in candidate_counts:
+        vectors = _random_vectors(count, dimensions)
+        queries = _random_vectors(repeats, dimensions, seed=1)
+        latencies = []
+        for query in queries:
+            results = [{"id": str(i), "vector": vector} for i, vector in enumerate(vectors)]
+            start = perf_counter()
+            mmr_rerank(query, results, k, lambda_mult)
+            latencies.append((perf_counter() - start) * 1000)
+        rows.append({"candidates": count, "k": k, **summarize(latencies)})
+    return rows
+
+
+async def bench_quantization(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    limit: int,
+    reduced_dimensions: int,
+    oversampling: float
+) -> List[Dict[str, Any]]:
+    """Recall@limit, memory and latency of the local index's storage codecs.
+
+    Recall is measured against exact float32 search. Rows with oversampling
+    above 1 rescore that many times `limit` candidates with the float32
+    originals kept on disk. The float16 row with a working copy scores a
+    float32 copy of the codes, as small indexes do.
+    """
+    dimensions = vectors.shape[1]
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    exact = np.argsort(-(normalized @ queries.T), axis=0)[:limit].T
+
+    configs = [("float32", None, 1.0, False), ("float16", None, 1.0, False), ("float16", None, 1.0, True)]
+    for dtype, reduction in [("int8", None), ("float16", "truncate"), ("int8", "truncate"), ("int8", "pca")]:
+        configs += [(dtype, reduction, 1.0, False), (dtype, reduction, oversampling, False)]
+
+    rows = []
+    for dtype, reduction, factor, working_copy in configs:
+        projection = Projection.truncate(reduced_dimensions) if reduction == "truncate" else None
+        with tempfile.TemporaryDirectory() as path:
+            store = LocalVectorStore(
+                path=path,
+                vector_size=dimensions,
+                codec=VectorCodec(dtype, projection),
+                oversampling=factor,
+                working_copy_rows=len(vectors) if working_copy else 0
+            )
+            ids = await store.add_texts([""] * len(vectors), vectors)
+            if reduction == "pca":
+                store.fit_pca(reduced_dimensions)
+            positions = {point_id: i for i, point_id in enumerate(ids)}
+
+            latencies = []
+            hits = 0
+            for query, expected in zip(queries, exact):
+                start = perf_counter()
+                results = await store.similarity_search(query, limit=limit)
+                latencies.append((perf_counter() - start) * 1000)
+                hits += len({positions[r["id"]] for r in results} & set(expected))
+            rows.append({
+                "dtype": dtype,
+                "dimensions": store.codec.dims(dimensions),
+                "reduction": reduction or "-",
+                "oversampling": factor,
+                "working_copy": working_copy,
+                "bytes_per_vector": store.codec.bytes_per_vector(dimensions),
+                # A working copy adds float32 rows next to the codes
+                "ram_mb": (
+                    store.codec.bytes_per_vector(dimensions) + (4 * dimensions if working_copy else 0)
+                ) * len(vectors) / 1e6,
+                f"recall@{limit}": hits / (len(queries) * limit),
+                **summarize(latencies)
+            })
+    return rows
+
+
+@cli.command()
+def upsert(
+    batch_sizes: str = typer.Option("1,16,64,256,1024", help="Comma separated batch sizes"),
+    total: int = typer.Option(4096, help="Points upserted per batch size"),
+    dimensions: int = typer.Option(1536, help="Vector dimensions"),
+    qdrant_url: Optional[str] = typer.Option(
+        None, "--qdrant-url", help="Qdrant server, in-memory mode when omitted"
+    ),
+    local: bool = typer.Option(False, "--local", help="Use the local NumPy index instead of Qdrant"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="JSON output file"),
+) -> None:
+    """Measure upsert throughput at various batch sizes."""
+    rows = asyncio.run(bench_upsert(qdrant_url, _parse_sizes(batch_sizes), total, dimensions, local))
+    _print("Upsert throughput", rows)
+    _write(output, "upsert", rows)
+
+
+@cli.command()
+def search(
+    collection_sizes: str = typer.Option("1000,10000,50000", help="Comma separated sizes"),
+    selectivities: str = typer.Option(
+        "0.001,0.01,0.1,1.0", help="Comma separated fractions matched by the session filter"
+    ),
+    queries: int = typer.Option(200, help="Queries per configuration"),
+    limit: int = typer.Option(5, help="Results per query"),
+    dimensions: int = typer.Option(1536, help="Vector dimensions"),
+    qdrant_url: Optional[str] = typer.Option(
+        None, "--qdrant-url", help="Qdrant server, in-memory mode when omitted"
+    ),
+    local: bool = typer.Option(False, "--local", help="Use the local NumPy index instead of Qdrant"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="JSON output file"),
+) -> None:
+    """Measure search latency against collection size and filter selectivity."""
+    rows = asyncio.run(bench_search(
+        qdrant_url,
+        _parse_sizes(collection_sizes),
+        _parse_fractions(selectivities),
+        queries,
+        limit,
+        dimensions,
+        local
+    ))
+    _print("Search latency", rows)
+    _write(output, "search", rows)
+
+
+@cli.command()
+def mmr(
+    candidate_counts: str = typer.Option("50,200,500,1000", help="Comma separated candidate counts"),
+    k: int = typer.Option(8, help="Results selected per query"),
+    lambda_mult: float = typer.Option(0.5, "--lambda", help="Relevance weight"),
+    repeats: int = typer.Option(200, help="Queries per candidate count"),
+    dimensions: int = typer.Option(1536, help="Vector dimensions"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="JSON output file"),
+) -> None:
+    """Measure MMR re-selection latency against the number of candidates."""
+    rows = bench_mmr(_parse_sizes(candidate_counts), k, lambda_mult, repeats, dimensions)
+    _print("MMR latency", rows)
+    _write(output, "mmr", rows)
+
+
+@cli.command()
+def quantization(
+    total: int = typer.Option(20000, help="Vectors indexed"),
+    queries: int = typer.Option(200, help="Queries per configuration"),
+    limit: int = typer.Option(8, help="Results per query, the k of recall@k"),
+    dimensions: int = typer.Option(1536, help="Vector dimensions of synthetic vectors"),
+    reduced_dimensions: int = typer.Option(384, help="Dimensions kept by truncation or PCA"),
+    oversampling: float = typer.Option(4.0, help="Candidates rescored, as a multiple of the limit"),
+    vectors_path: Optional[Path] = typer.Option(
+        None, "--vectors", help="NumPy .npy file of real embeddings, synthetic when omitted"
+    ),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="JSON output file"),
+) -> None:
+    """Measure recall, memory and latency of reduced and quantized vectors."""
+    if vectors_path:
+        stored = np.load(vectors_path).astype(np.float32)
+        # Queries are held-out embeddings
+        vectors, query_vectors = stored[queries:queries + total], stored[:queries]
+    else:
+        vectors = _decaying_vectors(total, dimensions)
+        # Queries near stored vectors, like questions near their answers
+        noise = _decaying_vectors(queries, dimensions, seed=1)
+        query_vectors = vectors[:queries] + noise
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    rows = asyncio.run(
+        bench_quantization(vectors, query_vectors, limit, reduced_dimensions, oversampling)
+    )
+    _print("Vector storage", rows)
+    _write(output, "quantization", rows)
+
+
+@cli.command()
+def embed(
+    batch_sizes: str = typer.Option("1,8,32,128", help="Comma separated batch sizes"),
+    total: int = typer.Option(512, help="Texts embedded per batch size"),
+    backend: str = typer.Option("fake", help="Embedding backend: fake or openai"),
+    latency_ms: float = typer.Option(
+        0.0, help="Per-call latency of the fake backend, 0 measures local overhead only"
+    ),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="JSON output file"),
+) -> None:
+    """Measure embedding throughput against batch size."""
+    rows = asyncio.run(bench_embed(_parse_sizes(batch_sizes), total, backend, latency_ms))
+    _print("Embedding throughput", rows)
+    _write(output, "embed", rows)
+
+
+if __name__ == "__main__":
+    cli()
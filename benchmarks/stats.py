@@ -0,0 +1,77 @@
+import math
+from collections import defaultdict
+from typing import Any, Dict, List, Sequence
+
+from pydantic import BaseModel
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of `values` (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(latencies_ms: Sequence[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    return {
+        "mean_ms": sum(latencies_ms) / len(latencies_ms) if latencies_ms else 0.0,
+        "p50_ms": percentile(latencies_ms, 50),
+        "p95_ms": percentile(latencies_ms, 95),
+        "p99_ms": percentile(latencies_ms, 99),
+        "max_ms": max(latencies_ms, default=0.0),
+    }
+
+
+class EndpointStats(BaseModel):
+    """Samples recorded for one endpoint."""
+    latencies_ms: List[float] = []
+    errors: int = 0
+
+    def report(self, duration_s: float) -> Dict[str, Any]:
+        count = len(self.latencies_ms)
+        return {
+            "count": count,
+            "errors": self.errors,
+            "error_rate": self.errors / count if count else 0.0,
+            "rps": count / duration_s if duration_s else 0.0,
+            **summarize(self.latencies_ms),
+        }
+
+
+class Recorder:
+    """Collects per-endpoint latencies and errors during a run."""
+
+    def __init__(self) -> None:
+        self.endpoints: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+
+    def record(self, endpoint: str, latency_ms: float, ok: bool) -> None:
+        stats = self.endpoints[endpoint]
+        stats.latencies_ms.append(latency_ms)
+        if not ok:
+            stats.errors += 1
+
+    def report(self, duration_s: float) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: stats.report(duration_s)
+            for name, stats in sorted(self.endpoints.items())
+        }
+
+
+def compare(
+    baseline: Dict[str, Dict[str, Any]],
+    candidate: Dict[str, Dict[str, Any]],
+    metrics: Sequence[str] = ("p50_ms", "p95_ms", "p99_ms", "rps", "error_rate"),
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Relative change of each metric for endpoints present in both runs."""
+    result: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for name in sorted(set(baseline) & set(candidate)):
+        result[name] = {}
+        for metric in metrics:
+            before = baseline[name].get(metric, 0.0)
+            after = candidate[name].get(metric, 0.0)
+            change = (after - before) / before if before else 0.0
+            result[name][metric] = {"baseline": before, "candidate": after, "change": change}
+    return result
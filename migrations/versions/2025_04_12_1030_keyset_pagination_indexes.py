@@ -0,0 +1,38 @@
+"""Keyset pagination indexes
+
+Revision ID: keyset_pagination_indexes
+Revises: initial_schema
+Create Date: 2025-04-12 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'keyset_pagination_indexes'
+down_revision: Union[str, None] = 'initial_schema'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Sessions are listed per user, most recently updated first
+    op.create_index(
+        'ix_sessions_user_id_updated_at_id',
+        'sessions',
+        ['user_id', 'updated_at', 'id'],
+        unique=False
+    )
+
+    # Messages are listed per session in chronological order
+    op.create_index(
+        'ix_messages_session_id_created_at_id',
+        'messages',
+        ['session_id', 'created_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_session_id_created_at_id', table_name='messages')
+    op.drop_index('ix_sessions_user_id_updated_at_id', table_name='sessions')
@@ -0,0 +1,24 @@
+"""Session expiry index
+
+Revision ID: session_expiry_index
+Revises: keyset_pagination_indexes
+Create Date: 2025-04-14 09:15:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'session_expiry_index'
+down_revision: Union[str, None] = 'keyset_pagination_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The session reaper scans for expired sessions oldest first
+    op.create_index(op.f('ix_sessions_expires_at'), 'sessions', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_sessions_expires_at'), table_name='sessions')
@@ -0,0 +1,131 @@
+"""Partition messages by month
+
+Revision ID: partition_messages_by_month
+Revises: session_expiry_index
+Create Date: 2025-04-16 14:00:00.000000
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'partition_messages_by_month'
+down_revision: Union[str, None] = 'session_expiry_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions created ahead of the current month
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def _create_month_partition(month: datetime) -> None:
+    upper = _add_months(month, 1)
+    op.execute(
+        f"CREATE TABLE IF NOT EXISTS messages_y{month.year}m{month.month:02d} "
+        f"PARTITION OF messages "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+    )
+
+
+def upgrade() -> None:
+    # Move the existing table out of the way
+    op.drop_index('ix_messages_session_id_created_at_id', table_name='messages')
+    op.drop_index('ix_messages_session_id', table_name='messages')
+    op.rename_table('messages', 'messages_unpartitioned')
+    op.execute(
+        'ALTER TABLE messages_unpartitioned '
+        'RENAME CONSTRAINT messages_pkey TO messages_unpartitioned_pkey'
+    )
+    op.execute(
+        'ALTER TABLE messages_unpartitioned '
+        'RENAME CONSTRAINT messages_session_id_fkey TO messages_unpartitioned_session_id_fkey'
+    )
+
+    # Create the partitioned table; the partition key must be part of the
+    # primary key
+    op.create_table(
+        'messages',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('session_id', sa.UUID(), nullable=False),
+        sa.Column('role', sa.String(length=20), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('context_chunks', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['session_id'], ['sessions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)'
+    )
+
+    # One partition per month covering existing rows and the months ahead
+    now = datetime.utcnow()
+    oldest = op.get_bind().execute(
+        sa.text('SELECT min(created_at) FROM messages_unpartitioned')
+    ).scalar() or now
+    month = datetime(oldest.year, oldest.month, 1)
+    last = _add_months(datetime(now.year, now.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        _create_month_partition(month)
+        month = _add_months(month, 1)
+    op.execute('CREATE TABLE IF NOT EXISTS messages_default PARTITION OF messages DEFAULT')
+
+    # History reads filter on session and creation time. The trailing id
+    # keeps keyset pagination on the same index.
+    op.create_index(
+        'ix_messages_session_id_created_at_id',
+        'messages',
+        ['session_id', 'created_at', 'id'],
+        unique=False
+    )
+
+    op.execute(
+        'INSERT INTO messages (id, session_id, role, content, created_at, context_chunks) '
+        'SELECT id, session_id, role, content, created_at, context_chunks '
+        'FROM messages_unpartitioned'
+    )
+    op.drop_table('messages_unpartitioned')
+
+
+def downgrade() -> None:
+    op.rename_table('messages', 'messages_partitioned')
+    op.execute(
+        'ALTER TABLE messages_partitioned '
+        'RENAME CONSTRAINT messages_pkey TO messages_partitioned_pkey'
+    )
+    op.execute(
+        'ALTER TABLE messages_partitioned '
+        'RENAME CONSTRAINT messages_session_id_fkey TO messages_partitioned_session_id_fkey'
+    )
+    op.drop_index('ix_messages_session_id_created_at_id', table_name='messages_partitioned')
+
+    op.create_table(
+        'messages',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('session_id', sa.UUID(), nullable=False),
+        sa.Column('role', sa.String(length=20), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('context_chunks', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['session_id'], ['sessions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_messages_session_id'), 'messages', ['session_id'], unique=False)
+    op.create_index(
+        'ix_messages_session_id_created_at_id',
+        'messages',
+        ['session_id', 'created_at', 'id'],
+        unique=False
+    )
+
+    op.execute(
+        'INSERT INTO messages (id, session_id, role, content, created_at, context_chunks) '
+        'SELECT id, session_id, role, content, created_at, context_chunks '
+        'FROM messages_partitioned'
+    )
+    op.drop_table('messages_partitioned')
@@ -0,0 +1,66 @@
+"""Graph checkpoints
+
+Revision ID: graph_checkpoints
+Revises: partition_messages_by_month
+Create Date: 2025-04-20 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'graph_checkpoints'
+down_revision: Union[str, None] = 'partition_messages_by_month'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Chat graph state per thread (session id), written after every step
+    op.create_table(
+        'graph_checkpoints',
+        sa.Column('thread_id', sa.Text(), nullable=False),
+        sa.Column('checkpoint_ns', sa.Text(), nullable=False, server_default=''),
+        sa.Column('checkpoint_id', sa.Text(), nullable=False),
+        sa.Column('parent_checkpoint_id', sa.Text(), nullable=True),
+        sa.Column('type', sa.Text(), nullable=False),
+        sa.Column('checkpoint', sa.LargeBinary(), nullable=False),
+        sa.Column('metadata_type', sa.Text(), nullable=False),
+        sa.Column('metadata', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('thread_id', 'checkpoint_ns', 'checkpoint_id')
+    )
+
+    # Channel values, only written when a step changes them
+    op.create_table(
+        'graph_checkpoint_blobs',
+        sa.Column('thread_id', sa.Text(), nullable=False),
+        sa.Column('checkpoint_ns', sa.Text(), nullable=False, server_default=''),
+        sa.Column('channel', sa.Text(), nullable=False),
+        sa.Column('version', sa.Text(), nullable=False),
+        sa.Column('type', sa.Text(), nullable=False),
+        sa.Column('blob', sa.LargeBinary(), nullable=True),
+        sa.PrimaryKeyConstraint('thread_id', 'checkpoint_ns', 'channel', 'version')
+    )
+
+    # Outputs of finished steps, replayed when an interrupted turn resumes
+    op.create_table(
+        'graph_checkpoint_writes',
+        sa.Column('thread_id', sa.Text(), nullable=False),
+        sa.Column('checkpoint_ns', sa.Text(), nullable=False, server_default=''),
+        sa.Column('checkpoint_id', sa.Text(), nullable=False),
+        sa.Column('task_id', sa.Text(), nullable=False),
+        sa.Column('idx', sa.Integer(), nullable=False),
+        sa.Column('channel', sa.Text(), nullable=False),
+        sa.Column('type', sa.Text(), nullable=False),
+        sa.Column('blob', sa.LargeBinary(), nullable=False),
+        sa.Column('task_path', sa.Text(), nullable=False, server_default=''),
+        sa.PrimaryKeyConstraint('thread_id', 'checkpoint_ns', 'checkpoint_id', 'task_id', 'idx')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('graph_checkpoint_writes')
+    op.drop_table('graph_checkpoint_blobs')
+    op.drop_table('graph_checkpoints')
@@ -0,0 +1,68 @@
+"""pgvector chunks
+
+Revision ID: pgvector_chunks
+Revises: graph_checkpoints
+Create Date: 2025-04-23 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'pgvector_chunks'
+down_revision: Union[str, None] = 'graph_checkpoints'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Schema parameters, overridden with `alembic -x name=value upgrade head`
+DEFAULTS = {
+    "vector_size": "1536",
+    "pgvector_index": "hnsw",
+    "hnsw_m": "16",
+    "hnsw_ef_construction": "64",
+    "ivfflat_lists": "100",
+}
+
+
+def upgrade() -> None:
+    params = {**DEFAULTS, **context.get_x_argument(as_dictionary=True)}
+    if params["pgvector_index"] not in ("hnsw", "ivfflat"):
+        raise ValueError(f"Unknown pgvector index: {params['pgvector_index']}")
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.create_table(
+        'document_chunks',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('session_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('metadata', postgresql.JSONB(), nullable=False, server_default='{}'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(
+        f"ALTER TABLE document_chunks ADD COLUMN embedding vector({int(params['vector_size'])}) NOT NULL"
+    )
+
+    # Session-filtered searches and deletes
+    op.create_index('ix_document_chunks_session_id', 'document_chunks', ['session_id'])
+
+    # Approximate index for unfiltered cosine searches
+    if params["pgvector_index"] == "ivfflat":
+        op.execute(
+            "CREATE INDEX ix_document_chunks_embedding ON document_chunks "
+            "USING ivfflat (embedding vector_cosine_ops) "
+            f"WITH (lists = {int(params['ivfflat_lists'])})"
+        )
+    else:
+        op.execute(
+            "CREATE INDEX ix_document_chunks_embedding ON document_chunks "
+            "USING hnsw (embedding vector_cosine_ops) "
+            f"WITH (m = {int(params['hnsw_m'])}, "
+            f"ef_construction = {int(params['hnsw_ef_construction'])})"
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS document_chunks")
@@ -1,10 +1,11 @@
+from datetime import datetime, timedelta
 from typing import Dict, Any
 from uuid import uuid4
 import pytest
 from unittest.mock import AsyncMock, patch
 from httpx import AsyncClient
 
-from app.db.models import User, Session
+from app.db.models import User, Session, Message
 from app.rag.graph import create_chat_graph
 
 pytestmark = pytest.mark.asyncio
@@ -72,8 +73,104 @@ async def test_list_sessions(
     
     assert response.status_code == 200
     data = response.json()
-    assert len(data) >= 1
-    assert any(s["name"] == "Test Session" for s in data)
+    assert len(data["items"]) >= 1
+    assert any(s["name"] == "Test Session" for s in data["items"])
+
+
+async def test_list_sessions_pagination(
+    test_client: AsyncClient,
+    test_user: User,
+    db_session: AsyncMock
+) -> None:
+    """Test paging through sessions with a cursor."""
+    for i in range(3):
+        db_session.add(Session(
+            id=uuid4(),
+            user_id=test_user.id,
+            title=f"Session {i}",
+            expires_at=datetime.utcnow() + timedelta(hours=1)
+        ))
+    await db_session.commit()
+    
+    # Login
+    login_response = await test_client.post(
+        "/api/v1/auth/login",
+        data={
+            "username": test_user.username,
+            "password": "testpass123"
+        }
+    )
+    token = login_response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    # First page
+    response = await test_client.get(
+        "/api/v1/chat/sessions", headers=headers, params={"limit": 2}
+    )
+    assert response.status_code == 200
+    first_page = response.json()
+    assert len(first_page["items"]) == 2
+    assert first_page["next_cursor"]
+    
+    # Second page
+    response = await test_client.get(
+        "/api/v1/chat/sessions",
+        headers=headers,
+        params={"limit": 2, "cursor": first_page["next_cursor"]}
+    )
+    assert response.status_code == 200
+    second_page = response.json()
+    assert len(second_page["items"]) == 1
+    assert second_page["next_cursor"] is None
+    
+    seen = {s["id"] for s in first_page["items"] + second_page["items"]}
+    assert len(seen) == 3
+
+
+async def test_list_messages(
+    test_client: AsyncClient,
+    test_user: User,
+    db_session: AsyncMock
+) -> None:
+    """Test listing a session's messages in chronological order."""
+    now = datetime.utcnow()
+    session = Session(
+        id=uuid4(),
+        user_id=test_user.id,
+        title="Test Session",
+        created_at=now,
+        expires_at=now + timedelta(hours=1)
+    )
+    db_session.add(session)
+    for i in range(3):
+        db_session.add(Message(
+            session_id=session.id,
+            role="user",
+            content=f"Message {i}",
+            created_at=now + timedelta(seconds=i)
+        ))
+    await db_session.commit()
+    
+    # Login
+    login_response = await test_client.post(
+        "/api/v1/auth/login",
+        data={
+            "username": test_user.username,
+            "password": "testpass123"
+        }
+    )
+    token = login_response.json()["access_token"]
+    
+    response = await test_client.get(
+        f"/api/v1/chat/sessions/{session.id}/messages",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"limit": 2}
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert [m["content"] for m in data["items"]] == ["Message 0", "Message 1"]
+    assert data["next_cursor"]
 
 
 async def test_send_message(
@@ -103,11 +200,13 @@ async def test_send_message(
     
     # Mock chat graph
     mock_graph = AsyncMock()
+    mock_graph.checkpointer = None
     mock_graph.ainvoke.return_value = {
         "response": "Test response"
     }
     
-    with patch("app.api.v1.chat.create_chat_graph", return_value=mock_graph):
+    with patch("app.api.v1.chat.create_chat_graph", return_value=mock_graph), \
+         patch("app.api.v1.chat.get_embeddings", return_value=[[0.1] * 1536]):
         # Send message
         response = await test_client.post(
             f"/api/v1/chat/sessions/{session.id}/messages",
@@ -119,3 +218,55 @@ async def test_send_message(
         data = response.json()
         assert "message" in data
         assert data["message"] == "Test response"
+        assert "embed;dur=" in response.headers["Server-Timing"]
+        
+        # The query embedding is handed to the graph, and the new message
+        # ends the history
+        state = mock_graph.ainvoke.call_args[0][0]
+        assert state["query_embedding"] == [0.1] * 1536
+        assert state["messages"][-1].content == "Test message"
+
+
+async def test_upload_document(
+    test_client: AsyncClient,
+    test_user: User,
+    db_session: AsyncMock
+) -> None:
+    """Test uploading a document to a chat session."""
+    session = Session(
+        id=uuid4(),
+        user_id=test_user.id,
+        name="Test Session",
+        expires_at=datetime.utcnow() + timedelta(hours=1)
+    )
+    db_session.add(session)
+    await db_session.commit()
+    
+    login_response = await test_client.post(
+        "/api/v1/auth/login",
+        data={
+            "username": test_user.username,
+            "password": "testpass123"
+        }
+    )
+    token = login_response.json()["access_token"]
+    
+    with patch("app.api.v1.chat.ingest_document", new_callable=AsyncMock) as ingest:
+        response = await test_client.post(
+            f"/api/v1/chat/sessions/{session.id}/documents",
+            headers={"Authorization": f"Bearer {token}"},
+            files={"file": ("notes.txt", b"RAG retrieves, then generates.", "text/plain")}
+        )
+        
+        assert response.status_code == 202
+        assert response.json() == {"filename": "notes.txt", "size": 30, "status": "processing"}
+        ingest.assert_awaited_once()
+        assert ingest.call_args.args[2:] == ("notes.txt", "RAG retrieves, then generates.")
+        
+        # Binary files are rejected
+        response = await test_client.post(
+            f"/api/v1/chat/sessions/{session.id}/documents",
+            headers={"Authorization": f"Bearer {token}"},
+            files={"file": ("image.png", b"\x89PNG\xff\xfe", "image/png")}
+        )
+        assert response.status_code == 422
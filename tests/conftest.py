@@ -6,6 +6,8 @@ from uuid import uuid4
 import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -80,6 +82,33 @@ async def test_db_engine() -> AsyncGenerator[AsyncEngine, None]:
     await default_engine.dispose()
 
 
+@pytest.fixture(scope="function")
+async def pg_engine() -> AsyncGenerator[AsyncEngine, None]:
+    """Engine on a throwaway, empty database, skipped without a server.
+
+    For tests that need real Postgres behaviour, e.g. partitions or
+    pgvector, and set up their own schema.
+    """
+    url = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
+    database_name = f"test_pg_{uuid4().hex[:8]}"
+    default_engine = create_async_engine(url, isolation_level="AUTOCOMMIT")
+    try:
+        async with default_engine.connect() as conn:
+            await conn.execute(text(f"CREATE DATABASE {database_name}"))
+    except (OSError, DBAPIError) as e:
+        await default_engine.dispose()
+        pytest.skip(f"Postgres is not available: {e}")
+
+    engine = create_async_engine(f"{url.rsplit('/', 1)[0]}/{database_name}")
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+        async with default_engine.connect() as conn:
+            await conn.execute(text(f"DROP DATABASE IF EXISTS {database_name}"))
+        await default_engine.dispose()
+
+
 @pytest.fixture(scope="function")
 async def db_session(
     test_db_engine: AsyncEngine
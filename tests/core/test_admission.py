@@ -0,0 +1,149 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from app.core import admission
+from app.core.admission import AdmissionController, TokenBucket
+from app.core.errors import OverloadedError
+
+pytestmark = pytest.mark.asyncio
+
+
+def _controller(**overrides) -> AdmissionController:
+    options = {
+        "max_concurrent": 2,
+        "max_queued": 1,
+        "queue_timeout": 0.05,
+        "max_per_user": 2,
+    }
+    options.update(overrides)
+    return AdmissionController(**options)
+
+
+async def test_token_bucket_burst_then_wait() -> None:
+    """Test that a bucket allows a burst, then reports the wait."""
+    bucket = TokenBucket(rate=1.0, burst=2)
+    
+    assert await bucket.acquire("user") == 0
+    assert await bucket.acquire("user") == 0
+    wait = await bucket.acquire("user")
+    
+    assert 0 < wait <= 1.0
+    assert await bucket.acquire("other") == 0
+
+
+async def test_token_bucket_refills() -> None:
+    """Test that tokens come back at the configured rate."""
+    bucket = TokenBucket(rate=1.0, burst=1)
+    
+    with patch.object(admission, "monotonic", return_value=100.0):
+        assert await bucket.acquire("user") == 0
+        assert await bucket.acquire("user") > 0
+    with patch.object(admission, "monotonic", return_value=102.0):
+        assert await bucket.acquire("user") == 0
+
+
+async def test_token_bucket_evicts_idle_keys() -> None:
+    """Test that the number of tracked keys stays bounded."""
+    bucket = TokenBucket(rate=1.0, burst=1, max_keys=2)
+    
+    for key in ("a", "b", "c"):
+        await bucket.acquire(key)
+    
+    assert list(bucket._buckets) == ["b", "c"]
+
+
+async def test_rate_limited_turn_rejected() -> None:
+    """Test fast rejection with Retry-After when over the rate limit."""
+    controller = _controller(rate_limiter=TokenBucket(rate=0.5, burst=1))
+    
+    async with controller.admit("user"):
+        pass
+    with pytest.raises(OverloadedError) as exc_info:
+        async with controller.admit("user"):
+            pass
+    
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers["Retry-After"] == "2"
+
+
+async def test_user_concurrency_limit() -> None:
+    """Test that one user can't hold more than their share of slots."""
+    controller = _controller(max_concurrent=10, max_per_user=1)
+    
+    async with controller.admit("user"):
+        with pytest.raises(OverloadedError):
+            async with controller.admit("user"):
+                pass
+        async with controller.admit("other"):
+            pass
+    
+    async with controller.admit("user"):
+        pass
+    assert controller._active_by_user == {}
+
+
+async def test_rejected_turns_keep_rate_tokens() -> None:
+    """Test that turns rejected for concurrency don't use up the rate limit."""
+    controller = _controller(
+        max_concurrent=1,
+        max_queued=0,
+        max_per_user=1,
+        rate_limiter=TokenBucket(rate=0.01, burst=2)
+    )
+    
+    async with controller.admit("user"):
+        with pytest.raises(OverloadedError, match="user_concurrency"):
+            async with controller.admit("user"):
+                pass
+        with pytest.raises(OverloadedError, match="queue_full"):
+            async with controller.admit("other"):
+                pass
+    
+    # Only admitted turns took tokens
+    async with controller.admit("user"):
+        pass
+    for _ in range(2):
+        async with controller.admit("other"):
+            pass
+    for user_id in ("user", "other"):
+        with pytest.raises(OverloadedError, match="rate_limited"):
+            async with controller.admit(user_id):
+                pass
+
+
+async def test_queued_turn_admitted_when_slot_frees() -> None:
+    """Test that a queued turn starts once a running turn finishes."""
+    controller = _controller(max_concurrent=1, queue_timeout=1.0)
+    release = asyncio.Event()
+    
+    async def hold() -> None:
+        async with controller.admit("a"):
+            await release.wait()
+    
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    asyncio.get_running_loop().call_later(0.01, release.set)
+    
+    async with controller.admit("b"):
+        pass
+    await holder
+
+
+async def test_queue_timeout_and_queue_full() -> None:
+    """Test rejection when waiting too long or when the queue is full."""
+    controller = _controller(max_concurrent=1, max_queued=1, queue_timeout=0.05)
+    
+    async with controller.admit("a"):
+        waiter = asyncio.create_task(controller.admit("b").__aenter__())
+        await asyncio.sleep(0)
+        
+        # The only queue position is taken
+        with pytest.raises(OverloadedError, match="queue_full"):
+            async with controller.admit("c"):
+                pass
+        with pytest.raises(OverloadedError, match="queue_timeout"):
+            await waiter
+    
+    assert controller._queued == 0
+    assert controller._active_by_user == {}
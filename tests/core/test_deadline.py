@@ -0,0 +1,104 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.deadline import (
+    Deadline,
+    cancel_on_disconnect,
+    get_deadline,
+    request_deadline,
+)
+from app.core.errors import ClientDisconnectedError, DeadlineExceededError, ValidationError
+
+pytestmark = pytest.mark.asyncio
+
+
+def _request(headers: dict) -> MagicMock:
+    request = MagicMock()
+    request.headers = headers
+    return request
+
+
+async def test_deadline_budget() -> None:
+    """Test tracking the remaining budget."""
+    deadline = Deadline(10)
+    
+    assert 9 < deadline.remaining() <= 10
+    assert deadline.allows(5)
+    assert not deadline.allows(20)
+    assert not Deadline(0).allows(0.001)
+
+
+async def test_run_within_deadline() -> None:
+    """Test that work finishing in time returns normally."""
+    assert await Deadline(1).run(asyncio.sleep(0, result="done"), "test") == "done"
+
+
+async def test_run_past_deadline_cancels() -> None:
+    """Test that work is cancelled and a 504 raised when time runs out."""
+    cancelled = False
+    
+    async def slow() -> None:
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+    
+    with pytest.raises(DeadlineExceededError) as exc_info:
+        await Deadline(0.05).run(slow(), "generate")
+    
+    assert exc_info.value.status_code == 504
+    assert cancelled
+
+
+async def test_check_expired() -> None:
+    """Test failing fast once the deadline has passed."""
+    with pytest.raises(DeadlineExceededError):
+        Deadline(0).check("retrieve")
+
+
+async def test_request_deadline_header() -> None:
+    """Test that clients can shorten but not extend the deadline."""
+    assert request_deadline(_request({})).timeout == 30.0
+    assert request_deadline(_request({"X-Request-Timeout": "2.5"})).timeout == 2.5
+    assert request_deadline(_request({"X-Request-Timeout": "300"})).timeout == 30.0
+    
+    with pytest.raises(ValidationError):
+        request_deadline(_request({"X-Request-Timeout": "soon"}))
+    with pytest.raises(ValidationError):
+        request_deadline(_request({"X-Request-Timeout": "0"}))
+
+
+async def test_get_deadline() -> None:
+    """Test reading the deadline from a graph run config."""
+    deadline = Deadline(1)
+    
+    assert get_deadline({"configurable": {"deadline": deadline}}) is deadline
+    assert get_deadline(None) is None
+
+
+async def test_cancel_on_disconnect() -> None:
+    """Test that work stops when the client goes away."""
+    request = MagicMock()
+    request.is_disconnected = AsyncMock(side_effect=[False, True])
+    work = asyncio.ensure_future(asyncio.sleep(10))
+    
+    with pytest.raises(ClientDisconnectedError):
+        await cancel_on_disconnect(request, work, "graph", poll_interval=0.01)
+    
+    await asyncio.sleep(0)
+    assert work.cancelled()
+
+
+async def test_cancel_on_disconnect_completes() -> None:
+    """Test that results pass through while the client is connected."""
+    request = MagicMock()
+    request.is_disconnected = AsyncMock(return_value=False)
+    
+    result = await cancel_on_disconnect(
+        request, asyncio.sleep(0.02, result="ok"), "graph", poll_interval=0.01
+    )
+    
+    assert result == "ok"
@@ -0,0 +1,97 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.core import health
+from app.core.health import HealthChecker, check_vector_store
+from app.vector_store.local import LocalVectorStore
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _ok() -> None:
+    pass
+
+
+async def _fail() -> None:
+    raise ConnectionError("refused")
+
+
+async def _hang() -> None:
+    await asyncio.sleep(10)
+
+
+async def test_all_probes_ok() -> None:
+    """Test a ready report with per-dependency latencies."""
+    checker = HealthChecker(
+        {"database": (_ok, True), "qdrant": (_ok, True)}, timeout=1.0, ttl=5.0
+    )
+    
+    report = await checker.check()
+    
+    assert report.status == "ready"
+    assert set(report.checks) == {"database", "qdrant"}
+    assert all(r.status == "ok" and r.latency_ms >= 0 for r in report.checks.values())
+
+
+async def test_critical_failure_not_ready() -> None:
+    """Test that a failing critical dependency makes the worker unready."""
+    checker = HealthChecker(
+        {"database": (_ok, True), "qdrant": (_fail, True)}, timeout=1.0, ttl=5.0
+    )
+    
+    report = await checker.check()
+    
+    assert report.status == "not_ready"
+    assert report.checks["qdrant"].error == "ConnectionError: refused"
+
+
+async def test_non_critical_failure_still_ready() -> None:
+    """Test that optional dependencies are reported but not required."""
+    checker = HealthChecker(
+        {"database": (_ok, True), "model_provider": (_fail, False)},
+        timeout=1.0,
+        ttl=5.0
+    )
+    
+    report = await checker.check()
+    
+    assert report.status == "ready"
+    assert report.checks["model_provider"].status == "error"
+
+
+async def test_probe_timeout() -> None:
+    """Test that a hanging dependency is cut off at the timeout."""
+    checker = HealthChecker({"qdrant": (_hang, True)}, timeout=0.05, ttl=5.0)
+    
+    report = await asyncio.wait_for(checker.check(), 1.0)
+    
+    assert report.status == "not_ready"
+    assert "timed out" in report.checks["qdrant"].error
+
+
+async def test_results_are_cached() -> None:
+    """Test that concurrent and repeated checks share one round of probes."""
+    probe = AsyncMock()
+    checker = HealthChecker({"database": (probe, True)}, timeout=1.0, ttl=60.0)
+    
+    await asyncio.gather(*(checker.check() for _ in range(5)))
+    await checker.check()
+    
+    assert probe.await_count == 1
+    
+    checker.ttl = 0.0
+    await checker.check()
+    
+    assert probe.await_count == 2
+
+
+async def test_vector_store_probe_uses_shared_store(tmp_path) -> None:
+    """Test that the probe pings the worker's own vector store."""
+    store = LocalVectorStore(path=str(tmp_path), vector_size=4)
+    
+    with patch.object(health, "get_vector_store", return_value=store):
+        with patch.object(store, "ping", wraps=store.ping) as ping:
+            await check_vector_store()
+    
+    ping.assert_awaited_once()
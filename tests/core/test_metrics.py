@@ -0,0 +1,83 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from unittest.mock import MagicMock
+
+from app.core.metrics import (
+    DBPoolCollector,
+    MetricsMiddleware,
+    record_cache,
+    render_metrics,
+)
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_middleware_labels_route_template() -> None:
+    """Test that requests are recorded under their route template."""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int) -> dict:
+        return {"id": item_id}
+    
+    labels = {"method": "GET", "route": "/items/{item_id}", "status": "200"}
+    before = _sample("http_request_duration_seconds_count", **labels)
+    
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    
+    assert _sample("http_request_duration_seconds_count", **labels) == before + 2
+    assert _sample("http_requests_in_flight") == 0
+
+
+def test_middleware_unmatched_route() -> None:
+    """Test that unknown paths share one label instead of one per URL."""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    labels = {"method": "GET", "route": "unmatched", "status": "404"}
+    before = _sample("http_request_duration_seconds_count", **labels)
+    
+    TestClient(app).get("/no/such/path")
+    
+    assert _sample("http_request_duration_seconds_count", **labels) == before + 1
+
+
+def test_record_cache() -> None:
+    """Test counting cache hits and misses."""
+    hits = _sample("rag_cache_requests_total", cache="test", result="hit")
+    misses = _sample("rag_cache_requests_total", cache="test", result="miss")
+    
+    record_cache("test", True)
+    record_cache("test", True)
+    record_cache("test", False)
+    
+    assert _sample("rag_cache_requests_total", cache="test", result="hit") == hits + 2
+    assert _sample("rag_cache_requests_total", cache="test", result="miss") == misses + 1
+
+
+def test_db_pool_collector() -> None:
+    """Test reading pool usage at collection time."""
+    engine = MagicMock()
+    pool = engine.sync_engine.pool
+    pool.size.return_value = 10
+    pool.checkedin.return_value = 7
+    pool.checkedout.return_value = 3
+    pool.overflow.return_value = -7
+    
+    [family] = DBPoolCollector(engine).collect()
+    
+    values = {s.labels["state"]: s.value for s in family.samples}
+    assert values == {"size": 10, "checkedin": 7, "checkedout": 3, "overflow": -7}
+
+
+def test_render_metrics() -> None:
+    """Test the text exposition output."""
+    body, content_type = render_metrics()
+    
+    assert content_type.startswith("text/plain")
+    assert b"rag_graph_node_duration_seconds" in body
@@ -0,0 +1,45 @@
+import asyncio
+import pytest
+
+from app.core.timing import StepTimings, get_timings
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_timed_records_duration() -> None:
+    """Test timing awaited steps."""
+    timings = StepTimings()
+    
+    result = await timings.timed("sleep", asyncio.sleep(0.01, result="done"))
+    
+    assert result == "done"
+    assert timings.steps["sleep"] >= 10
+
+
+async def test_concurrent_steps_are_timed_separately() -> None:
+    """Test timing steps that run concurrently."""
+    timings = StepTimings()
+    
+    await asyncio.gather(
+        timings.timed("a", asyncio.sleep(0.01)),
+        timings.timed("b", asyncio.sleep(0.02)),
+    )
+    
+    assert set(timings.steps) == {"a", "b"}
+    assert timings.steps["b"] > timings.steps["a"]
+
+
+def test_server_timing_header() -> None:
+    """Test formatting timings as a Server-Timing header."""
+    timings = StepTimings()
+    timings.steps = {"history": 1.234, "generate": 250.0}
+    
+    assert timings.server_timing() == "history;dur=1.2, generate;dur=250.0"
+
+
+def test_get_timings_from_config() -> None:
+    """Test reading timings from a graph run config."""
+    timings = StepTimings()
+    
+    assert get_timings({"configurable": {"timings": timings}}) is timings
+    assert get_timings(None) is None
@@ -0,0 +1,38 @@
+import pytest
+from unittest.mock import patch
+
+from app.core import tracing
+from app.core.tracing import NoopSpan, set_span_attributes, span
+
+
+def test_span_is_noop_by_default() -> None:
+    """Test that spans cost nothing when tracing is disabled."""
+    with span("test.noop", size=3) as current:
+        set_span_attributes(current, results=1)
+    
+    assert isinstance(current, NoopSpan)
+
+
+def test_span_records_attributes() -> None:
+    """Test recording spans with an in-memory exporter."""
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter
+    )
+    
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    
+    with patch.object(tracing, "_tracer", provider.get_tracer("test")):
+        with span("vector_store.search", limit=3, session_id=None) as current:
+            set_span_attributes(current, results=2, collection=["documents"])
+    
+    [finished] = exporter.get_finished_spans()
+    assert finished.name == "vector_store.search"
+    assert finished.attributes["limit"] == 3
+    assert finished.attributes["results"] == 2
+    assert finished.attributes["collection"] == "['documents']"
+    assert "session_id" not in finished.attributes
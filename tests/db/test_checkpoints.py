@@ -0,0 +1,169 @@
+from typing import Any, Dict, List, TypedDict
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.graph import END, START, StateGraph
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.db.checkpoints import PostgresCheckpointSaver
+from app.db.models import GraphCheckpoint, GraphCheckpointBlob, GraphCheckpointWrite
+
+pytestmark = pytest.mark.asyncio
+
+TABLES = [model.__table__ for model in (GraphCheckpoint, GraphCheckpointBlob, GraphCheckpointWrite)]
+
+
+@pytest.fixture
+async def checkpoints_db(pg_engine: AsyncEngine) -> async_sessionmaker:
+    """The checkpoint tables on a throwaway database."""
+    async with pg_engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: GraphCheckpoint.metadata.create_all(sync_conn, tables=TABLES))
+    return async_sessionmaker(pg_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+def saver(checkpoints_db: async_sessionmaker) -> PostgresCheckpointSaver:
+    return PostgresCheckpointSaver(session_factory=checkpoints_db)
+
+
+class TurnState(TypedDict):
+    question: str
+    steps: List[str]
+
+
+def make_graph(saver: PostgresCheckpointSaver, calls: Dict[str, int], fail_answer: bool = False) -> Any:
+    """A two step graph whose second step can fail once."""
+    def retrieve(state: TurnState) -> Dict[str, Any]:
+        calls["retrieve"] += 1
+        return {"steps": state["steps"] + [f"retrieved {state['question']}"]}
+
+    def answer(state: TurnState) -> Dict[str, Any]:
+        calls["answer"] += 1
+        if fail_answer and calls["answer"] == 1:
+            raise RuntimeError("worker crashed")
+        return {"steps": state["steps"] + [f"answered {state['question']}"]}
+
+    builder = StateGraph(TurnState)
+    builder.add_node("retrieve", retrieve)
+    builder.add_node("answer", answer)
+    builder.add_edge(START, "retrieve")
+    builder.add_edge("retrieve", "answer")
+    builder.add_edge("answer", END)
+    return builder.compile(checkpointer=saver)
+
+
+async def count(db_factory: async_sessionmaker, model: Any, thread_id: str) -> int:
+    async with db_factory() as db:
+        return await db.scalar(
+            select(func.count()).select_from(model).where(model.thread_id == thread_id)
+        )
+
+
+async def test_store_and_reload_checkpoint(saver: PostgresCheckpointSaver) -> None:
+    """Test that a stored checkpoint loads back with its values and writes."""
+    config = {"configurable": {"thread_id": "session", "checkpoint_ns": ""}}
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"question": "What is RAG?", "steps": ["retrieved"]}
+    checkpoint["channel_versions"] = {"question": 1, "steps": 1}
+
+    stored = await saver.aput(
+        config, checkpoint, {"source": "loop", "step": 1}, {"question": 1, "steps": 1}
+    )
+    await saver.aput_writes(stored, [("steps", ["retrieved", "answered"])], task_id="task")
+
+    loaded = await saver.aget_tuple(config)
+    assert loaded.config == stored
+    assert loaded.checkpoint["id"] == checkpoint["id"]
+    assert loaded.checkpoint["channel_values"] == {"question": "What is RAG?", "steps": ["retrieved"]}
+    assert loaded.metadata["step"] == 1
+    assert loaded.pending_writes == [("task", "steps", ["retrieved", "answered"])]
+    assert (await saver.aget_tuple(stored)).checkpoint["id"] == checkpoint["id"]
+    assert await saver.aget_tuple({"configurable": {"thread_id": "other"}}) is None
+
+    # A later checkpoint only writes the channels it changed
+    later = empty_checkpoint()
+    later["channel_values"] = {"question": "What is RAG?", "steps": ["retrieved", "answered"]}
+    later["channel_versions"] = {"question": 1, "steps": 2}
+    later_config = await saver.aput(stored, later, {"source": "loop", "step": 2}, {"steps": 2})
+
+    latest = await saver.aget_tuple(config)
+    assert latest.config == later_config
+    assert latest.parent_config == stored
+    assert latest.checkpoint["channel_values"]["steps"] == ["retrieved", "answered"]
+    assert await count(saver.session_factory, GraphCheckpointBlob, "session") == 3
+
+    listed = [item.config async for item in saver.alist(config)]
+    assert listed == [later_config, stored]
+    assert [item.config async for item in saver.alist(config, before=later_config)] == [stored]
+    assert [item.config async for item in saver.alist(config, filter={"step": 1})] == [stored]
+    assert [item.config async for item in saver.alist(config, limit=1)] == [later_config]
+
+
+async def test_resume_after_failed_node(saver: PostgresCheckpointSaver) -> None:
+    """Test that a turn failing mid-graph resumes from the failed step."""
+    calls = {"retrieve": 0, "answer": 0}
+    graph = make_graph(saver, calls, fail_answer=True)
+    config = {"configurable": {"thread_id": "session"}}
+
+    with pytest.raises(RuntimeError):
+        await graph.ainvoke({"question": "What is RAG?", "steps": []}, config)
+    state = await graph.aget_state(config)
+    assert state.next == ("answer",)
+
+    result = await graph.ainvoke(None, config)
+
+    assert result["steps"] == ["retrieved What is RAG?", "answered What is RAG?"]
+    assert calls == {"retrieve": 1, "answer": 2}
+
+
+async def test_new_turn_prunes_older_checkpoints(saver: PostgresCheckpointSaver) -> None:
+    """Test that starting a turn drops what earlier turns stored."""
+    calls = {"retrieve": 0, "answer": 0}
+    graph = make_graph(saver, calls)
+    config = {"configurable": {"thread_id": "session"}}
+    other = {"configurable": {"thread_id": "other"}}
+    factory = saver.session_factory
+
+    await graph.ainvoke({"question": "What is RAG?", "steps": []}, config)
+    await graph.ainvoke({"question": "Other", "steps": []}, other)
+    first_turn = await count(factory, GraphCheckpoint, "session")
+    assert first_turn == 4
+
+    await graph.ainvoke({"question": "Why?", "steps": []}, config)
+    second_turn = await count(factory, GraphCheckpointBlob, "session")
+    result = await graph.ainvoke({"question": "How?", "steps": []}, config)
+
+    assert result["steps"] == ["retrieved How?", "answered How?"]
+    # Only the latest turn, and the values it carried over, are kept
+    assert await count(factory, GraphCheckpoint, "session") == first_turn
+    assert await count(factory, GraphCheckpointBlob, "session") == second_turn
+    async with factory() as db:
+        rows = (await db.scalars(
+            select(GraphCheckpoint)
+            .where(GraphCheckpoint.thread_id == "session")
+            .order_by(GraphCheckpoint.checkpoint_id)
+        )).all()
+        # The turn's first checkpoint points at one that is gone
+        assert rows[0].parent_checkpoint_id not in {row.checkpoint_id for row in rows}
+    assert await count(factory, GraphCheckpoint, "other") == first_turn
+    state = await graph.aget_state(config)
+    assert state.values == {"question": "How?", "steps": ["retrieved How?", "answered How?"]}
+
+
+async def test_delete_threads(saver: PostgresCheckpointSaver) -> None:
+    """Test deleting everything stored for some threads only."""
+    calls = {"retrieve": 0, "answer": 0}
+    graph = make_graph(saver, calls, fail_answer=True)
+    for thread_id in ("a", "b", "c"):
+        calls["answer"] = 0
+        with pytest.raises(RuntimeError):
+            await graph.ainvoke({"question": "Q", "steps": []}, {"configurable": {"thread_id": thread_id}})
+
+    await saver.delete_threads(["a", "b"])
+    await saver.delete_threads([])
+
+    for thread_id, expected in (("a", False), ("b", False), ("c", True)):
+        for model in (GraphCheckpoint, GraphCheckpointBlob, GraphCheckpointWrite):
+            assert (await count(saver.session_factory, model, thread_id) > 0) is expected
+    assert await saver.aget_tuple({"configurable": {"thread_id": "a"}}) is None
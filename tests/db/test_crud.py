@@ -0,0 +1,47 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.db.crud import MessageRow, SessionRow, get_turn_bootstrap
+
+pytestmark = pytest.mark.asyncio
+
+
+def mock_db(rows: list) -> AsyncMock:
+    db = AsyncMock()
+    result = MagicMock()
+    result.all.return_value = rows
+    db.execute.return_value = result
+    return db
+
+
+async def test_get_turn_bootstrap() -> None:
+    """Test splitting joined rows into the session and its messages."""
+    session = (uuid4(), uuid4(), datetime(2025, 4, 20), datetime(2025, 4, 21))
+    first = (uuid4(), "user", "What is RAG?", None)
+    second = (uuid4(), "assistant", "Retrieval.", '[["a",0.9]]')
+    db = mock_db([session + first, session + second])
+
+    result = await get_turn_bootstrap(db, session[0], session[1])
+
+    assert result == (SessionRow(*session), [MessageRow(*first), MessageRow(*second)])
+    db.execute.assert_awaited_once()
+
+
+async def test_get_turn_bootstrap_empty_session() -> None:
+    """Test a session without messages."""
+    session = (uuid4(), uuid4(), datetime(2025, 4, 20), datetime(2025, 4, 21))
+    db = mock_db([session + (None, None, None, None)])
+
+    result = await get_turn_bootstrap(db, session[0], session[1])
+
+    assert result == (SessionRow(*session), [])
+
+
+async def test_get_turn_bootstrap_not_owned() -> None:
+    """Test that a missing or foreign session returns None."""
+    db = mock_db([])
+
+    assert await get_turn_bootstrap(db, uuid4(), uuid4()) is None
@@ -0,0 +1,35 @@
+from datetime import datetime
+from uuid import uuid4
+import pytest
+
+from app.db.pagination import decode_cursor, encode_cursor, paginate
+
+
+def test_cursor_roundtrip() -> None:
+    """Test encoding and decoding a keyset cursor."""
+    timestamp = datetime(2025, 4, 12, 10, 30, 15, 123456)
+    row_id = uuid4()
+    
+    cursor = encode_cursor(timestamp, row_id)
+    
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (timestamp, row_id)
+
+
+def test_decode_invalid_cursor() -> None:
+    """Test decoding a malformed cursor."""
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_paginate() -> None:
+    """Test splitting an over-fetched result into a page and cursor."""
+    rows = [(datetime(2025, 4, 12, 10, i), uuid4()) for i in range(3)]
+    
+    items, next_cursor = paginate(rows, 2, key=lambda r: r)
+    assert items == rows[:2]
+    assert decode_cursor(next_cursor) == rows[1]
+    
+    items, next_cursor = paginate(rows, 3, key=lambda r: r)
+    assert items == rows
+    assert next_cursor is None
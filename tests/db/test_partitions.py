@@ -0,0 +1,102 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.db.partitions import (
+    add_months,
+    ensure_message_partitions,
+    message_partition_name
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+def test_add_months_across_years() -> None:
+    """Test shifting month starts across year boundaries."""
+    assert add_months(datetime(2025, 11, 1), 3) == datetime(2026, 2, 1)
+    assert add_months(datetime(2025, 1, 1), -1) == datetime(2024, 12, 1)
+
+
+def test_message_partition_name() -> None:
+    """Test monthly partition naming."""
+    assert message_partition_name(datetime(2025, 4, 1)) == "messages_y2025m04"
+
+
+async def test_ensure_message_partitions() -> None:
+    """Test creating only the missing upcoming partitions."""
+    existing = MagicMock()
+    existing.scalars.return_value.all.return_value = [
+        "messages_y2025m04", "messages_default"
+    ]
+    db = AsyncMock()
+    db.execute.return_value = existing
+    db.scalar.return_value = 0
+    
+    created = await ensure_message_partitions(
+        db, months_ahead=2, now=datetime(2025, 4, 16)
+    )
+    
+    assert created == ["messages_y2025m05", "messages_y2025m06"]
+    ddl = str(db.execute.call_args_list[-1][0][0])
+    assert "FOR VALUES FROM ('2025-06-01') TO ('2025-07-01')" in ddl
+    assert "DETACH" not in str(db.execute.call_args_list)
+    # One transaction per month
+    assert db.commit.call_count == 3
+
+
+async def test_failed_month_does_not_block_others() -> None:
+    """Test that a month failing to be created is skipped, not fatal."""
+    existing = MagicMock()
+    existing.scalars.return_value.all.return_value = ["messages_y2025m04"]
+    db = AsyncMock()
+    db.execute.side_effect = [existing, RuntimeError("lock timeout"), existing]
+    
+    created = await ensure_message_partitions(
+        db, months_ahead=2, now=datetime(2025, 4, 16)
+    )
+    
+    assert created == ["messages_y2025m06"]
+    db.rollback.assert_called_once()
+
+
+@pytest.fixture
+async def messages_db(pg_engine: AsyncEngine) -> async_sessionmaker:
+    """A partitioned messages table with an April 2025 and a default partition."""
+    async with pg_engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE TABLE messages (id uuid NOT NULL, content text NOT NULL, "
+            "created_at timestamp NOT NULL, PRIMARY KEY (id, created_at)) "
+            "PARTITION BY RANGE (created_at)"
+        ))
+        await conn.execute(text(
+            "CREATE TABLE messages_y2025m04 PARTITION OF messages "
+            "FOR VALUES FROM ('2025-04-01') TO ('2025-05-01')"
+        ))
+        await conn.execute(text("CREATE TABLE messages_default PARTITION OF messages DEFAULT"))
+    return async_sessionmaker(pg_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def test_rows_in_default_partition_are_moved(messages_db: async_sessionmaker) -> None:
+    """Test creating a month whose rows already landed in the default partition."""
+    async with messages_db() as db:
+        await db.execute(
+            text("INSERT INTO messages VALUES (:id, 'early', '2025-05-10'), (:other, 'late', '2026-01-02')"),
+            {"id": uuid4(), "other": uuid4()}
+        )
+        await db.commit()
+
+        created = await ensure_message_partitions(db, months_ahead=1, now=datetime(2025, 4, 16))
+        
+        assert created == ["messages_y2025m05"]
+        may = await db.scalars(text("SELECT content FROM messages_y2025m05"))
+        assert may.all() == ["early"]
+        remaining = await db.scalars(text("SELECT content FROM messages_default"))
+        assert remaining.all() == ["late"]
+        # The default partition is attached again
+        await db.execute(text("INSERT INTO messages VALUES (:id, 'later', '2027-01-01')"), {"id": uuid4()})
+        assert await db.scalar(text("SELECT count(*) FROM messages_default")) == 2
+        assert await ensure_message_partitions(db, months_ahead=1, now=datetime(2025, 4, 16)) == []
@@ -0,0 +1,54 @@
+from uuid import uuid4
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.db.reaper import reap_expired_sessions
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_reap_expired_sessions() -> None:
+    """Test reaping expired sessions in bounded batches."""
+    first_batch = [uuid4(), uuid4()]
+    second_batch = [uuid4()]
+    
+    mock_store = AsyncMock()
+    mock_store.delete_by_sessions.side_effect = [4, 1]
+    
+    with patch("app.db.reaper.async_session_factory", MagicMock()), \
+         patch("app.db.reaper.crud") as mock_crud:
+        mock_crud.get_expired_session_ids = AsyncMock(
+            side_effect=[first_batch, second_batch]
+        )
+        mock_crud.delete_sessions = AsyncMock(side_effect=[(2, 6), (1, 2)])
+        
+        stats = await reap_expired_sessions(
+            batch_size=2, max_batches=5, vector_store=mock_store
+        )
+    
+    assert stats.batches == 2
+    assert stats.sessions == 3
+    assert stats.messages == 8
+    assert stats.vectors == 5
+    mock_store.delete_by_sessions.assert_any_call(first_batch)
+    mock_store.delete_by_sessions.assert_any_call(second_batch)
+
+
+async def test_reap_respects_max_batches() -> None:
+    """Test that a sweep stops after max_batches."""
+    mock_store = AsyncMock()
+    mock_store.delete_by_sessions.return_value = 0
+    
+    with patch("app.db.reaper.async_session_factory", MagicMock()), \
+         patch("app.db.reaper.crud") as mock_crud:
+        mock_crud.get_expired_session_ids = AsyncMock(
+            side_effect=lambda *args, **kwargs: [uuid4(), uuid4()]
+        )
+        mock_crud.delete_sessions = AsyncMock(return_value=(2, 0))
+        
+        stats = await reap_expired_sessions(
+            batch_size=2, max_batches=3, vector_store=mock_store
+        )
+    
+    assert stats.batches == 3
+    assert stats.sessions == 6
@@ -0,0 +1,165 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.db import session_cache
+from app.db.session_cache import SessionState, SessionStateCache
+
+
+def make_state(expires_in: timedelta = timedelta(hours=1)) -> SessionState:
+    now = datetime.utcnow()
+    return SessionState(
+        session_id=uuid4(),
+        user_id=uuid4(),
+        created_at=now,
+        expires_at=now + expires_in,
+        messages=[],
+        previous_chunks=[]
+    )
+
+
+def test_from_rows() -> None:
+    """Test building a session state from database rows."""
+    now = datetime.utcnow()
+    session = SimpleNamespace(
+        id=uuid4(), user_id=uuid4(), created_at=now, expires_at=now + timedelta(hours=1)
+    )
+    messages = [
+        SimpleNamespace(role="user", content="What is RAG?", context_chunks=None),
+        SimpleNamespace(role="assistant", content="Retrieval.", context_chunks='[["a",0.9]]'),
+        SimpleNamespace(role="user", content="Why?", context_chunks=None),
+    ]
+
+    state = SessionState.from_rows(session, messages)
+
+    assert state.user_id == session.user_id
+    assert [type(m) for m in state.messages] == [HumanMessage, AIMessage, HumanMessage]
+    assert state.previous_chunks == [("a", 0.9)]
+    assert state.summary == ""
+
+
+def test_append_folds_dropped_questions_into_summary() -> None:
+    """Test that messages leaving the window are summarized."""
+    state = make_state()
+    state.append([HumanMessage(content="first"), AIMessage(content="one")], max_messages=2)
+    assert state.summary == ""
+
+    state.append([HumanMessage(content="second"), AIMessage(content="two")], max_messages=2)
+
+    assert [m.content for m in state.messages] == ["second", "two"]
+    assert state.summary == "- first"
+
+
+def test_cache_lru_eviction() -> None:
+    """Test that the least recently used session is evicted."""
+    cache = SessionStateCache(max_sessions=2, ttl_seconds=60)
+    first, second, third = make_state(), make_state(), make_state()
+    cache.put(first)
+    cache.put(second)
+
+    assert cache.get(first.session_id) is not None
+    cache.put(third)
+
+    assert len(cache) == 2
+    assert cache.get(second.session_id) is None
+    assert cache.get(first.session_id) is not None
+
+
+def test_cache_hands_out_copies() -> None:
+    """Test that changing a state only shows in the cache once put back."""
+    cache = SessionStateCache(max_sessions=10, ttl_seconds=60)
+    state = make_state()
+    cache.put(state)
+
+    turn = cache.get(state.session_id)
+    turn.append([HumanMessage(content="What is RAG?")], max_messages=10)
+    turn.previous_chunks.append(("a", 0.9))
+    assert cache.get(state.session_id).messages == []
+
+    cache.put(turn)
+    cached = cache.get(state.session_id)
+    assert [m.content for m in cached.messages] == ["What is RAG?"]
+    assert cached.previous_chunks == [("a", 0.9)]
+
+
+def test_concurrent_turns_drop_the_entry() -> None:
+    """Test that a turn finishing after another on the same session invalidates it."""
+    cache = SessionStateCache(max_sessions=10, ttl_seconds=60)
+    state = make_state()
+    cache.put(state)
+    session_id = state.session_id
+    first, second = cache.get(session_id), cache.get(session_id)
+
+    cache.put(first)
+    cache.put(second)
+
+    assert cache.get(session_id) is None
+
+    # Two turns that both missed the cache conflict the same way
+    loaded = [make_state(), make_state()]
+    loaded[1].session_id = loaded[0].session_id
+    for state in loaded:
+        cache.put(state)
+    assert cache.get(loaded[0].session_id) is None
+
+
+def test_cache_drops_stale_and_expired() -> None:
+    """Test that entries past the TTL or session expiry are not served."""
+    cache = SessionStateCache(max_sessions=10, ttl_seconds=60)
+    expired = make_state(expires_in=timedelta(seconds=-1))
+    cache.put(expired)
+    assert cache.get(expired.session_id) is None
+
+    state = make_state()
+    with patch("app.db.session_cache.monotonic", return_value=0):
+        cache.put(state)
+    with patch("app.db.session_cache.monotonic", return_value=120):
+        assert cache.get(state.session_id) is None
+    assert len(cache) == 0
+
+
+def test_invalidate() -> None:
+    """Test dropping cached sessions."""
+    cache = SessionStateCache(max_sessions=10, ttl_seconds=60)
+    state = make_state()
+    cache.put(state)
+
+    cache.invalidate([state.session_id, uuid4()])
+
+    assert cache.get(state.session_id) is None
+
+
+def test_notifications_from_other_workers_invalidate() -> None:
+    """Test that only other workers' notifications drop cached sessions."""
+    cache = SessionStateCache(max_sessions=10, ttl_seconds=60)
+    state = make_state()
+    cache.put(state)
+
+    with patch("app.db.session_cache.get_session_cache", return_value=cache):
+        session_cache._on_notification(
+            None, 0, session_cache.NOTIFY_CHANNEL, f"{session_cache._worker_id}:{state.session_id}"
+        )
+        assert cache.get(state.session_id) is not None
+
+        session_cache._on_notification(
+            None, 0, session_cache.NOTIFY_CHANNEL, f"other:{state.session_id}"
+        )
+        assert cache.get(state.session_id) is None
+
+        session_cache._on_notification(None, 0, session_cache.NOTIFY_CHANNEL, "other:bad")
+
+
+async def test_notify_session_changes_disabled() -> None:
+    """Test that nothing is sent unless cross-worker invalidation is on."""
+    db = AsyncMock()
+
+    with patch.object(session_cache.settings, "SESSION_CACHE_NOTIFY", False):
+        await session_cache.notify_session_changes(db, [uuid4()])
+    db.execute.assert_not_called()
+
+    with patch.object(session_cache.settings, "SESSION_CACHE_NOTIFY", True):
+        await session_cache.notify_session_changes(db, [uuid4()])
+    db.execute.assert_awaited_once()
@@ -0,0 +1,74 @@
+import random
+import pytest
+from langchain_core.messages import HumanMessage
+
+from app.llm.fake import (
+    FakeChatModel,
+    FakeEmbeddings,
+    InjectedFaultError,
+    LatencyModel
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+def test_latency_distributions() -> None:
+    """Test sampling latencies from each distribution."""
+    rng = random.Random(0)
+    
+    assert LatencyModel(100, "constant", rng=rng).sample() == 0.1
+    
+    uniform = [LatencyModel(100, "uniform", 0.5, rng).sample() for _ in range(100)]
+    assert all(0.05 <= s <= 0.15 for s in uniform)
+    
+    lognormal = [LatencyModel(100, "lognormal", 0.5, rng).sample() for _ in range(100)]
+    assert all(s > 0 for s in lognormal)
+    
+    with pytest.raises(ValueError):
+        LatencyModel(100, "bimodal")
+
+
+async def test_fake_chat_model_is_deterministic() -> None:
+    """Test that identical prompts give identical replies."""
+    model = FakeChatModel(latency_ms=0, tokens_per_second=0, response_tokens=8)
+    prompt = [HumanMessage(content="What is the capital of France?")]
+    
+    first = await model.ainvoke(prompt)
+    second = await model.ainvoke(prompt)
+    other = await model.ainvoke([HumanMessage(content="Something else")])
+    
+    assert first.content == second.content
+    assert first.content != other.content
+    assert len(first.content.split()) == 8
+    assert first.response_metadata["token_usage"]["completion_tokens"] == 8
+
+
+async def test_fake_chat_model_streams_tokens() -> None:
+    """Test streaming a fake reply token by token."""
+    model = FakeChatModel(latency_ms=0, tokens_per_second=0, response_tokens=5)
+    prompt = [HumanMessage(content="Hello")]
+    
+    chunks = [chunk.content async for chunk in model.astream(prompt)]
+    
+    assert len(chunks) == 5
+    assert "".join(chunks) == (await model.ainvoke(prompt)).content
+
+
+async def test_fake_chat_model_error_injection() -> None:
+    """Test that the fake model fails at the configured rate."""
+    model = FakeChatModel(latency_ms=0, tokens_per_second=0, error_rate=1.0)
+    
+    with pytest.raises(InjectedFaultError):
+        await model.ainvoke([HumanMessage(content="Hello")])
+
+
+async def test_fake_embeddings() -> None:
+    """Test deterministic unit-length fake embeddings."""
+    embeddings = FakeEmbeddings(dimensions=64, latency_ms=0)
+    
+    first, second, repeat = await embeddings.aembed_documents(["a", "b", "a"])
+    
+    assert len(first) == 64
+    assert first == repeat
+    assert first != second
+    assert abs(sum(v * v for v in first) - 1.0) < 1e-6
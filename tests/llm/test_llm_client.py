@@ -0,0 +1,42 @@
+import pytest
+
+from app.llm.client import close_llm_clients, get_chat_model, get_http_client
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_chat_model_is_reused() -> None:
+    """Test that chat models are cached by model and temperature."""
+    try:
+        first = get_chat_model(model="gpt-3.5-turbo", temperature=0.7)
+        second = get_chat_model(model="gpt-3.5-turbo", temperature=0.7)
+        colder = get_chat_model(model="gpt-3.5-turbo", temperature=0.0)
+        
+        assert first is second
+        assert colder is not first
+    finally:
+        await close_llm_clients()
+
+
+async def test_chat_models_share_http_client() -> None:
+    """Test that all chat models use the shared connection pool."""
+    try:
+        http_client = get_http_client()
+        
+        assert get_http_client() is http_client
+        assert get_chat_model(temperature=0.2).http_async_client is http_client
+    finally:
+        await close_llm_clients()
+
+
+async def test_close_llm_clients() -> None:
+    """Test closing and recreating the shared clients."""
+    http_client = get_http_client()
+    model = get_chat_model()
+    
+    await close_llm_clients()
+    
+    assert http_client.is_closed
+    assert get_chat_model() is not model
+    assert get_http_client() is not http_client
+    await close_llm_clients()
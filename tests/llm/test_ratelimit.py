@@ -0,0 +1,178 @@
+import asyncio
+import httpx
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.llm import ratelimit
+from app.llm.fake import InjectedFaultError
+from app.llm.ratelimit import (
+    AdaptiveRateLimiter,
+    RetryBudget,
+    call_with_retries,
+    observe_response,
+    parse_reset,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+def _headers(remaining_requests: int, reset: str = "10s") -> dict:
+    return {
+        "x-ratelimit-limit-requests": "100",
+        "x-ratelimit-remaining-requests": str(remaining_requests),
+        "x-ratelimit-reset-requests": reset,
+        "x-ratelimit-limit-tokens": "10000",
+        "x-ratelimit-remaining-tokens": "9000",
+        "x-ratelimit-reset-tokens": "6m0s",
+    }
+
+
+async def _call(call, **overrides):
+    options = {
+        "api": "chat",
+        "limiter": AdaptiveRateLimiter(),
+        "budget": RetryBudget(ratio=0.1, minimum=10),
+        "base_delay": 0,
+    }
+    options.update(overrides)
+    return await call_with_retries(call, **options)
+
+
+def test_parse_reset() -> None:
+    """Test parsing provider reset durations."""
+    assert parse_reset("1s") == 1.0
+    assert parse_reset("6m0s") == 360.0
+    assert parse_reset("20ms") == pytest.approx(0.02)
+    assert parse_reset("1h2m3.5s") == pytest.approx(3723.5)
+
+
+def test_limiter_without_headers_never_waits() -> None:
+    """Test that nothing is delayed before the provider reports quotas."""
+    limiter = AdaptiveRateLimiter()
+    
+    assert all(limiter.reserve(tokens=1000) == 0 for _ in range(100))
+
+
+def test_limiter_paces_near_limit() -> None:
+    """Test spreading the remaining quota when it runs low."""
+    limiter = AdaptiveRateLimiter(low_water=0.1)
+    
+    with patch.object(ratelimit, "monotonic", return_value=0.0):
+        limiter.observe(200, _headers(remaining_requests=50))
+        assert limiter.reserve() == 0
+        
+        limiter.observe(200, _headers(remaining_requests=5, reset="10s"))
+        delays = [limiter.reserve() for _ in range(3)]
+    
+    assert delays[0] == 0
+    assert delays[1] > 0
+    assert delays[2] > delays[1]
+
+
+def test_limiter_waits_for_reset_when_exhausted() -> None:
+    """Test waiting for the window reset once a quota is used up."""
+    limiter = AdaptiveRateLimiter()
+    
+    with patch.object(ratelimit, "monotonic", return_value=0.0):
+        limiter.observe(200, _headers(remaining_requests=0, reset="2s"))
+        assert limiter.reserve() == pytest.approx(2.0)
+
+
+def test_limiter_honours_retry_after() -> None:
+    """Test that a 429 holds back all callers."""
+    limiter = AdaptiveRateLimiter()
+    
+    with patch.object(ratelimit, "monotonic", return_value=0.0):
+        limiter.observe(429, {"retry-after": "3"})
+        assert limiter.reserve() == pytest.approx(3.0)
+
+
+async def test_observe_response_only_counts_model_calls() -> None:
+    """Test that only chat and embedding responses feed the limiters."""
+    def response(path: str) -> httpx.Response:
+        request = httpx.Request("GET", f"https://api.openai.com/v1{path}")
+        return httpx.Response(429, headers={"retry-after": "3"}, request=request)
+    
+    with patch.object(ratelimit, "_limiters", {}) as limiters, \
+            patch.object(ratelimit, "monotonic", return_value=0.0):
+        await observe_response(response("/models"))
+        assert limiters == {}
+        
+        await observe_response(response("/embeddings"))
+        assert set(limiters) == {"embeddings"}
+        
+        await observe_response(response("/chat/completions"))
+        assert limiters["chat"].reserve() == pytest.approx(3.0)
+
+
+def test_retry_budget() -> None:
+    """Test that retries are capped at a fraction of calls."""
+    budget = RetryBudget(ratio=0.5, minimum=2)
+    
+    assert budget.withdraw()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+    
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+
+async def test_retries_retryable_errors() -> None:
+    """Test that transient failures are retried."""
+    call = AsyncMock(side_effect=[InjectedFaultError("boom"), "ok"])
+    
+    assert await _call(call) == "ok"
+    assert call.await_count == 2
+
+
+async def test_does_not_retry_other_errors() -> None:
+    """Test that non-retryable errors surface immediately."""
+    call = AsyncMock(side_effect=ValueError("bad request"))
+    
+    with pytest.raises(ValueError):
+        await _call(call)
+    assert call.await_count == 1
+
+
+async def test_retry_budget_exhausted() -> None:
+    """Test that an empty budget stops retries."""
+    call = AsyncMock(side_effect=InjectedFaultError("boom"))
+    
+    with pytest.raises(InjectedFaultError):
+        await _call(call, budget=RetryBudget(ratio=0, minimum=0), max_attempts=5)
+    assert call.await_count == 1
+
+
+async def test_attempt_timeout() -> None:
+    """Test that slow attempts are cut off and retried."""
+    calls = 0
+    
+    async def call() -> str:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(10)
+        return "ok"
+    
+    assert await _call(call, timeout=0.05) == "ok"
+    assert calls == 2
+
+
+async def test_hedged_call_uses_fastest() -> None:
+    """Test that a hedge wins over a slow first attempt."""
+    calls = 0
+    
+    async def call() -> str:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(10)
+            return "slow"
+        return "fast"
+    
+    result = await asyncio.wait_for(_call(call, hedge_after=0.01), 1.0)
+    
+    assert result == "fast"
+    assert calls == 2
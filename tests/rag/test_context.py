@@ -0,0 +1,131 @@
+import pytest
+
+from app.rag.context import (
+    ContextChunk,
+    cosine_scores,
+    decode_chunk_refs,
+    deduplicate,
+    encode_chunk_refs,
+    estimate_tokens,
+    format_context,
+    merge_adjacent,
+    pack_context,
+)
+
+PARIS = "Paris is the capital and most populous city of France."
+
+
+def _chunk(text: str, score: float, source: str = None, index: int = None) -> ContextChunk:
+    return ContextChunk(
+        text=text, score=score, source=source, start_index=index, end_index=index
+    )
+
+
+def test_deduplicate_keeps_most_relevant() -> None:
+    """Test dropping near-duplicates and contained chunks."""
+    chunks = [
+        _chunk(PARIS, 0.7),
+        _chunk(PARIS.upper(), 0.9),
+        _chunk("Paris is the capital and most populous city", 0.5),
+        _chunk("Lyon is known for its cuisine.", 0.6),
+    ]
+    
+    kept = deduplicate(chunks)
+    
+    assert [c.score for c in kept] == [0.9, 0.6]
+
+
+def test_merge_adjacent_chunks() -> None:
+    """Test merging consecutive chunks of a document, removing overlap."""
+    chunks = [
+        _chunk("The quick brown fox jumps over", 0.5, "doc", 1),
+        _chunk("fox jumps over the lazy dog.", 0.8, "doc", 2),
+        _chunk("An unrelated paragraph.", 0.9, "doc", 5),
+        _chunk("No position information.", 0.4),
+    ]
+    
+    merged = merge_adjacent(chunks)
+    
+    by_start = {c.start_index: c for c in merged}
+    assert by_start[1].text == "The quick brown fox jumps over the lazy dog."
+    assert by_start[1].score == 0.8
+    assert by_start[1].end_index == 2
+    assert by_start[5].text == "An unrelated paragraph."
+    assert by_start[None].text == "No position information."
+
+
+def test_merge_requires_same_source() -> None:
+    """Test that chunks of different documents are never merged."""
+    chunks = [_chunk("First.", 0.5, "a", 1), _chunk("Second.", 0.5, "b", 2)]
+    
+    assert len(merge_adjacent(chunks)) == 2
+
+
+def test_pack_context_orders_by_relevance() -> None:
+    """Test that packed chunks come most relevant first."""
+    results = [
+        {"text": "Low relevance.", "score": 0.2},
+        {"text": "High relevance.", "score": 0.9},
+        {"text": "High relevance.", "score": 0.8},
+    ]
+    
+    packed = pack_context(results, token_budget=1000)
+    
+    assert format_context(packed) == "High relevance.\n\nLow relevance."
+
+
+def test_pack_context_respects_budget() -> None:
+    """Test filling the budget and truncating the last chunk."""
+    results = [
+        {"text": f"Topic {i}: " + " ".join(f"word{i}x{j}" for j in range(100)), "score": 1 - i / 10}
+        for i in range(5)
+    ]
+    
+    packed = pack_context(results, token_budget=400)
+    
+    assert sum(estimate_tokens(c.text) for c in packed) <= 400
+    assert packed[0].text.startswith("Topic 0")
+    assert packed[-1].text.endswith("…")
+
+
+def test_pack_context_drops_tiny_remainder() -> None:
+    """Test that a chunk is skipped rather than cut to a few words."""
+    results = [
+        {"text": "a" * 390, "score": 0.9},
+        {"text": "b " * 200, "score": 0.5},
+    ]
+    
+    packed = pack_context(results, token_budget=100)
+    
+    assert len(packed) == 1
+
+
+def test_chunk_refs_round_trip() -> None:
+    """Test the compact id and score encoding stored on messages."""
+    packed = pack_context(
+        [
+            {"id": "a", "text": "First chunk.", "score": 0.912345},
+            {"id": "b", "text": "Second chunk.", "score": 0.5},
+        ],
+        token_budget=100
+    )
+    
+    encoded = encode_chunk_refs(packed)
+    
+    assert encoded == '[["a",0.9123],["b",0.5]]'
+    assert decode_chunk_refs(encoded) == [("a", 0.9123), ("b", 0.5)]
+    assert encode_chunk_refs([]) is None
+
+
+def test_decode_chunk_refs_ignores_other_content() -> None:
+    """Test that legacy or malformed values decode to no references."""
+    assert decode_chunk_refs(None) == []
+    assert decode_chunk_refs("Paris is the capital of France.") == []
+    assert decode_chunk_refs('{"a": 1}') == []
+
+
+def test_cosine_scores() -> None:
+    """Test scoring stored vectors against a query."""
+    scores = cosine_scores([1.0, 0.0], [[2.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+    
+    assert scores == pytest.approx([1.0, 0.0, 0.7071], abs=1e-4)
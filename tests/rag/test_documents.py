@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.rag.context import _join_overlapping
+from app.rag.documents import ingest_document, split_text
+
+pytestmark = pytest.mark.asyncio
+
+
+def test_split_text_prefers_breaks() -> None:
+    """Test that chunks end at paragraph and sentence breaks."""
+    text = "First paragraph about retrieval.\n\nSecond paragraph is here. It covers generation in depth."
+
+    chunks = split_text(text, chunk_size=40, overlap=0)
+
+    assert chunks == [
+        "First paragraph about retrieval.",
+        "Second paragraph is here.",
+        "It covers generation in depth.",
+    ]
+
+
+def test_split_text_overlap_round_trips() -> None:
+    """Test that overlapping chunks join back into the original text."""
+    text = " ".join(f"word{i}" for i in range(300))
+
+    chunks = split_text(text, chunk_size=100, overlap=20)
+
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    joined = chunks[0]
+    for chunk in chunks[1:]:
+        joined = _join_overlapping(joined, chunk)
+    assert joined == text
+    assert split_text("   ") == []
+
+
+async def test_ingest_document() -> None:
+    """Test that chunks are embedded in batches and indexed with positions."""
+    session_id = uuid4()
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    indexes = AsyncMock()
+
+    with patch("app.rag.documents.settings.DOCUMENT_CHUNK_SIZE", 20), \
+         patch("app.rag.documents.settings.DOCUMENT_CHUNK_OVERLAP", 0), \
+         patch("app.rag.documents.settings.DOCUMENT_EMBEDDING_BATCH_SIZE", 2), \
+         patch("app.rag.documents.get_session_indexes", return_value=indexes), \
+         patch("app.rag.documents.get_embeddings", side_effect=lambda texts: [[0.1]] * len(texts)):
+        count = await ingest_document(
+            session_id, expires_at, "notes.txt", "One sentence. Another one. And a third."
+        )
+
+    assert count == 3
+    calls = indexes.add_texts.call_args_list
+    assert [len(call.args[2]) for call in calls] == [2, 1]
+    assert calls[1].args[:2] == (session_id, expires_at)
+    assert calls[1].args[4] == [{"source": "notes.txt", "chunk_index": 2}]
+
+
+async def test_ingest_document_logs_failures() -> None:
+    """Test that a failed ingestion doesn't raise from the background task."""
+    with patch("app.rag.documents.get_embeddings", side_effect=RuntimeError("down")):
+        count = await ingest_document(uuid4(), datetime.utcnow(), "notes.txt", "Some text.")
+
+    assert count == 0
@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from app.rag.graph import append_messages, checkpointed_input, create_chat_graph, start_turn
+
+
+def make_turn(content: str) -> dict:
+    return {
+        "messages": [HumanMessage(content="Earlier question"), HumanMessage(content=content)],
+        "session_id": str(uuid4()),
+        "query_embedding": [0.1, 0.2],
+        "previous_chunks": [],
+    }
+
+
+def test_append_messages_keeps_window() -> None:
+    """Test that the message reducer appends and bounds the history."""
+    history = [HumanMessage(content=str(i)) for i in range(3)]
+
+    with patch("app.rag.graph.settings.SESSION_CACHE_MAX_MESSAGES", 3):
+        messages = append_messages(history, [AIMessage(content="3")])
+
+    assert [m.content for m in messages] == ["1", "2", "3"]
+    assert append_messages(None, history) == history
+
+
+def test_checkpointed_input() -> None:
+    """Test choosing between a fresh, incremental or resumed run."""
+    turn = make_turn("What is RAG?")
+
+    assert checkpointed_input(None, turn) is turn
+    assert checkpointed_input(SimpleNamespace(values={}, next=()), turn) is turn
+
+    finished = SimpleNamespace(
+        values={"messages": [HumanMessage(content="What is RAG?"), AIMessage(content="...")]},
+        next=()
+    )
+    assert checkpointed_input(finished, turn)["messages"] == [turn["messages"][-1]]
+
+    interrupted = SimpleNamespace(
+        values={"messages": [HumanMessage(content="What is RAG?")]},
+        next=("generate",)
+    )
+    assert checkpointed_input(interrupted, turn) is None
+    assert checkpointed_input(interrupted, make_turn("Something else")) is not None
+
+
+@pytest.mark.asyncio
+async def test_start_turn_persists_only_new_turns() -> None:
+    """Test that a resumed turn doesn't store its user message again."""
+    turn = make_turn("What is RAG?")
+    persist = AsyncMock()
+
+    assert await start_turn(AsyncMock(return_value=None), turn, persist) is turn
+    persist.assert_awaited_once()
+
+    interrupted = SimpleNamespace(
+        values={"messages": [HumanMessage(content="What is RAG?")]},
+        next=("generate",)
+    )
+    persist.reset_mock()
+    assert await start_turn(AsyncMock(return_value=interrupted), turn, persist) is None
+    persist.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_checkpointed_graph_resumes_interrupted_turn() -> None:
+    """Test that a turn failing mid-graph resumes without retrieving again."""
+    store = AsyncMock()
+    store.similarity_search.return_value = [{"id": "a", "text": "RAG retrieves.", "score": 0.9}]
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(side_effect=[
+        RuntimeError("worker crashed"),
+        AIMessage(content="It retrieves, then generates."),
+        AIMessage(content="Because context helps."),
+    ])
+    db = MagicMock(commit=AsyncMock(), refresh=AsyncMock())
+    config = {"configurable": {"thread_id": "session", "db_session": db}}
+
+    with patch("app.rag.graph.get_checkpointer", return_value=MemorySaver()), \
+         patch("app.rag.nodes.get_vector_store", return_value=store), \
+         patch("app.rag.nodes.get_chat_model", return_value=llm), \
+         patch("app.rag.nodes.call_model", new=lambda api, call, tokens=0: call()):
+        graph = create_chat_graph()
+        turn = make_turn("What is RAG?")
+
+        with pytest.raises(RuntimeError):
+            await graph.ainvoke(checkpointed_input(await graph.aget_state(config), turn), config)
+
+        # The client retries the same message
+        resumed_input = checkpointed_input(await graph.aget_state(config), turn)
+        assert resumed_input is None
+        result = await graph.ainvoke(resumed_input, config)
+
+        assert result["response"] == "It retrieves, then generates."
+        store.similarity_search.assert_called_once()
+        db.add.assert_called_once()
+
+        # The next turn only sends its new message
+        turn = make_turn("Why does it search?")
+        next_input = checkpointed_input(await graph.aget_state(config), turn)
+        result = await graph.ainvoke(next_input, config)
+
+    assert [m.content for m in result["messages"]] == [
+        "Earlier question",
+        "What is RAG?",
+        "It retrieves, then generates.",
+        "Why does it search?",
+        "Because context helps.",
+    ]
@@ -0,0 +1,65 @@
+from typing import List, Sequence
+
+import numpy as np
+
+from app.rag.mmr import mmr_rerank, mmr_select
+
+
+def reference_mmr(
+    query: Sequence[float],
+    vectors: Sequence[Sequence[float]],
+    k: int,
+    lambda_mult: float
+) -> List[int]:
+    """Textbook MMR, one candidate at a time."""
+    def cosine(a, b) -> float:
+        return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+    def score(i: int) -> float:
+        if not picked:
+            return cosine(query, vectors[i])
+        redundancy = max(cosine(vectors[i], vectors[j]) for j in picked)
+        return lambda_mult * cosine(query, vectors[i]) - (1 - lambda_mult) * redundancy
+
+    picked: List[int] = []
+    remaining = list(range(len(vectors)))
+    while remaining and len(picked) < k:
+        best = max(remaining, key=score)
+        picked.append(best)
+        remaining.remove(best)
+    return picked
+
+
+def test_mmr_select_matches_reference() -> None:
+    """Test the vectorized selection against a plain implementation."""
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((60, 16))
+    query = rng.standard_normal(16)
+
+    for lambda_mult in (0.0, 0.3, 0.5, 0.9):
+        assert mmr_select(query, vectors, 8, lambda_mult) == reference_mmr(query, vectors, 8, lambda_mult)
+
+
+def test_mmr_select_skips_duplicates() -> None:
+    """Test that a near-duplicate of the best candidate is passed over."""
+    query = [1.0, 0.0]
+    vectors = [[1.0, 0.1], [1.0, 0.11], [0.8, -0.6]]
+
+    assert mmr_select(query, vectors, 2, lambda_mult=1.0) == [0, 1]
+    assert mmr_select(query, vectors, 2, lambda_mult=0.5) == [0, 2]
+    assert mmr_select(query, vectors, 5) == [0, 2, 1]
+    assert mmr_select(query, [], 2) == []
+
+
+def test_mmr_rerank_drops_vectors() -> None:
+    """Test that reranked results keep their scores but not their vectors."""
+    results = [
+        {"id": "a", "text": "a", "score": 0.99, "vector": [1.0, 0.1]},
+        {"id": "b", "text": "b", "score": 0.98, "vector": [1.0, 0.11]},
+        {"id": "c", "text": "c", "score": 0.7, "vector": [0.8, -0.6]},
+    ]
+
+    reranked = mmr_rerank([1.0, 0.0], results, 2)
+
+    assert [r["id"] for r in reranked] == ["a", "c"]
+    assert reranked[1] == {"id": "c", "text": "c", "score": 0.7}
@@ -1,10 +1,14 @@
+import asyncio
 from typing import Dict, Any
 import pytest
 from unittest.mock import AsyncMock, patch
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 from langchain_core.messages import HumanMessage
-from app.rag.nodes import retrieve_context, generate_response, save_message
+from app.core.deadline import Deadline
+from app.core.errors import DeadlineExceededError
+from app.rag.context import ContextChunk, decode_chunk_refs
+from app.rag.nodes import route_turn, reuse_context, retrieve_context, generate_response, save_message
 from app.db.models import Message
 
 pytestmark = pytest.mark.asyncio
@@ -19,10 +23,91 @@ def chat_state() -> Dict[str, Any]:
     }
 
 
+async def test_route_turn_reuses_previous_chunks(chat_state: Dict[str, Any]) -> None:
+    """Test that follow-ups are routed to the previous turn's chunks."""
+    chat_state["messages"] = [HumanMessage(content="Can you rephrase that?")]
+    chat_state["previous_chunks"] = [(str(uuid4()), 0.9)]
+    
+    result = await route_turn(chat_state)
+    
+    assert result["route"] == "reuse"
+
+
+async def test_reuse_context(chat_state: Dict[str, Any]) -> None:
+    """Test rebuilding context from stored chunk ids without searching."""
+    chunk_id = str(uuid4())
+    chat_state["previous_chunks"] = [(chunk_id, 0.9)]
+    
+    with patch("app.rag.nodes.get_vector_store") as mock_store:
+        mock_instance = AsyncMock()
+        mock_instance.get_by_ids.return_value = [
+            {"id": chunk_id, "text": "Paris is the capital of France."}
+        ]
+        mock_store.return_value = mock_instance
+        
+        result = await reuse_context(chat_state)
+        
+        assert result["context"] == "Paris is the capital of France."
+        assert result["chunks"][0].score == 0.9
+        mock_instance.similarity_search.assert_not_called()
+
+
+async def test_retrieve_context_seeded_from_previous_chunks(
+    chat_state: Dict[str, Any]
+) -> None:
+    """Test that previous chunks still on topic replace the search."""
+    chat_state["previous_chunks"] = [("a", 0.9), ("b", 0.8)]
+    chat_state["query_embedding"] = [1.0, 0.0]
+    
+    with patch("app.rag.nodes.get_vector_store") as mock_store:
+        mock_instance = AsyncMock()
+        mock_instance.get_by_ids.return_value = [
+            {"id": "a", "text": "On topic.", "vector": [0.9, 0.1]},
+            {"id": "b", "text": "Off topic.", "vector": [0.0, 1.0]},
+        ]
+        mock_store.return_value = mock_instance
+        
+        result = await retrieve_context(chat_state)
+        
+        assert result["context"].startswith("On topic.")
+        mock_instance.similarity_search.assert_not_called()
+
+
+async def test_retrieve_context_topic_shift(chat_state: Dict[str, Any]) -> None:
+    """Test that a topic shift searches and merges with previous chunks."""
+    chat_state["previous_chunks"] = [("a", 0.9)]
+    chat_state["query_embedding"] = [1.0, 0.0]
+    
+    with patch("app.rag.nodes.get_vector_store") as mock_store:
+        mock_instance = AsyncMock()
+        mock_instance.get_by_ids.return_value = [
+            {"id": "a", "text": "Old topic.", "vector": [0.0, 1.0]}
+        ]
+        mock_instance.similarity_search.return_value = [
+            {"id": "c", "text": "New topic.", "score": 0.9}
+        ]
+        mock_store.return_value = mock_instance
+        
+        result = await retrieve_context(chat_state)
+        
+        assert result["context"] == "New topic.\n\nOld topic."
+        mock_instance.similarity_search.assert_called_once()
+
+
+async def test_route_turn_skips_small_talk(chat_state: Dict[str, Any]) -> None:
+    """Test that small talk clears the context."""
+    chat_state["messages"] = [HumanMessage(content="thanks!")]
+    
+    result = await route_turn(chat_state)
+    
+    assert result["route"] == "skip"
+    assert result["context"] == ""
+
+
 async def test_retrieve_context(chat_state: Dict[str, Any]) -> None:
     """Test context retrieval."""
     with patch("app.rag.nodes.get_embeddings") as mock_embeddings, \
-         patch("app.rag.nodes.VectorStore") as mock_store:
+         patch("app.rag.nodes.get_vector_store") as mock_store:
         # Mock embeddings
         mock_embeddings.return_value = [[0.1] * 1536]
         
@@ -41,11 +126,50 @@ async def test_retrieve_context(chat_state: Dict[str, Any]) -> None:
         mock_instance.similarity_search.assert_called_once()
 
 
+async def test_retrieve_context_mmr(chat_state: Dict[str, Any]) -> None:
+    """Test that MMR over-fetches candidates and keeps diverse ones."""
+    chat_state["query_embedding"] = [1.0, 0.0]
+    mock_instance = AsyncMock()
+    mock_instance.similarity_search.return_value = [
+        {"id": "a", "text": "Paris is the capital of France.", "score": 0.99, "vector": [1.0, 0.1]},
+        {"id": "b", "text": "Paris is France's capital city.", "score": 0.98, "vector": [1.0, 0.11]},
+        {"id": "c", "text": "France is in Europe.", "score": 0.7, "vector": [0.8, -0.6]},
+    ]
+    
+    with patch("app.rag.nodes.get_vector_store", return_value=mock_instance), \
+         patch("app.rag.nodes.settings.RETRIEVAL_MMR_ENABLED", True), \
+         patch("app.rag.nodes.settings.RETRIEVAL_MMR_FETCH_K", 20), \
+         patch("app.rag.nodes.settings.RETRIEVAL_LIMIT", 2):
+        result = await retrieve_context(chat_state)
+    
+    assert mock_instance.similarity_search.call_args.kwargs["limit"] == 20
+    assert mock_instance.similarity_search.call_args.kwargs["with_vectors"] is True
+    assert [chunk.ids for chunk in result["chunks"]] == [["a"], ["c"]]
+
+
+async def test_retrieve_context_uses_session_index(chat_state: Dict[str, Any]) -> None:
+    """Test that sessions with uploaded documents search their own index."""
+    session_index = AsyncMock()
+    session_index.similarity_search.return_value = [
+        {"id": "a", "text": "Paris is the capital of France.", "score": 0.9}
+    ]
+    chat_state["query_embedding"] = [0.1] * 1536
+    
+    with patch("app.rag.nodes.get_session_indexes") as mock_indexes, \
+         patch("app.rag.nodes.get_vector_store") as mock_store:
+        mock_indexes.return_value.get.return_value = session_index
+        result = await retrieve_context(chat_state)
+    
+    assert "Paris" in result["context"]
+    assert mock_indexes.return_value.get.call_args.args[0] == UUID(chat_state["session_id"])
+    mock_store.assert_not_called()
+
+
 async def test_generate_response(chat_state: Dict[str, Any]) -> None:
     """Test response generation."""
     chat_state["context"] = "Paris is the capital of France."
     
-    with patch("app.rag.nodes.ChatOpenAI") as mock_llm:
+    with patch("app.rag.nodes.get_chat_model") as mock_llm:
         # Mock LLM response
         mock_instance = AsyncMock()
         mock_instance.ainvoke.return_value.content = "The capital of France is Paris."
@@ -56,22 +180,56 @@ async def test_generate_response(chat_state: Dict[str, Any]) -> None:
         
         assert "response" in result
         assert "Paris" in result["response"]
+        assert result["messages"][-1].content == result["response"]
         mock_instance.ainvoke.assert_called_once()
 
 
+async def test_retrieve_context_skipped_near_deadline(chat_state: Dict[str, Any]) -> None:
+    """Test that retrieval is skipped when the deadline is close."""
+    config = {"configurable": {"deadline": Deadline(0.5)}}
+    
+    with patch("app.rag.nodes.get_embeddings") as mock_embeddings, \
+         patch("app.rag.nodes.get_vector_store") as mock_store:
+        result = await retrieve_context(chat_state, config)
+        
+        assert result["context"] == ""
+        mock_embeddings.assert_not_called()
+        mock_store.assert_not_called()
+
+
+async def test_generate_response_deadline(chat_state: Dict[str, Any]) -> None:
+    """Test that a slow LLM call is cancelled at the deadline."""
+    chat_state["context"] = ""
+    
+    async def slow_invoke(*args, **kwargs):
+        await asyncio.sleep(10)
+    
+    with patch("app.rag.nodes.get_chat_model") as mock_llm:
+        mock_llm.return_value.ainvoke = slow_invoke
+        
+        with pytest.raises(DeadlineExceededError):
+            await generate_response(
+                chat_state, {"configurable": {"deadline": Deadline(0.05)}}
+            )
+
+
 async def test_save_message(
     chat_state: Dict[str, Any],
     db_session: AsyncMock
 ) -> None:
     """Test message saving."""
-    chat_state.update({
-        "db_session": db_session,
-        "response": "The capital of France is Paris."
-    })
+    chat_state["response"] = "The capital of France is Paris."
+    chat_state["chunks"] = [
+        ContextChunk(text="Paris is the capital of France.", score=0.91234, ids=["a", "b"])
+    ]
     
     # Save message
-    result = await save_message(chat_state)
+    result = await save_message(
+        chat_state, {"configurable": {"db_session": db_session}}
+    )
     
     assert db_session.add.called
     assert db_session.commit.called
     assert db_session.refresh.called
+    saved = db_session.add.call_args[0][0]
+    assert decode_chunk_refs(saved.context_chunks) == [("a", 0.9123), ("b", 0.9123)]
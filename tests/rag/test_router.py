@@ -0,0 +1,91 @@
+import pytest
+from unittest.mock import MagicMock
+
+from app.rag.router import RETRIEVE, REUSE, SKIP, RetrievalRouter
+
+
+@pytest.mark.parametrize("message", ["thanks!", "Thank you so much", "ok", "hi", "  "])
+def test_small_talk_skips(message: str) -> None:
+    """Test that small talk needs no retrieval."""
+    assert RetrievalRouter().route(message, has_previous_context=True) == SKIP
+
+
+@pytest.mark.parametrize("message", [
+    "Can you rephrase that more briefly?",
+    "What do you mean?",
+    "Explain that in simpler terms",
+])
+def test_rework_reuses_context(message: str) -> None:
+    """Test that reworking the last answer reuses its context."""
+    router = RetrievalRouter()
+    
+    assert router.route(message, has_previous_context=True) == REUSE
+    assert router.route(message, has_previous_context=False) == SKIP
+
+
+@pytest.mark.parametrize("message", [
+    "Please elaborate on how the billing API handles refunds and chargebacks",
+    "Can you explain in more detail the SSO setup for Okta tenants?",
+])
+def test_long_questions_mentioning_rework_retrieve(message: str) -> None:
+    """Test that new-topic questions saying "elaborate" or "more detail" retrieve."""
+    router = RetrievalRouter()
+    
+    assert router.route(message, has_previous_context=True) == RETRIEVE
+    assert router.route(message, has_previous_context=False) == RETRIEVE
+
+
+def test_bare_why_reuses_context() -> None:
+    """Test that a bare "why?" reuses context when there is some."""
+    router = RetrievalRouter()
+    
+    assert router.route("Why?", has_previous_context=True) == REUSE
+    assert router.route("How so?", has_previous_context=True) == REUSE
+    assert router.route("Why?", has_previous_context=False) == RETRIEVE
+
+
+@pytest.mark.parametrize("message", [
+    "Is that still true?",
+    "Does it support SAML SSO?",
+    "How do I rotate these API keys?",
+    "Is that endpoint rate limited?",
+])
+def test_pronoun_follow_ups_retrieve(message: str) -> None:
+    """Test that pronoun follow-ups retrieve, as they may bring a new topic."""
+    router = RetrievalRouter()
+    
+    assert router.route(message, has_previous_context=True) == RETRIEVE
+    assert router.route(message, has_previous_context=False) == RETRIEVE
+
+
+@pytest.mark.parametrize("message", [
+    "How are database migrations applied?",
+    "What about Lyon?",
+    "What does the onboarding guide say about setting it up on a new laptop?",
+])
+def test_new_questions_retrieve(message: str) -> None:
+    """Test that new questions retrieve fresh context."""
+    assert RetrievalRouter().route(message, has_previous_context=True) == RETRIEVE
+
+
+def test_classifier_decides_follow_ups() -> None:
+    """Test that the classifier settles ambiguous follow-ups."""
+    classifier = MagicMock()
+    classifier.predict.return_value = [REUSE]
+    router = RetrievalRouter(classifier)
+    
+    assert router.route("Is that still true?", has_previous_context=True) == REUSE
+    assert router.route("thanks", has_previous_context=True) == SKIP
+    classifier.predict.assert_called_once_with(["Is that still true?"])
+    # Without previous chunks there is nothing to reuse
+    assert router.route("Is that still true?", has_previous_context=False) == RETRIEVE
+
+
+def test_classifier_failure_falls_back() -> None:
+    """Test that classifier errors and unknown labels fall back to heuristics."""
+    classifier = MagicMock()
+    classifier.predict.side_effect = [RuntimeError("broken"), ["unknown"]]
+    router = RetrievalRouter(classifier)
+    
+    assert router.route("Is that still true?", has_previous_context=True) == RETRIEVE
+    assert router.route("Is that still true?", has_previous_context=True) == RETRIEVE
@@ -1,62 +1,83 @@
+import httpx
 import pytest
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
 import openai
 
+from app.vector_store import embeddings
 from app.vector_store.embeddings import get_embeddings
 
 pytestmark = pytest.mark.asyncio
 
 
+def _mock_client(create: AsyncMock) -> MagicMock:
+    client = MagicMock()
+    client.embeddings.create = create
+    return client
+
+
+def _response(*vectors):
+    response = MagicMock()
+    response.data = [
+        type("EmbeddingData", (), {"embedding": vector}) for vector in vectors
+    ]
+    return response
+
+
+def _rate_limit_error() -> openai.RateLimitError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    return openai.RateLimitError(
+        "Rate limit", response=httpx.Response(429, request=request), body=None
+    )
+
+
 async def test_get_embeddings_success() -> None:
     """Test successful embedding generation."""
     texts = ["Hello world", "Test text"]
-    mock_response = AsyncMock()
-    mock_response.data = [
-        type("EmbeddingData", (), {"embedding": [0.1] * 1536}),
-        type("EmbeddingData", (), {"embedding": [0.2] * 1536})
-    ]
+    create = AsyncMock(return_value=_response([0.1] * 1536, [0.2] * 1536))
     
-    with patch("openai.Embedding.acreate", return_value=mock_response):
-        embeddings = await get_embeddings(texts)
+    with patch("app.vector_store.embeddings.get_openai_client", return_value=_mock_client(create)):
+        embeddings_ = await get_embeddings(texts)
         
-        assert len(embeddings) == len(texts)
-        assert all(len(emb) == 1536 for emb in embeddings)
-        assert all(isinstance(val, float) for emb in embeddings for val in emb)
+        assert len(embeddings_) == len(texts)
+        assert all(len(emb) == 1536 for emb in embeddings_)
+        assert all(isinstance(val, float) for emb in embeddings_ for val in emb)
 
 
 async def test_get_embeddings_retry() -> None:
     """Test retry behavior on rate limit."""
     texts = ["Test text"]
-    mock_success = AsyncMock()
-    mock_success.data = [
-        type("EmbeddingData", (), {"embedding": [0.1] * 1536})
-    ]
+    # First call raises rate limit, second succeeds
+    create = AsyncMock(side_effect=[_rate_limit_error(), _response([0.1] * 1536)])
     
-    with patch("openai.Embedding.acreate") as mock_create:
-        # First call raises rate limit, second succeeds
-        mock_create.side_effect = [
-            openai.error.RateLimitError("Rate limit"),
-            mock_success
-        ]
+    with patch("app.vector_store.embeddings.get_openai_client", return_value=_mock_client(create)), \
+         patch.object(embeddings.settings, "LLM_RETRY_BASE_SECONDS", 0):
+        embeddings_ = await get_embeddings(texts)
         
-        embeddings = await get_embeddings(texts)
-        
-        assert len(embeddings) == 1
-        assert len(embeddings[0]) == 1536
-        assert mock_create.call_count == 2
+        assert len(embeddings_) == 1
+        assert len(embeddings_[0]) == 1536
+        assert create.call_count == 2
 
 
 async def test_get_embeddings_long_text() -> None:
     """Test handling of long texts."""
     long_text = "a" * 10000
-    mock_response = AsyncMock()
-    mock_response.data = [
-        type("EmbeddingData", (), {"embedding": [0.1] * 1536})
-    ]
+    create = AsyncMock(return_value=_response([0.1] * 1536))
     
-    with patch("openai.Embedding.acreate", return_value=mock_response) as mock_create:
+    with patch("app.vector_store.embeddings.get_openai_client", return_value=_mock_client(create)):
         await get_embeddings([long_text])
         
         # Verify text was truncated
-        called_text = mock_create.call_args[1]["input"][0]
+        called_text = create.call_args[1]["input"][0]
         assert len(called_text) <= 8191
+
+
+async def test_get_embeddings_fake_backend() -> None:
+    """Test embedding with the in-process fake backend."""
+    with patch.object(embeddings.settings, "EMBEDDING_BACKEND", "fake"), \
+         patch.object(embeddings.settings, "FAKE_EMBEDDING_LATENCY_MS", 0), \
+         patch("app.vector_store.embeddings.get_openai_client") as mock_client:
+        embeddings_ = await get_embeddings(["Hello world", "Hello world"])
+        
+        assert len(embeddings_) == 2
+        assert embeddings_[0] == embeddings_[1]
+        mock_client.assert_not_called()
@@ -0,0 +1,193 @@
+from typing import List
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.vector_store.local import LocalVectorStore
+from app.vector_store.quantization import Projection, VectorCodec
+
+pytestmark = pytest.mark.asyncio
+
+
+def random_vectors(count: int, dimensions: int = 8, seed: int = 0) -> List[List[float]]:
+    return np.random.default_rng(seed).standard_normal((count, dimensions)).tolist()
+
+
+async def test_similarity_search_matches_brute_force() -> None:
+    """Test that results are the exact cosine nearest neighbours."""
+    store = LocalVectorStore(vector_size=8, segment_size=4)
+    vectors = random_vectors(10)
+    ids = await store.add_texts([f"chunk {i}" for i in range(10)], vectors)
+    query = random_vectors(1, seed=1)[0]
+
+    results = await store.similarity_search(query, limit=3)
+
+    matrix = np.asarray(vectors)
+    expected = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
+    top = np.argsort(-expected)[:3]
+    assert len(store.segments) == 3
+    assert [r["id"] for r in results] == [ids[i] for i in top]
+    assert [r["text"] for r in results] == [f"chunk {i}" for i in top]
+    assert results[0]["score"] == pytest.approx(expected[top[0]], abs=1e-5)
+
+
+async def test_similarity_search_batch() -> None:
+    """Test that batched queries match single queries."""
+    store = LocalVectorStore(vector_size=8, segment_size=4)
+    await store.add_texts([f"chunk {i}" for i in range(10)], random_vectors(10))
+    queries = random_vectors(3, seed=2)
+
+    batch = await store.similarity_search_batch(queries, limit=2)
+
+    for query, results in zip(queries, batch):
+        single = await store.similarity_search(query, limit=2)
+        assert [r["id"] for r in results] == [r["id"] for r in single]
+
+
+async def test_session_filter_and_delete() -> None:
+    """Test session filtered search and deleting a session's vectors."""
+    store = LocalVectorStore(vector_size=8, segment_size=4, compact_ratio=1.0)
+    session_id = uuid4()
+    own = await store.add_texts(["a", "b"], random_vectors(2), session_id=session_id)
+    await store.add_texts(["c", "d", "e"], random_vectors(3, seed=1), session_id=uuid4())
+
+    results = await store.similarity_search(random_vectors(1, seed=3)[0], session_id=session_id)
+    assert {r["id"] for r in results} == set(own)
+    assert all(r["session_id"] == str(session_id) for r in results)
+
+    assert await store.delete_by_sessions([session_id]) == 2
+    assert await store.similarity_search(random_vectors(1)[0], session_id=session_id) == []
+    assert await store.get_by_ids(own) == []
+    assert len(await store.similarity_search(random_vectors(1)[0], limit=10)) == 3
+
+
+async def test_get_by_ids_with_vectors() -> None:
+    """Test fetching points with their normalized vectors."""
+    store = LocalVectorStore(vector_size=8)
+    [point_id] = await store.add_texts(["a"], [[2.0] + [0.0] * 7], metadata=[{"source": "doc"}])
+
+    [point] = await store.get_by_ids([point_id, str(uuid4())], with_vectors=True)
+
+    assert point["text"] == "a"
+    assert point["source"] == "doc"
+    assert point["vector"] == [1.0] + [0.0] * 7
+
+
+async def test_dimension_mismatch() -> None:
+    """Test that embeddings of the wrong size are rejected."""
+    store = LocalVectorStore(vector_size=8)
+    with pytest.raises(ValueError):
+        await store.add_texts(["a"], [[0.1] * 4])
+
+
+async def test_persistence_and_compaction(tmp_path) -> None:
+    """Test reopening a memory-mapped index and compacting deleted rows."""
+    store = LocalVectorStore(path=str(tmp_path), vector_size=8, segment_size=4, compact_ratio=0.5)
+    await store.ensure_collection()
+    session_id = uuid4()
+    await store.add_texts(["a", "b", "c"], random_vectors(3), session_id=session_id)
+    kept = await store.add_texts(["d", "e", "f"], random_vectors(3, seed=1))
+    assert await store.delete_by_sessions([session_id]) == 3
+
+    reopened = LocalVectorStore(path=str(tmp_path), vector_size=8)
+    results = await reopened.similarity_search(random_vectors(1)[0], limit=10)
+    assert {r["id"] for r in results} == set(kept)
+
+    # Half the rows are dead, so the next delete compacts
+    await reopened.delete_by_sessions([uuid4()])
+    reopened.compact()
+    assert len(reopened.segments) == 1
+    assert len(list(tmp_path.glob("*.f32"))) == 1
+
+    again = LocalVectorStore(path=str(tmp_path), vector_size=8)
+    assert len(await again.get_by_ids(kept)) == 3
+
+
+async def test_similarity_search_with_vectors() -> None:
+    """Test that searches can return the stored, normalized vectors."""
+    store = LocalVectorStore(vector_size=8, segment_size=2)
+    vectors = random_vectors(5)
+    ids = await store.add_texts(["a", "b", "c", "d", "e"], vectors)
+
+    results = await store.similarity_search(vectors[2], limit=5, with_vectors=True)
+
+    assert results[0]["id"] == ids[2]
+    normalized = np.asarray(vectors) / np.linalg.norm(vectors, axis=1, keepdims=True)
+    for result in results:
+        expected = normalized[ids.index(result["id"])]
+        assert np.allclose(result["vector"], expected, atol=1e-6)
+
+
+async def test_int8_codes_in_memory() -> None:
+    """Test that an in-memory int8 index finds neighbours and decodes vectors."""
+    store = LocalVectorStore(vector_size=8, segment_size=4, codec=VectorCodec("int8"))
+    vectors = random_vectors(10)
+    ids = await store.add_texts([f"chunk {i}" for i in range(10)], vectors)
+
+    [result] = await store.similarity_search(vectors[7], limit=1, with_vectors=True)
+
+    expected = np.asarray(vectors[7]) / np.linalg.norm(vectors[7])
+    assert result["id"] == ids[7]
+    assert result["score"] == pytest.approx(1.0, abs=2e-2)
+    assert np.allclose(result["vector"], expected, atol=2e-2)
+    assert all(segment.vectors is None for segment in store.segments)
+
+
+async def test_float16_working_copy() -> None:
+    """Test that small float16 indexes score from a float32 copy of their codes."""
+    store = LocalVectorStore(
+        vector_size=8, segment_size=4, codec=VectorCodec("float16"), working_copy_rows=10
+    )
+    vectors = random_vectors(10)
+    ids = await store.add_texts([f"chunk {i}" for i in range(10)], vectors)
+    plain = LocalVectorStore(vector_size=8, segment_size=4, codec=VectorCodec("float16"))
+    await plain.add_texts([f"chunk {i}" for i in range(10)], vectors)
+
+    results = await store.similarity_search(vectors[7], limit=3)
+
+    assert results[0]["id"] == ids[7]
+    expected = await plain.similarity_search(vectors[7], limit=3)
+    assert [r["score"] for r in results] == pytest.approx([r["score"] for r in expected])
+    assert all(segment.working.dtype == np.float32 for segment in store.segments)
+    assert all(segment.working is None for segment in plain.segments)
+
+    # Writes invalidate the copy, and indexes past the limit drop it
+    await store.add_texts(["chunk 10"], random_vectors(1, seed=1))
+    assert store.segments[-1].working is None
+    await store.similarity_search(vectors[7], limit=3)
+    assert all(segment.working is None for segment in store.segments)
+
+
+async def test_reduced_codes_are_rescored(tmp_path) -> None:
+    """Test that truncated int8 candidates are rescored with the originals."""
+    codec = VectorCodec("int8", Projection.truncate(4))
+    store = LocalVectorStore(path=str(tmp_path), vector_size=8, codec=codec, oversampling=10)
+    vectors = random_vectors(10)
+    ids = await store.add_texts([f"chunk {i}" for i in range(10)], vectors)
+    query = random_vectors(1, seed=1)[0]
+
+    results = await store.similarity_search(query, limit=3)
+
+    matrix = np.asarray(vectors)
+    expected = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
+    top = np.argsort(-expected)[:3]
+    assert [r["id"] for r in results] == [ids[i] for i in top]
+    assert results[0]["score"] == pytest.approx(expected[top[0]], abs=1e-5)
+
+
+async def test_fitted_projection_is_reloaded(tmp_path) -> None:
+    """Test that a fitted PCA projection is saved and used after reopening."""
+    store = LocalVectorStore(path=str(tmp_path), vector_size=8, codec=VectorCodec("float16"))
+    vectors = random_vectors(20)
+    ids = await store.add_texts([f"chunk {i}" for i in range(20)], vectors)
+
+    store.fit_pca(4)
+
+    reopened = LocalVectorStore(path=str(tmp_path), vector_size=8, codec=VectorCodec("float16"))
+    [result] = await reopened.similarity_search(vectors[5], limit=1, with_vectors=True)
+    assert reopened.codec.dims(8) == 4
+    assert result["id"] == ids[5]
+    assert len(result["vector"]) == 8
+    with pytest.raises(ValueError):
+        LocalVectorStore(vector_size=8, codec=VectorCodec(projection=Projection.truncate(4)))
@@ -0,0 +1,211 @@
+import json
+from types import SimpleNamespace
+from typing import AsyncGenerator
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.vector_store.pgvector import PgVectorStore, _vector_literal
+
+
+def make_store(db: MagicMock, **kwargs) -> PgVectorStore:
+    factory = MagicMock()
+    factory.return_value.__aenter__ = AsyncMock(return_value=db)
+    factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    return PgVectorStore(session_factory=factory, vector_size=2, **kwargs)
+
+
+def make_db() -> MagicMock:
+    db = MagicMock(execute=AsyncMock(return_value=MagicMock()), commit=AsyncMock(), scalar=AsyncMock())
+    driver = MagicMock(execute=AsyncMock(), copy_records_to_table=AsyncMock())
+    connection = MagicMock()
+    connection.get_raw_connection = AsyncMock(return_value=MagicMock(driver_connection=driver))
+    db.connection = AsyncMock(return_value=connection)
+    return db
+
+
+def test_vector_literal() -> None:
+    """Test formatting embeddings as pgvector input."""
+    assert _vector_literal([0.5, -1, 2.25]) == "[0.5,-1.0,2.25]"
+
+
+@pytest.mark.asyncio
+async def test_add_texts_copies_in_batches() -> None:
+    """Test that inserts are copied in batches, then cast in one INSERT."""
+    db = make_db()
+    store = make_store(db, copy_batch_size=2)
+    session_id = uuid4()
+
+    ids = await store.add_texts(
+        ["a", "b", "c"],
+        [[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]],
+        metadata=[{"source": "doc"}, {}, {}],
+        session_id=session_id
+    )
+
+    driver = (await (await db.connection()).get_raw_connection()).driver_connection
+    batches = [call.kwargs["records"] for call in driver.copy_records_to_table.call_args_list]
+    assert [len(batch) for batch in batches] == [2, 1]
+    first = batches[0][0]
+    assert str(first[0]) == ids[0]
+    assert first[1:] == (session_id, "a", json.dumps({"source": "doc"}), "[0.1,0.2]")
+    insert = driver.execute.call_args.args[0]
+    assert "INSERT INTO document_chunks" in insert and "embedding::vector" in insert
+    # Staging, copies and insert share one transaction
+    driver.transaction.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_add_texts_validates_lengths() -> None:
+    """Test that mismatched inputs are rejected before touching the database."""
+    db = make_db()
+    store = make_store(db)
+
+    with pytest.raises(ValueError):
+        await store.add_texts(["a"], [[0.1, 0.2], [0.3, 0.4]])
+    db.connection.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_similarity_search_by_session_is_exact() -> None:
+    """Test that session searches skip the index settings and map rows."""
+    session_id = uuid4()
+    point_id = uuid4()
+    db = make_db()
+    db.execute.return_value.all.return_value = [
+        SimpleNamespace(
+            id=point_id,
+            session_id=session_id,
+            text="RAG retrieves.",
+            metadata='{"source": "doc", "chunk_index": 3}',
+            distance=0.25
+        )
+    ]
+    store = make_store(db)
+
+    results = await store.similarity_search([0.1, 0.2], session_id=session_id, limit=4)
+
+    assert results == [{
+        "id": str(point_id),
+        "text": "RAG retrieves.",
+        "score": 0.75,
+        "source": "doc",
+        "chunk_index": 3,
+        "session_id": str(session_id),
+    }]
+    db.execute.assert_called_once()
+    query, params = db.execute.call_args.args
+    assert "session_id = :session_id" in str(query) and "+ 0" in str(query)
+    assert params == {"query": "[0.1,0.2]", "limit": 4, "session_id": session_id}
+
+
+@pytest.mark.asyncio
+async def test_similarity_search_sets_index_recall() -> None:
+    """Test that unfiltered searches tune the approximate index first."""
+    db = make_db()
+    db.execute.return_value.all.return_value = []
+    store = make_store(db, index="ivfflat", probes=7)
+
+    assert await store.similarity_search([0.1, 0.2]) == []
+    assert str(db.execute.call_args_list[0].args[0]) == "SET LOCAL ivfflat.probes = 7"
+
+
+@pytest.mark.asyncio
+async def test_get_by_ids_skips_invalid_ids() -> None:
+    """Test fetching points with vectors, ignoring ids that aren't UUIDs."""
+    point_id = uuid4()
+    db = make_db()
+    db.execute.return_value.all.return_value = [
+        SimpleNamespace(
+            id=point_id,
+            session_id=None,
+            text="chunk",
+            metadata="{}",
+            embedding="[0.5,0.25]"
+        )
+    ]
+    store = make_store(db)
+
+    assert await store.get_by_ids(["not-a-uuid"]) == []
+    points = await store.get_by_ids([str(point_id), "not-a-uuid"], with_vectors=True)
+
+    assert points == [{"id": str(point_id), "text": "chunk", "vector": [0.5, 0.25]}]
+    assert db.execute.call_args.args[1] == {"ids": [point_id]}
+
+
+@pytest.mark.asyncio
+async def test_delete_by_sessions_returns_count() -> None:
+    """Test deleting several sessions' chunks in one statement."""
+    db = make_db()
+    db.execute.return_value.rowcount = 5
+    store = make_store(db)
+
+    assert await store.delete_by_sessions([]) == 0
+    assert await store.delete_by_sessions([uuid4(), uuid4()]) == 5
+    db.execute.assert_called_once()
+    db.commit.assert_called_once()
+
+
+@pytest.fixture
+async def pg_store(pg_engine: AsyncEngine) -> AsyncGenerator[PgVectorStore, None]:
+    """A store on a fresh database with pgvector."""
+    async with pg_engine.begin() as conn:
+        try:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        except DBAPIError as e:
+            pytest.skip(f"pgvector is not installed: {e}")
+        await conn.execute(text(
+            "CREATE TABLE document_chunks (id uuid PRIMARY KEY, session_id uuid, "
+            "text text NOT NULL, metadata jsonb NOT NULL DEFAULT '{}', "
+            "created_at timestamp NOT NULL DEFAULT now(), embedding vector(3) NOT NULL)"
+        ))
+    yield PgVectorStore(
+        session_factory=async_sessionmaker(pg_engine, expire_on_commit=False),
+        vector_size=3,
+        copy_batch_size=4
+    )
+
+
+@pytest.mark.asyncio
+async def test_round_trip(pg_store: PgVectorStore) -> None:
+    """Test adding, searching, fetching and deleting chunks in Postgres."""
+    await pg_store.ensure_collection()
+    session_id, other_session = uuid4(), uuid4()
+    vectors = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.6, 0.8, 0.0], [0.0, 0.0, 1.0], [0.8, 0.6, 0.0]]
+
+    ids = await pg_store.add_texts(
+        [f"chunk {i}" for i in range(5)],
+        vectors,
+        metadata=[{"chunk_index": i} for i in range(5)],
+        session_id=session_id
+    )
+    other = await pg_store.add_texts(["elsewhere"], [[1.0, 0.0, 0.0]], session_id=other_session)
+
+    results = await pg_store.similarity_search([1.0, 0.1, 0.0], session_id=session_id, limit=2)
+    assert [r["id"] for r in results] == [ids[0], ids[4]]
+    assert results[0]["chunk_index"] == 0 and results[0]["session_id"] == str(session_id)
+    assert results[0]["score"] == pytest.approx(0.995, abs=1e-3)
+
+    unfiltered = await pg_store.similarity_search([1.0, 0.0, 0.0], limit=6)
+    assert len(unfiltered) == 6
+
+    [point] = await pg_store.get_by_ids([ids[3]], with_vectors=True)
+    assert point["text"] == "chunk 3" and point["vector"] == [0.0, 0.0, 1.0]
+
+    assert await pg_store.delete_by_sessions([session_id]) == 5
+    assert await pg_store.similarity_search([1.0, 0.0, 0.0], session_id=session_id) == []
+    assert [p["id"] for p in await pg_store.get_by_ids(ids + other)] == other
+
+
+@pytest.mark.asyncio
+async def test_add_texts_twice_in_one_connection(pg_store: PgVectorStore) -> None:
+    """Test that the staging table is empty again for the next insert."""
+    first = await pg_store.add_texts(["a"], [[1.0, 0.0, 0.0]])
+    second = await pg_store.add_texts(["b", "c"], [[0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+
+    points = await pg_store.get_by_ids(first + second)
+    assert sorted(p["text"] for p in points) == ["a", "b", "c"]
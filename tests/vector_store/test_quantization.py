@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from app.vector_store.quantization import Projection, VectorCodec
+
+
+def unit_vectors(count: int, dimensions: int = 16, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((count, dimensions)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("dtype,tolerance", [("float32", 1e-6), ("float16", 1e-3), ("int8", 2e-2)])
+def test_scores_approximate_cosine_similarity(dtype: str, tolerance: float) -> None:
+    """Test that scores of encoded vectors stay close to the exact ones."""
+    codec = VectorCodec(dtype)
+    vectors = unit_vectors(50)
+    queries = unit_vectors(3, seed=1)
+
+    codes, scales = codec.encode(vectors)
+
+    assert codes.dtype == np.dtype(dtype)
+    assert (scales is not None) == (dtype == "int8")
+    assert np.allclose(codec.scores(codes, scales, queries), vectors @ queries.T, atol=tolerance)
+    assert np.allclose(codec.decode(codes, scales), vectors, atol=tolerance)
+
+
+def test_bytes_per_vector() -> None:
+    """Test the memory a vector's code takes."""
+    assert VectorCodec().bytes_per_vector(1536) == 6144
+    assert VectorCodec("float16").bytes_per_vector(1536) == 3072
+    assert VectorCodec("int8", Projection.truncate(256)).bytes_per_vector(1536) == 260
+
+
+def test_unknown_dtype() -> None:
+    """Test that unsupported storage types are rejected."""
+    with pytest.raises(ValueError):
+        VectorCodec("int4")
+
+
+def test_truncation_keeps_leading_dimensions() -> None:
+    """Test that truncated vectors are the renormalized leading dimensions."""
+    vectors = unit_vectors(5)
+
+    reduced = Projection.truncate(4).apply(vectors)
+
+    expected = vectors[:, :4] / np.linalg.norm(vectors[:, :4], axis=1, keepdims=True)
+    assert np.allclose(reduced, expected, atol=1e-6)
+
+
+def test_pca_preserves_low_rank_similarities(tmp_path) -> None:
+    """Test that PCA keeps similarities of vectors spanning few dimensions."""
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((100, 4)) @ rng.standard_normal((4, 16))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    projection = Projection.fit_pca(vectors, 4)
+    projection.save(tmp_path / "projection.npy")
+    reduced = Projection.load(tmp_path / "projection.npy").apply(vectors)
+
+    assert reduced.shape == (100, 4)
+    assert np.allclose(reduced @ reduced.T, vectors @ vectors.T, atol=1e-4)
+    with pytest.raises(ValueError):
+        Projection.fit_pca(vectors[:3], 4)
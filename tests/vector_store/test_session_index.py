@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+from typing import List
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.vector_store.local import LocalVectorStore
+from app.vector_store.session_index import SessionIndexes
+
+pytestmark = pytest.mark.asyncio
+
+
+def random_vectors(count: int, seed: int = 0) -> List[List[float]]:
+    return np.random.default_rng(seed).standard_normal((count, 8)).tolist()
+
+
+def make_indexes(max_chunks: int = 10, max_sessions: int = 2, **kwargs) -> SessionIndexes:
+    return SessionIndexes(
+        max_chunks,
+        max_sessions,
+        vector_size=8,
+        shared=LocalVectorStore(vector_size=8, segment_size=16),
+        **kwargs
+    )
+
+
+def in_an_hour() -> datetime:
+    return datetime.utcnow() + timedelta(hours=1)
+
+
+async def test_small_sessions_are_indexed_in_memory() -> None:
+    """Test that a session's chunks are searched in its own index."""
+    indexes = make_indexes()
+    session_id = uuid4()
+    vectors = random_vectors(3)
+
+    ids = await indexes.add_texts(
+        session_id, in_an_hour(), ["a", "b", "c"], vectors,
+        [{"source": "doc.txt", "chunk_index": i} for i in range(3)]
+    )
+
+    store = indexes.get(session_id)
+    assert store is not None and len(store) == 3
+    assert len(indexes.shared) == 0
+    [best] = await store.similarity_search(vectors[1], session_id=session_id, limit=1)
+    assert best["id"] == ids[1]
+    assert best["source"] == "doc.txt" and best["chunk_index"] == 1
+    assert indexes.get(uuid4()) is None
+
+
+async def test_large_sessions_spill_to_shared_store() -> None:
+    """Test that a session outgrowing its index moves to the shared store."""
+    indexes = make_indexes(max_chunks=4)
+    session_id = uuid4()
+    await indexes.add_texts(session_id, in_an_hour(), ["a", "b", "c"], random_vectors(3))
+
+    await indexes.add_texts(session_id, in_an_hour(), ["d", "e"], random_vectors(2, seed=1))
+    await indexes.add_texts(session_id, in_an_hour(), ["f"], random_vectors(1, seed=2))
+
+    assert indexes.get(session_id) is None
+    results = await indexes.shared.similarity_search(
+        random_vectors(1)[0], session_id=session_id, limit=10
+    )
+    assert sorted(r["text"] for r in results) == ["a", "b", "c", "d", "e", "f"]
+
+
+async def test_least_recently_used_session_spills() -> None:
+    """Test that indexes beyond `max_sessions` spill, oldest first."""
+    indexes = make_indexes(max_sessions=2)
+    first, second, third = uuid4(), uuid4(), uuid4()
+    await indexes.add_texts(first, in_an_hour(), ["a"], random_vectors(1))
+    await indexes.add_texts(second, in_an_hour(), ["b"], random_vectors(1))
+    indexes.get(first)
+
+    await indexes.add_texts(third, in_an_hour(), ["c"], random_vectors(1))
+
+    assert indexes.get(second) is None
+    assert indexes.get(first) is not None and indexes.get(third) is not None
+    assert len(indexes.shared) == 1
+
+
+async def test_expired_sessions_are_dropped() -> None:
+    """Test that expired sessions' indexes are dropped."""
+    indexes = make_indexes()
+    expired, active = uuid4(), uuid4()
+    await indexes.add_texts(expired, datetime.utcnow() - timedelta(seconds=1), ["a"], random_vectors(1))
+    await indexes.add_texts(active, in_an_hour(), ["b"], random_vectors(1))
+
+    assert indexes.drop_expired() == 1
+    assert len(indexes) == 1
+    indexes.drop([active])
+    assert indexes.get(active) is None
+
+
+async def test_recent_float16_sessions_keep_working_copies() -> None:
+    """Test that only the most recently used float16 indexes keep float32 copies."""
+    indexes = make_indexes(max_sessions=3, dtype="float16", working_copies=1)
+    first, second = uuid4(), uuid4()
+    vectors = random_vectors(2)
+    for session_id in (first, second):
+        await indexes.add_texts(session_id, in_an_hour(), ["a", "b"], vectors)
+        await indexes.get(session_id).similarity_search(vectors[0], session_id=session_id)
+
+    assert indexes.get(second).segments[0].working is not None
+    assert indexes.get(first).segments[0].working is None
+    # Now the first is the most recent, and the second is dropped
+    assert indexes.get(second).segments[0].working is None